@@ -5,17 +5,25 @@ from qc_tool.models.filtered_profiles_model import FilteredProfilesModel
 from qc_tool.models.geo_info_model import GeoInfoModel
 from qc_tool.models.manual_qc_model import ManualQcModel
 from qc_tool.models.map_model import MapModel
+from qc_tool.models.memory_model import MemoryModel, default_cache_budget_mb
 from qc_tool.models.parameters_model import ParametersModel
 from qc_tool.models.profiles_grid_model import ProfileGridModel
+from qc_tool.models.scatter_matrix_model import ScatterMatrixModel
 from qc_tool.models.scatter_model import ScatterModel
+from qc_tool.models.tabs_model import TabsModel
 from qc_tool.models.validation_log_model import ValidationLogModel
 from qc_tool.models.visits_model import VisitsModel
+from qc_tool.models.wide_table_model import WideTableModel
 
 
 class AppState:
-    def __init__(self):
+    def __init__(self, cache_budget_mb: int | None = None):
         self._message_queue = CallbackQueue()
 
+        self.memory = MemoryModel(
+            cache_budget_mb or default_cache_budget_mb(), self._message_queue
+        )
+
         self.file = FileModel(self._message_queue)
         self.visits = VisitsModel(self._message_queue)
         self.filter = FilterModel(
@@ -24,9 +32,12 @@ class AppState:
         )
         self.map = MapModel(self._message_queue)
         self.validation_log = ValidationLogModel(self._message_queue)
-        self.parameters = ParametersModel(self._message_queue)
+        self.parameters = ParametersModel(self.memory, self._message_queue)
         self.profile_grid = ProfileGridModel(2, 6, self._message_queue)
         self.filtered_profiles = FilteredProfilesModel(self._message_queue)
         self.scatters = ScatterModel(self._message_queue)
+        self.wide_table = WideTableModel(self._message_queue)
+        self.scatter_matrix = ScatterMatrixModel(self._message_queue)
         self.manual_qc = ManualQcModel(self._message_queue)
         self.geo_info = GeoInfoModel(self._message_queue)
+        self.tabs = TabsModel(self._message_queue)
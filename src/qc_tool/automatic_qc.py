@@ -0,0 +1,186 @@
+import io
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import polars as pl
+from ocean_data_qc.fyskemqc import FysKemQc
+
+from qc_tool.pipeline import replaced_atomically
+from qc_tool.validation_cache import visit_hashes
+
+_ROW_INDEX = "_row_index"
+_VISIT_ROW = "_visit_row"
+_VISIT_HASH = "_visit_hash"
+_SHARD_ROW_INDEX = "_shard_row_index"
+_SHARD = "_shard"
+
+# Below this size the cost of starting worker processes is larger than the gain
+SHARDING_MIN_ROWS = 50_000
+
+# Suffix of the cached results in the cache directory
+AUTOMATIC_QC_CACHE_SUFFIX = ".automatic_qc.parquet"
+
+
+def run_automatic_qc(data: pl.DataFrame, max_workers: int | None = None) -> pl.DataFrame:
+    """Run FysKemQc on the data.
+
+    Large datasets are split into shards of whole visits that are processed in
+    separate processes. Shards are passed to and from the workers as Arrow IPC buffers
+    and the result is returned in the original row order."""
+    workers = min(max_workers or os.cpu_count() or 1, data["visit_key"].n_unique())
+    if workers < 2 or data.height < SHARDING_MIN_ROWS:
+        return _run_fys_kem_qc(data)
+
+    data = data.with_row_index(_SHARD_ROW_INDEX)
+    shards = [
+        shard.drop(_SHARD) for shard in _assign_shards(data, workers).partition_by(_SHARD)
+    ]
+    print(f"\tRunning automatic QC in {len(shards)} processes")
+    # Polars is not fork safe, so the worker processes are always spawned
+    with ProcessPoolExecutor(
+        max_workers=len(shards), mp_context=multiprocessing.get_context("spawn")
+    ) as executor:
+        results = list(executor.map(_run_automatic_qc_on_shard, map(_to_ipc, shards)))
+
+    return (
+        pl.concat(map(_from_ipc, results), how="diagonal_relaxed")
+        .sort(_SHARD_ROW_INDEX)
+        .drop(_SHARD_ROW_INDEX)
+    )
+
+
+def _assign_shards(data: pl.DataFrame, number_of_shards: int) -> pl.DataFrame:
+    # Largest visits first, each to the shard with the fewest rows so far
+    visit_sizes = data.group_by("visit_key").len().sort("len", descending=True)
+    shard_sizes = [0] * number_of_shards
+    shard_by_visit = {}
+    for visit_key, size in visit_sizes.iter_rows():
+        shard = shard_sizes.index(min(shard_sizes))
+        shard_by_visit[visit_key] = shard
+        shard_sizes[shard] += size
+    return data.with_columns(
+        pl.col("visit_key")
+        .replace_strict(shard_by_visit, return_dtype=pl.Int64)
+        .alias(_SHARD)
+    )
+
+
+def _run_automatic_qc_on_shard(ipc_buffer: bytes) -> bytes:
+    return _to_ipc(_run_fys_kem_qc(_from_ipc(ipc_buffer)))
+
+
+def _run_fys_kem_qc(data: pl.DataFrame) -> pl.DataFrame:
+    fys_kem_qc = FysKemQc(data)
+    fys_kem_qc.run_automatic_qc()
+    fys_kem_qc.total_flag_info()
+    return fys_kem_qc._data
+
+
+def _to_ipc(data: pl.DataFrame) -> bytes:
+    buffer = io.BytesIO()
+    data.write_ipc(buffer)
+    return buffer.getvalue()
+
+
+def _from_ipc(ipc_buffer: bytes) -> pl.DataFrame:
+    return pl.read_ipc(io.BytesIO(ipc_buffer))
+
+
+class IncrementalAutomaticQc:
+    """Automatic QC that only processes visits whose data has changed.
+
+    The processed data of each file is stored in the cache directory together with a
+    hash of the input data of each visit. When the same file is processed again,
+    visits with the same input hash are taken from the cache and the automatic QC is
+    only run on the remaining visits."""
+
+    def __init__(self, cache_directory: Path | None = None, max_workers=None):
+        self._cache_directory = cache_directory
+        self._max_workers = max_workers
+
+    def run(self, data: pl.DataFrame, cache_key: str | None = None) -> pl.DataFrame:
+        data = data.with_columns(
+            pl.int_range(pl.len()).alias(_ROW_INDEX),
+            pl.int_range(pl.len()).over("visit_key").alias(_VISIT_ROW),
+        )
+        hashes = visit_hashes(data.drop(_ROW_INDEX))
+        data = data.with_columns(
+            pl.col("visit_key")
+            .replace_strict(hashes, return_dtype=pl.UInt64)
+            .alias(_VISIT_HASH)
+        )
+
+        cached_data = self._read_cache(cache_key, hashes)
+        cached_visits = (
+            set(cached_data["visit_key"].unique()) if cached_data is not None else set()
+        )
+        changed_data = data.filter(~pl.col("visit_key").is_in(list(cached_visits)))
+        print(
+            f"\tRunning automatic QC for {len(hashes) - len(cached_visits)} of "
+            f"{len(hashes)} visits ({changed_data.height} rows)"
+        )
+
+        t0 = time.perf_counter()
+        processed_data = (
+            run_automatic_qc(changed_data.drop(_ROW_INDEX), self._max_workers)
+            if changed_data.height or cached_data is None
+            else None
+        )
+        t1 = time.perf_counter()
+        print(f"\tFysKemQc: {t1 - t0:.3f} s.")
+
+        result = pl.concat(
+            [frame for frame in (cached_data, processed_data) if frame is not None],
+            how="diagonal_relaxed",
+        )
+        self._write_cache(cache_key, result)
+
+        # Restore the original row order
+        result = (
+            result.drop(_ROW_INDEX, strict=False)
+            .join(
+                data.select("visit_key", _VISIT_ROW, _ROW_INDEX),
+                on=["visit_key", _VISIT_ROW],
+                how="left",
+            )
+            .sort(_ROW_INDEX)
+        )
+        return result.drop(_ROW_INDEX, _VISIT_ROW, _VISIT_HASH)
+
+    def _cache_path(self, cache_key: str) -> Path:
+        return self._cache_directory / f"{cache_key}{AUTOMATIC_QC_CACHE_SUFFIX}"
+
+    def _read_cache(self, cache_key: str | None, hashes: dict[str, int]):
+        if not (cache_key and self._cache_directory):
+            return None
+        cache_path = self._cache_path(cache_key)
+        if not cache_path.exists():
+            return None
+        try:
+            cached_data = pl.read_parquet(cache_path)
+        except (OSError, pl.exceptions.PolarsError) as error:
+            print(f"WARNING: Could not read automatic QC cache: {error}")
+            return None
+
+        unchanged_visits = pl.DataFrame(
+            {"visit_key": list(hashes), _VISIT_HASH: list(hashes.values())},
+            schema={"visit_key": pl.String, _VISIT_HASH: pl.UInt64},
+        )
+        cached_data = cached_data.join(
+            unchanged_visits, on=["visit_key", _VISIT_HASH], how="semi"
+        )
+        return cached_data if cached_data.height else None
+
+    def _write_cache(self, cache_key: str | None, data: pl.DataFrame):
+        if not (cache_key and self._cache_directory):
+            return
+        cache_path = self._cache_path(cache_key)
+        try:
+            self._cache_directory.mkdir(parents=True, exist_ok=True)
+            with replaced_atomically(cache_path) as temporary_path:
+                data.write_parquet(temporary_path)
+        except OSError as error:
+            print(f"WARNING: Could not write automatic QC cache: {error}")
@@ -0,0 +1,27 @@
+"""Sea areas of the ocean shapefile as polygons for the map.
+
+The polygons are drawn below the basemap tiles, so they show the coastline where
+tiles are missing, for example when working offline."""
+
+import numpy as np
+
+# Vertices closer than this many metres are merged
+SIMPLIFY_TOLERANCE = 200
+
+
+def coastline_data(shapes) -> dict[str, list]:
+    """Source data for a MultiPolygons glyph from a GeoDataFrame of polygons."""
+    data = {"xs": [], "ys": []}
+    if shapes is None or shapes.empty or shapes.crs is None:
+        return data
+
+    geometries = shapes.to_crs("EPSG:3857").geometry.simplify(SIMPLIFY_TOLERANCE)
+    for geometry in geometries:
+        for polygon in getattr(geometry, "geoms", [geometry]):
+            if polygon.is_empty or not hasattr(polygon, "exterior"):
+                continue
+            rings = [polygon.exterior, *polygon.interiors]
+            coordinates = [np.asarray(ring.coords) for ring in rings]
+            data["xs"].append([[ring[:, 0] for ring in coordinates]])
+            data["ys"].append([[ring[:, 1] for ring in coordinates]])
+    return data
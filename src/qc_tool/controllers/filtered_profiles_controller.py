@@ -1,7 +1,9 @@
+from qc_tool.controllers.pending_tab_update import PendingTabUpdate
 from qc_tool.models.file_model import FileModel
 from qc_tool.models.filter_model import FilterModel
 from qc_tool.models.filtered_profiles_model import FilteredProfilesModel
 from qc_tool.models.manual_qc_model import ManualQcModel
+from qc_tool.models.tabs_model import TabsModel
 from qc_tool.models.visits_model import VisitsModel
 from qc_tool.views.filtered_profiles_view import FilteredProfilesView
 
@@ -14,6 +16,7 @@ class FilteredProfilesController:
         filter_model: FilterModel,
         filtered_profiles_model: FilteredProfilesModel,
         manual_qc_model: ManualQcModel,
+        tabs_model: TabsModel,
     ):
         self._file_model = file_model
         self._file_model.register_listener(FileModel.NEW_DATA, self._on_new_file)
@@ -39,22 +42,36 @@ class FilteredProfilesController:
             ManualQcModel.QC_PERFORMED, self._on_qc_performed
         )
 
+        self._tab_update = PendingTabUpdate(
+            tabs_model, TabsModel.FILTERED_PROFILES, self._update_view
+        )
+
         self.filtered_profiles_view: FilteredProfilesView = None
 
     def _on_new_file(self):
         self._filter_model.filtered_data = self._file_model.data
-        self.filtered_profiles_view.update_grid_content(flag="file")
+        self._update_grid_content("file")
 
     def _on_visit_selected(self):
-        self.filtered_profiles_view.update_grid_content(flag="visit")
+        self._update_grid_content("visit")
 
     def _on_new_filter(self):
-        self.filtered_profiles_view.update_grid_content(flag="filter")
+        self._update_grid_content("filter")
 
     def _on_new_parameter(self):
-        self.filtered_profiles_view.update_grid_content(flag="parameter")
+        self._update_grid_content("parameter")
 
     def _on_qc_performed(self):
         if self.filtered_profiles_view is None:
             return
+        if not self._tab_update.is_active:
+            # Colors are updated with the data when the tab becomes active
+            self._tab_update.postpone("visit")
+            return
         self.filtered_profiles_view.update_colors(self._manual_qc_model.selected_values)
+
+    def _update_grid_content(self, flag: str):
+        self._tab_update.update(flag)
+
+    def _update_view(self, flag: str):
+        self.filtered_profiles_view.update_grid_content(flag=flag)
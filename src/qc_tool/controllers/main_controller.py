@@ -1,5 +1,3 @@
-from pyproj import Transformer
-
 from qc_tool.app_state import AppState
 from qc_tool.controllers.filter_controller import FilterController
 from qc_tool.controllers.summary_controller import SummaryController
@@ -25,8 +23,6 @@ class MainController:
             self._state.validation_log,
         )
 
-        self._transformer = Transformer.from_crs("EPSG:4326", "EPSG:3857")
-
         self.filter_controller = FilterController(self._state.visits, self._state.filter)
 
         self.summary_controller = SummaryController(
@@ -38,18 +34,3 @@ class MainController:
             self._state.geo_info,
         )
         self.visits_browser_controller = VisitsBrowserController(self._state)
-
-    def _set_validation(self, validation: dict):
-        self._validation = validation
-        self.summary_view.update_validation_log(validation)
-
-    def _convert_projection(self, longitudes, latitudes):
-        if not longitudes or not latitudes:
-            return longitudes, latitudes
-
-        transformed_longitudes, transformed_latitudes = self._transformer.transform(
-            yy=longitudes,
-            xx=latitudes,
-        )
-
-        return transformed_longitudes, transformed_latitudes
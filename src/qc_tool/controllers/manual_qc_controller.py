@@ -1,8 +1,8 @@
 import polars as pl
-from ocean_data_qc.fyskem.parameter import Parameter
 
 from qc_tool.models.manual_qc_model import ManualQcModel
 from qc_tool.models.visits_model import VisitsModel
+from qc_tool.value_selection import ValueSelection
 
 
 class ManualQcController:
@@ -20,7 +20,7 @@ class ManualQcController:
     def _on_visit_selected(self):
         if self.manual_qc_view is None:
             return
-        self.manual_qc_model.set_selected_values([])
+        self.manual_qc_model.set_selected_values(ValueSelection())
         visit = self._visits_model.selected_visit
         depths = [str(d) for d in visit.depths] if visit else []
         parameters = visit.parameters if visit else []
@@ -32,7 +32,7 @@ class ManualQcController:
     ):
         visit = self._visits_model.selected_visit
         if visit is None or (not selected_depths and not selected_parameters):
-            self.manual_qc_model.set_values_from_filter([])
+            self.manual_qc_model.set_values_from_filter(ValueSelection())
             return
 
         data = visit.data
@@ -42,8 +42,7 @@ class ManualQcController:
         if selected_parameters:
             data = data.filter(pl.col("parameter").is_in(selected_parameters))
 
-        values = [Parameter(row) for row in data.iter_rows(named=True)]
-        self.manual_qc_model.set_values_from_filter(values)
+        self.manual_qc_model.set_values_from_filter(ValueSelection(data))
 
     def deselect_value(self, index: int):
         self.manual_qc_model.deselect_value(index)
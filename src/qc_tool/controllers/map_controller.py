@@ -1,4 +1,5 @@
-from pyproj import Transformer
+import numpy as np
+import polars as pl
 
 from qc_tool.models.map_model import MapModel
 from qc_tool.models.visits_model import VisitsModel
@@ -27,54 +28,51 @@ class MapController:
             VisitsModel.VISIT_SELECTED, self._on_visit_selected
         )
         self._visits_model.register_listener(
-            VisitsModel.FILTER_APPLIED, self._on_new_visits
+            VisitsModel.FILTER_APPLIED, self._on_filter_applied
         )
 
         self._visits_model.register_listener(
-            VisitsModel.FEEDBACK_READY, self._on_new_visits
+            VisitsModel.FEEDBACK_READY, self._on_feedback_ready
         )
 
         self._map_model = map_model
-        self._transformer = Transformer.from_crs("EPSG:4326", "EPSG:3857")
         self.map_view: MapView = None
 
     def select_visit(self, station_visit: str):
         self._visits_model.set_visit_by_key(station_visit)
 
     def _on_new_visits(self):
-        visit_positions = [
-            (visit.visit_key, visit.longitude, visit.latitude)
-            for visit in self._visits_model.visits.values()
-        ]
-        if not visit_positions:
-            self._map_model.set_points({})
-            self.map_view.reset_map()
-            return
-
-        visit_keys, longitudes, latitudes = zip(*visit_positions)
-        longitudes, latitudes = self._convert_projection(longitudes, latitudes)
-
-        colors = []
-        status = []
-        for visit in self._visits_model.visits.values():
-            logs = getattr(visit, "validation_logs", [])
-
-            has_issue = any(
-                log.get("level") in ("warning", "error", "critical") for log in logs
-            )
+        # Positions are projected when the data is loaded, filters only change which
+        # points are shown
+        visits = self._visits_model.all_visits.values()
+        self._map_model.set_points(
+            pl.DataFrame(
+                {
+                    "visit_key": [visit.visit_key for visit in visits],
+                    "x": [visit.web_mercator_x for visit in visits],
+                    "y": [visit.web_mercator_y for visit in visits],
+                },
+                schema={"visit_key": pl.String, "x": pl.Float64, "y": pl.Float64},
+            ).fill_null(np.nan)
+        )
+        self._on_filter_applied()
+        self._on_feedback_ready()
 
-            colors.append("red" if has_issue else "blue")
-            status.append("metadata error" if has_issue else "blue")
+    def _on_filter_applied(self):
+        self._map_model.set_visible(self._visits_model.visit_keys)
+        if len(self._map_model.visible_rows):
+            self._zoom_to_points()
+        else:
+            self.map_view.reset_map()
+        self.map_view.update_level_of_detail()
 
-        visit_points = {
-            "longitudes": longitudes,
-            "latitudes": latitudes,
-            "visit_keys": visit_keys,
-            "color": colors,
-            "status": status,
-        }
-        self._map_model.set_points(visit_points)
-        self._zoom_to_points()
+    def _on_feedback_ready(self):
+        self._map_model.set_issues(
+            self._map_model.points["visit_key"]
+            .is_in(self._visits_model.visits_with_issues.implode())
+            .to_numpy()
+        )
+        self.map_view.update_level_of_detail()
 
     def _on_visit_selected(self):
         self._map_model.set_selection(
@@ -83,22 +81,14 @@ class MapController:
             else []
         )
 
-    def _convert_projection(self, longitudes, latitudes):
-        if not longitudes or not latitudes:
-            return longitudes, latitudes
-
-        transformed_longitudes, transformed_latitudes = self._transformer.transform(
-            yy=longitudes,
-            xx=latitudes,
-        )
-
-        return transformed_longitudes, transformed_latitudes
-
     def _zoom_to_points(self):
-        x_min = min(self._map_model.unselected.data["longitudes"])
-        x_max = max(self._map_model.unselected.data["longitudes"])
-        y_min = min(self._map_model.unselected.data["latitudes"])
-        y_max = max(self._map_model.unselected.data["latitudes"])
+        rows = self._map_model.visible_rows
+        x = self._map_model.unselected.data["x"][rows]
+        y = self._map_model.unselected.data["y"][rows]
+        x_min = np.nanmin(x)
+        x_max = np.nanmax(x)
+        y_min = np.nanmin(y)
+        y_max = np.nanmax(y)
 
         data_width = max((x_max - x_min) * self.margin_ratio, self.min_map_range)
         data_height = max((y_max - y_min) * self.margin_ratio, self.min_map_range)
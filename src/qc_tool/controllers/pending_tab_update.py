@@ -0,0 +1,45 @@
+from typing import Callable
+
+from qc_tool.models.tabs_model import TabsModel
+
+# Updates for a new file or filter include updates for a new visit, which include
+# updates for a new parameter
+UPDATE_FLAGS = ("file", "filter", "visit", "parameter")
+
+
+class PendingTabUpdate:
+    """Grid updates of a tab. Updates while the tab is not active are postponed and the
+    most extensive of them is made when the tab becomes active."""
+
+    def __init__(self, tabs_model: TabsModel, tab: str, update: Callable[[str], None]):
+        self._tabs_model = tabs_model
+        self._tabs_model.register_listener(
+            TabsModel.ACTIVE_TAB_CHANGED, self._on_active_tab_changed
+        )
+        self._tab = tab
+        self._update = update
+        # Update that is waiting for the tab to become active
+        self._pending_flag = None
+
+    @property
+    def is_active(self) -> bool:
+        return self._tabs_model.active_tab == self._tab
+
+    def update(self, flag: str):
+        if not self.is_active:
+            self.postpone(flag)
+            return
+        self._update(flag)
+
+    def postpone(self, flag: str):
+        if self._pending_flag is None or (
+            UPDATE_FLAGS.index(flag) < UPDATE_FLAGS.index(self._pending_flag)
+        ):
+            self._pending_flag = flag
+
+    def _on_active_tab_changed(self):
+        if not self.is_active or self._pending_flag is None:
+            return
+        flag = self._pending_flag
+        self._pending_flag = None
+        self._update(flag)
@@ -1,8 +1,11 @@
+from qc_tool.controllers.pending_tab_update import PendingTabUpdate
 from qc_tool.models.file_model import FileModel
 from qc_tool.models.filter_model import FilterModel
 from qc_tool.models.manual_qc_model import ManualQcModel
 from qc_tool.models.scatter_model import ScatterModel
+from qc_tool.models.tabs_model import TabsModel
 from qc_tool.models.visits_model import VisitsModel
+from qc_tool.models.wide_table_model import WideTableModel
 from qc_tool.views.scatter_view import ScatterView
 
 
@@ -14,9 +17,14 @@ class ScatterController:
         filter_model: FilterModel,
         scatter_model: ScatterModel,
         manual_qc_model: ManualQcModel,
+        tabs_model: TabsModel,
+        wide_table_model: WideTableModel,
     ):
         self._file_model = file_model
-        self._file_model.register_listener(FileModel.NEW_DATA, self._on_new_file)
+        self._wide_table_model = wide_table_model
+        self._wide_table_model.register_listener(
+            WideTableModel.NEW_TABLE, self._on_new_file
+        )
         self._visits_model = visits_model
         self._visits_model.register_listener(
             VisitsModel.VISIT_SELECTED, self._on_visit_selected
@@ -39,22 +47,36 @@ class ScatterController:
             ManualQcModel.QC_PERFORMED, self._on_qc_performed
         )
 
+        self._tab_update = PendingTabUpdate(
+            tabs_model, TabsModel.SCATTER, self._update_view
+        )
+
         self.scatter_view: ScatterView = None
 
     def _on_new_file(self):
         self._filter_model.filtered_data = self._file_model.data
-        self.scatter_view.update_grid_content(flag="file")
+        self._update_grid_content("file")
 
     def _on_visit_selected(self):
-        self.scatter_view.update_grid_content(flag="visit")
+        self._update_grid_content("visit")
 
     def _on_new_filter(self):
-        self.scatter_view.update_grid_content(flag="filter")
+        self._update_grid_content("filter")
 
     def _on_new_parameter(self):
-        self.scatter_view.update_grid_content(flag="parameter")
+        self._update_grid_content("parameter")
 
     def _on_qc_performed(self):
         if self.scatter_view is None:
             return
+        if not self._tab_update.is_active:
+            # Colors are updated with the data when the tab becomes active
+            self._tab_update.postpone("visit")
+            return
         self.scatter_view.update_colors(self._manual_qc_model.selected_values)
+
+    def _update_grid_content(self, flag: str):
+        self._tab_update.update(flag)
+
+    def _update_view(self, flag: str):
+        self.scatter_view.update_grid_content(flag=flag)
@@ -0,0 +1,53 @@
+from qc_tool.models.filter_model import FilterModel
+from qc_tool.models.scatter_matrix_model import ScatterMatrixModel
+from qc_tool.models.tabs_model import TabsModel
+from qc_tool.models.wide_table_model import WideTableModel
+from qc_tool.views.scatter_matrix_view import ScatterMatrixView
+
+
+class ScatterMatrixController:
+    def __init__(
+        self,
+        wide_table_model: WideTableModel,
+        filter_model: FilterModel,
+        scatter_matrix_model: ScatterMatrixModel,
+        tabs_model: TabsModel,
+    ):
+        self._wide_table_model = wide_table_model
+        self._wide_table_model.register_listener(
+            WideTableModel.NEW_TABLE, self._update_matrix
+        )
+        self._filter_model = filter_model
+        self._filter_model.register_listener(
+            FilterModel.FILTER_CHANGED, self._update_matrix
+        )
+        self._scatter_matrix_model = scatter_matrix_model
+        self._scatter_matrix_model.register_listener(
+            ScatterMatrixModel.PARAMETER_SET_CHANGED, self._update_matrix
+        )
+
+        self._tabs_model = tabs_model
+        self._tabs_model.register_listener(
+            TabsModel.ACTIVE_TAB_CHANGED, self._on_active_tab_changed
+        )
+        # The matrix is only updated when the tab is active
+        self._pending_update = False
+
+        self.scatter_matrix_view: ScatterMatrixView = None
+
+    def set_parameter_set(self, parameter_set: str):
+        self._scatter_matrix_model.parameter_set = parameter_set
+
+    def _on_active_tab_changed(self):
+        if self._tabs_model.active_tab != TabsModel.SCATTER_MATRIX:
+            return
+        if not self._pending_update:
+            return
+        self._pending_update = False
+        self.scatter_matrix_view.update_matrix()
+
+    def _update_matrix(self):
+        if self._tabs_model.active_tab != TabsModel.SCATTER_MATRIX:
+            self._pending_update = True
+            return
+        self.scatter_matrix_view.update_matrix()
@@ -33,6 +33,7 @@ class SummaryController:
         )
 
         self.map_controller = MapController(self._visits_model, map_model)
+        map_model.set_coastline(self.file_controller.ocean_coastline)
         self.validation_log_controller = ValidationLogController(
             self._validation_log_model
         )
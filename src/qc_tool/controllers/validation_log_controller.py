@@ -8,9 +8,26 @@ class ValidationLogController:
         self._validation_log_model.register_listener(
             ValidationLogModel.NEW_VALIDATION_LOG, self._on_new_validation_log
         )
+        self._validation_log_model.register_listener(
+            ValidationLogModel.LOG_PAGE_CHANGED, self._on_log_page_changed
+        )
 
         self.validation_log_view: ValidationLogView = None
 
     def _on_new_validation_log(self):
-        self._validation_log = self._validation_log_model.validation_log
-        self.validation_log_view.update(self._validation_log_model.validation_remarks)
+        self.validation_log_view.update_filter_options()
+        self.validation_log_view.update_page()
+
+    def _on_log_page_changed(self):
+        self.validation_log_view.update_page()
+
+    def set_log_filter(
+        self,
+        validator: str | None = None,
+        level: str | None = None,
+        column: str | None = None,
+    ):
+        self._validation_log_model.set_log_filter(validator, level, column)
+
+    def set_page(self, page: int):
+        self._validation_log_model.set_page(page)
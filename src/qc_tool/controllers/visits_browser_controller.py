@@ -6,8 +6,10 @@ from qc_tool.controllers.map_controller import MapController
 from qc_tool.controllers.parameter_selector_controller import ParameterSelectorController
 from qc_tool.controllers.profile_grid_controller import ProfileGridController
 from qc_tool.controllers.scatter_controller import ScatterController
+from qc_tool.controllers.scatter_matrix_controller import ScatterMatrixController
 from qc_tool.controllers.visit_info_controller import VisitInfoController
 from qc_tool.controllers.visit_selector_controller import VisitSelectorController
+from qc_tool.controllers.wide_table_controller import WideTableController
 from qc_tool.views.visits_browser_view import VisitsBrowserView
 
 
@@ -50,6 +52,12 @@ class VisitsBrowserController:
             self._state.filter,
             self._state.filtered_profiles,
             self._state.manual_qc,
+            self._state.tabs,
+        )
+        self.wide_table_controller = WideTableController(
+            self._state.file,
+            self._state.manual_qc,
+            self._state.wide_table,
         )
         self.scatter_controller = ScatterController(
             self._state.file,
@@ -57,6 +65,14 @@ class VisitsBrowserController:
             self._state.filter,
             self._state.scatters,
             self._state.manual_qc,
+            self._state.tabs,
+            self._state.wide_table,
+        )
+        self.scatter_matrix_controller = ScatterMatrixController(
+            self._state.wide_table,
+            self._state.filter,
+            self._state.scatter_matrix,
+            self._state.tabs,
         )
 
         self.manual_qc_controller = ManualQcController(
@@ -66,6 +82,9 @@ class VisitsBrowserController:
 
         self.visits_browser_view: VisitsBrowserView = None
 
+    def set_active_tab(self, tab: str):
+        self._state.tabs.active_tab = tab
+
     # def _on_visit_selected(self):
     #     if self.visits_browser_view is None:
     #         return
@@ -36,24 +36,26 @@ class VisitsController:
             FilterModel.FILTER_CHANGED, self._on_filter_changed
         )
         self._visits_model.register_listener(
-            VisitsModel.NEW_VISITS, self._build_feedback_service
+            VisitsModel.NEW_VISITS, self._attach_logs_to_visits
         )
         self._validation_log_model.register_listener(
             validation_log_model.NEW_VALIDATION_LOG, self._on_new_validation_log
         )
         self._visits_model.register_listener(
-            VisitsModel.UPDATED_VISITS, self._build_feedback_service
+            VisitsModel.UPDATED_VISITS, self._attach_logs_to_visits
         )
+        self._feedback_service: FeedbackService | None = None
 
     def _on_new_data(self):
+        # The log of the new data is set after the data, until then the logs of the
+        # previous data must not be attached to the new visits
+        self._feedback_service = None
         visits = self._create_visits()
         self._visits_model.set_visits(visits)
-        self._build_feedback_service()
 
     def _on_updated_data(self):
         visits = self._create_visits()
         self._visits_model.update_visits(visits)
-        self._build_feedback_service()
 
     def _create_visits(self):
         # Extract list of all station visits
@@ -79,7 +81,7 @@ class VisitsController:
         visit_key = self._visits_model.selected_visit.visit_key
         visit = self._update_visit(visit_key)
         self._visits_model.update_visit(visit_key, visit)
-        self._build_feedback_service()
+        self._attach_logs_to_visits()
 
     def _update_visit(self, visit_key: str | None):
         if visit_key is None:
@@ -93,9 +95,12 @@ class VisitsController:
         self._build_feedback_service()
 
     def _build_feedback_service(self):
+        # The log entries of each visit only change with the log, new visit objects
+        # are attached to the existing index
         self._feedback_service = FeedbackService(
             validation_log=self._validation_log_model.validation_log,
             visits_model=self._visits_model,
+            data=self._file_model.data,
         )
 
         self._attach_logs_to_visits()
@@ -107,4 +112,4 @@ class VisitsController:
         for visit in self._visits_model.visits.values():
             visit.validation_logs = self._feedback_service.get_logs_for_visit(visit)
 
-        self._visits_model._notify_listeners(VisitsModel.FEEDBACK_READY)
+        self._visits_model.set_feedback(self._feedback_service.visits_with_issues)
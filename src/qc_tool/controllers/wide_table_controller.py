@@ -0,0 +1,27 @@
+from qc_tool.models.file_model import FileModel
+from qc_tool.models.manual_qc_model import ManualQcModel
+from qc_tool.models.wide_table_model import WideTableModel
+
+
+class WideTableController:
+    def __init__(
+        self,
+        file_model: FileModel,
+        manual_qc_model: ManualQcModel,
+        wide_table_model: WideTableModel,
+    ):
+        self._file_model = file_model
+        self._file_model.register_listener(
+            (FileModel.NEW_DATA, FileModel.UPDATED_DATA), self._on_new_data
+        )
+        self._manual_qc_model = manual_qc_model
+        self._manual_qc_model.register_listener(
+            ManualQcModel.QC_PERFORMED, self._on_qc_performed
+        )
+        self._wide_table_model = wide_table_model
+
+    def _on_new_data(self):
+        self._wide_table_model.set_data(self._file_model.data)
+
+    def _on_qc_performed(self):
+        self._wide_table_model.update_flags(self._manual_qc_model.selected_values)
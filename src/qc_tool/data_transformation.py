@@ -1,3 +1,4 @@
+import functools
 from collections import Counter, defaultdict
 from pathlib import Path
 
@@ -6,52 +7,41 @@ from ocean_data_qc.fyskem.qc_flag_tuple import QcField
 from sharkadm import validators
 
 
-def get_validators_in_log(log):
-    validators_map = {}
+@functools.cache
+def validator_description(cls_name: str) -> str:
+    validator_cls = getattr(validators, cls_name, None)
+    return validator_cls.get_validator_description() if validator_cls else ""
 
-    for row in log:
-        name = row.get("validator", "no validator")
-        cls_name = row.get("cls")
 
-        if name not in validators_map and cls_name:
-            validators_map[name] = getattr(validators, cls_name)
+class LogMessageAggregator:
+    """Messages of a validation log grouped by validator and column, with the number of
+    messages and the description of each validator. Messages added later are folded
+    into the existing groups."""
 
-    return validators_map
-
-
-def collect_log_messages(log: list):
-    log_messages = defaultdict(
-        lambda: {
-            "messages": defaultdict(list),
-        }
-    )
-
-    for row in log:
-        level = row.get("level", "info")
-
-        # Only include relevant levels
-        if level not in ("error", "warning", "critical"):
-            continue
-
-        validator_name = row.get("validator", "no validator")
-        column = row.get("column") or "General"
-
-        log_messages[validator_name]["messages"][column].append(row["msg"])
-
-    available_validators = get_validators_in_log(log)
-
-    for validator_name, data in log_messages.items():
-        # Count ALL messages
-        data["count"] = sum(len(msgs) for msgs in data["messages"].values())
+    def __init__(self):
+        self._log_messages = defaultdict(
+            lambda: {
+                "messages": defaultdict(list),
+                "count": 0,
+                "description": "",
+            }
+        )
 
-        # Add description
-        validator_cls = available_validators.get(validator_name)
-        if validator_cls:
-            data["description"] = validator_cls.get_validator_description()
-        else:
-            data["description"] = ""
+    def add(self, messages: pl.DataFrame):
+        """Add messages in the format of `log_frame`."""
+        groups = messages.group_by("validator", "column", maintain_order=True).agg(
+            pl.col("msg"), pl.col("cls").drop_nulls().first()
+        )
+        for validator_name, column, column_messages, cls_name in groups.iter_rows():
+            data = self._log_messages[validator_name]
+            data["messages"][column].extend(column_messages)
+            data["count"] += len(column_messages)
+            if cls_name and not data["description"]:
+                data["description"] = validator_description(cls_name)
 
-    return log_messages
+    @property
+    def log_messages(self):
+        return self._log_messages
 
 
 def remove_lims(parts: tuple[str, ...]) -> tuple[str, ...]:
@@ -110,6 +100,23 @@ def prepare_data(data: pl.DataFrame):
     return data
 
 
+def expand_quality_flag_long(data: pl.DataFrame) -> pl.DataFrame:
+    if not data.is_empty():
+        split = (
+            pl.col("quality_flag_long")
+            .str.split_exact("_", 3)
+            .struct.rename_fields(["INCOMING_QC", "AUTO_QC", "MANUAL_QC", "TOTAL_QC"])
+            .alias("split_qc_fields")
+        )
+
+        # Drop existing QC columns to avoid duplicates
+        qc_cols = ["INCOMING_QC", "AUTO_QC", "MANUAL_QC", "TOTAL_QC"]
+        data = data.drop([c for c in qc_cols if c in data.columns])
+
+        data = data.with_columns(split).unnest("split_qc_fields")
+    return data
+
+
 def changes_report(data: pl.DataFrame) -> pl.DataFrame:
     # Extract first (incoming) and last (total) parts of quality_flag_long
     incoming = pl.col("quality_flag_long").str.split("_").list.get(0)
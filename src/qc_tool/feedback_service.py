@@ -1,3 +1,6 @@
+import polars as pl
+
+from qc_tool.log_frame import LOG_LEVELS
 from qc_tool.models.visits_model import VisitsModel
 
 
@@ -9,17 +12,43 @@ class FeedbackService:
         self._visits_model = visits_model
         self.data = data
 
-        self._row_to_logs = self._index_logs_by_row()
-
-    def _index_logs_by_row(self):
-        index = {}
-
-        for log in self.validation_log:
-            if log["row_numbers"] is not None:
-                for row in log["row_numbers"]:
-                    index.setdefault(row, []).append(log)
-
-        return index
+        self._visit_logs = self._join_logs_to_visits()
+        log_ids = self._visit_logs.group_by("visit_key").agg(pl.col("log_id").sort())
+        self._log_ids_by_visit = dict(
+            zip(log_ids["visit_key"], log_ids["log_id"].to_list())
+        )
+
+    def _join_logs_to_visits(self) -> pl.DataFrame:
+        """Visit key, id and level of the log entries that refer to rows of each visit.
+        The id of an entry is its position in the validation log."""
+        schema = {"visit_key": pl.String, "log_id": pl.UInt32, "level": pl.String}
+        if not self.validation_log or self.data is None:
+            return pl.DataFrame(schema=schema)
+
+        rows = self.data.select("row_number", "visit_key").unique(subset="row_number")
+        log_rows = (
+            pl.DataFrame(
+                {
+                    "log_id": pl.Series(range(len(self.validation_log)), dtype=pl.UInt32),
+                    "level": pl.Series(
+                        [log.get("level") for log in self.validation_log],
+                        dtype=pl.String,
+                    ),
+                    "row_number": pl.Series(
+                        [log.get("row_numbers") or [] for log in self.validation_log],
+                        dtype=pl.List(rows.schema["row_number"]),
+                        strict=False,
+                    ),
+                }
+            )
+            .explode("row_number")
+            .drop_nulls("row_number")
+        )
+        return (
+            log_rows.join(rows, on="row_number")
+            .unique(subset=["visit_key", "log_id"])
+            .select(list(schema))
+        )
 
     def get_visit_feedback(self):
         result = []
@@ -60,24 +89,25 @@ class FeedbackService:
         return feedback
 
     def _get_logs_for_visit(self, visit):
-        visit_rows = set(visit.row_numbers)
-
-        return [
-            log
-            for log in self.validation_log
-            if visit_rows.intersection(log["row_numbers"])
-        ]
-
-    def get_logs_for_visit(self, visit):
-        logs = []
+        return self.get_logs_for_visit(visit)
 
-        for row in visit.row_numbers:
-            logs.extend(self._row_to_logs.get(row, []))
+    def log_ids_for_visit(self, visit_key: str) -> list[int]:
+        return self._log_ids_by_visit.get(visit_key, [])
 
-        # remove duplicates
-        unique_logs = {id(log): log for log in logs}
+    @property
+    def visits_with_issues(self) -> pl.Series:
+        """Keys of the visits with log entries of the levels shown in the log."""
+        return (
+            self._visit_logs.filter(pl.col("level").is_in(LOG_LEVELS))["visit_key"]
+            .unique()
+            .sort()
+        )
 
-        return list(unique_logs.values())
+    def get_logs_for_visit(self, visit):
+        return [
+            self.validation_log[log_id]
+            for log_id in self.log_ids_for_visit(visit.visit_key)
+        ]
 
     def _count(self, logs, level):
         return sum(1 for log in logs if log["level"] == level)
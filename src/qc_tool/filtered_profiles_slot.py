@@ -17,11 +17,20 @@ from bokeh.models import (
     WheelZoomTool,
 )
 from bokeh.plotting import figure
-from ocean_data_qc.fyskem.parameter import Parameter
-from ocean_data_qc.fyskem.qc_flag import QC_FLAG_CSS_COLORS
 
 from qc_tool.models.filtered_profiles_model import FilteredProfilesModel
-from qc_tool.models.manual_qc_model import ManualQcModel
+from qc_tool.selection_link import SelectionLink
+from qc_tool.slot_source import (
+    FLAG_LABELS,
+    LabelCodes,
+    density_color_mapper,
+    flag_color_mapper,
+    outline_color_mapper,
+    qc_patches,
+    row_index,
+    source_columns,
+)
+from qc_tool.value_selection import ROW_KEY, ValueSelection
 from qc_tool.views.base_view import BaseView
 
 PARAMETER_ABBREVIATIONS = {
@@ -74,17 +83,24 @@ class FilteredProfilesSlot(BaseView):
         "x",
         "unit",
         "y",
-        "color",
-        "line_color",
         "qc",
+        "outline",
         "qc_incoming",
         "qc_automatic",
         "qc_manual",
+        "key",
     )
     filtered_source_fields = (
         "x",
         "y",
     )
+    density_source_fields = (
+        "image",
+        "x",
+        "y",
+        "dw",
+        "dh",
+    )
     statistics_source_fields = (
         "depth",
         "median",
@@ -100,36 +116,36 @@ class FilteredProfilesSlot(BaseView):
 
     def __init__(
         self,
-        manual_qc_model: ManualQcModel,
+        selection_link: SelectionLink,
         filtered_profiles_model: FilteredProfilesModel,
+        text_labels: LabelCodes,
         title: str = "",
         parameter: str = "",
         linked_plot: Self | None = None,
         profile_index: int | None = None,
     ):
         self._title = title
-        self._manual_qc_model = manual_qc_model
+        self._selection_link = selection_link
+        self._text_labels = text_labels
         self._filtered_profiles_model = filtered_profiles_model
         self._parameter = parameter
         self._profile_index = profile_index
 
-        self._manual_qc_model.register_listener(
-            ManualQcModel.VALUES_SELECTED, self._on_values_selected
-        )
-
         self._visit = None
         self._filtered_data = None
         self._data = None
         self._parameter_data = None
+        self._row_indices = {}
         self._show_lines = True
         self._show_bounds = True
-        self._clear_called = False
-        self._applying_highlight = False
 
         self._source = ColumnDataSource(data={key: [] for key in self.source_fields})
         self._filtered_source = ColumnDataSource(
             data={key: [] for key in self.filtered_source_fields}
         )
+        self._density_source = ColumnDataSource(
+            data={key: [] for key in self.density_source_fields}
+        )
 
         self._statistics_source = ColumnDataSource(
             data={key: [] for key in self.statistics_source_fields}
@@ -165,12 +181,12 @@ class FilteredProfilesSlot(BaseView):
             "tooltips": [
                 ("Parameter", "$name"),
                 ("Value", "@x"),
-                ("Unit", "@unit"),
+                ("Unit", "@unit{custom}"),
                 ("Depth", "@y"),
-                ("QC", "@qc"),
-                ("Incoming QC", "@qc_incoming"),
-                ("Automatic QC", "@qc_automatic"),
-                ("Manual QC", "@qc_manual"),
+                ("QC", "@qc{custom}"),
+                ("Incoming QC", "@qc_incoming{custom}"),
+                ("Automatic QC", "@qc_automatic{custom}"),
+                ("Manual QC", "@qc_manual{custom}"),
             ],
         }
         self._plot_values_config = {
@@ -184,11 +200,30 @@ class FilteredProfilesSlot(BaseView):
         }
 
         self._figure = figure(**self._figure_config)
+        self._text_formatter = self._text_labels.formatter()
+        flag_formatter = FLAG_LABELS.formatter()
+        hover.formatters = {
+            "@unit": self._text_formatter,
+            "@qc": flag_formatter,
+            "@qc_incoming": flag_formatter,
+            "@qc_automatic": self._text_formatter,
+            "@qc_manual": flag_formatter,
+        }
 
         self._init_background()
         self._init_statistics_plot()
 
         # Add background
+        self._density = self._figure.image(
+            image="image",
+            x="x",
+            y="y",
+            dw="dw",
+            dh="dh",
+            source=self._density_source,
+            color_mapper=density_color_mapper(),
+            global_alpha=0.5,
+        )
         self._filtered_values = self._figure.scatter(
             "x",
             "y",
@@ -209,12 +244,12 @@ class FilteredProfilesSlot(BaseView):
             "x",
             "y",
             source=self._source,
-            color="color",
-            line_color="line_color",
+            fill_color={"field": "qc", "transform": flag_color_mapper()},
+            line_color={"field": "outline", "transform": outline_color_mapper()},
             **self._plot_values_config,
         )
 
-        self._source.selected.on_change("indices", self._on_value_selected)
+        self._selection_link.add(self._figure, [self._source])
 
         hover.renderers = [self._values]
 
@@ -331,9 +366,13 @@ class FilteredProfilesSlot(BaseView):
         )
 
     def clear_figure(self):
-        self.clear_selection()
+        self._clear_profile()
+        self.set_filtered_data(None)
+
+    def _clear_profile(self):
+        # The background only depends on the filter and is kept when the visit changes
         self._source.data = {key: [] for key in self.source_fields}
-        self._filtered_source.data = {key: [] for key in self.filtered_source_fields}
+        self._selection_link.set_data(self._source, None)
         self._statistics_source.data = {key: [] for key in self.statistics_source_fields}
         self._ocean_floor.visible = False
         self._sea_level.visible = False
@@ -348,7 +387,8 @@ class FilteredProfilesSlot(BaseView):
         self._visit = visit
         # clear previous content
         self._parameter_data = None
-        self.clear_figure()
+        self._row_indices = {}
+        self._clear_profile()
 
         # get data, units, and ranges
         if data is None:
@@ -359,30 +399,40 @@ class FilteredProfilesSlot(BaseView):
         if parameter_data is None:
             return
 
-        self._source.data = parameter_data
+        self._source.data = source_columns(parameter_data, self.source_fields)
         self._values.name = expand_abbreviation(parameter_name)
         self._parameter_data = parameter_data["data"]
+        self._row_indices = row_index(self._parameter_data, ROW_KEY)
+        self._selection_link.set_data(self._source, self._parameter_data)
 
+        self._text_labels.sync_formatter(self._text_formatter)
         self._sync_profile_options()
 
     def set_filtered_data(
         self,
         filtered_data: dict | None,
     ):
+        # The background is only sent again when it has changed
+        if filtered_data is self._filtered_data:
+            return
         self._filtered_data = filtered_data
 
         if filtered_data is None:
             self._filtered_source.data = {key: [] for key in self.filtered_source_fields}
-            return
-
-        self._filtered_source.data = {
-            "x": filtered_data.get("x", []),
-            "y": filtered_data.get("y", []),
-        }
+            self._density_source.data = {key: [] for key in self.density_source_fields}
+        elif "image" in filtered_data:
+            self._filtered_source.data = {key: [] for key in self.filtered_source_fields}
+            self._density_source.data = filtered_data
+        else:
+            self._density_source.data = {key: [] for key in self.density_source_fields}
+            self._filtered_source.data = {
+                "x": filtered_data.get("x", []),
+                "y": filtered_data.get("y", []),
+            }
 
     def _sync_profile_options(self):
         # Setting the visibility of elements according to parameter options
-        has_data = any(self._source.data.get("x"))
+        has_data = len(self._source.data.get("x", [])) > 0
 
         self._line.visible = self._show_lines
         self._ocean_floor.visible = self._show_bounds and has_data
@@ -411,97 +461,23 @@ class FilteredProfilesSlot(BaseView):
         self._figure.y_range.start = y_max
         self._figure.y_range.end = y_min
 
-    def clear_selection(self):
-        self._clear_called = True
-        self._source.selected.indices = []
-        self._clear_called = False
-
-    def update_colors(self, updated_values: list[Parameter]):
+    def update_colors(self, updated_values: ValueSelection):
         if self._parameter_data is None:
             return
 
-        updated_map = {
-            (v._data["visit_key"], v._data["DEPH"]): v
-            for v in updated_values
-            if v._data["parameter"] == self._parameter
-        }
-        if not updated_map:
-            return
-
-        color_patches = []
-        qc_patches = []
-        qc_incoming_patches = []
-        qc_automatic_patches = []
-        qc_manual_patches = []
-
-        for i, row in enumerate(self._parameter_data.iter_rows(named=True)):
-            key = (row["visit_key"], row["DEPH"])
-
-            if key not in updated_map:
-                continue
+        patches = {}
+        for key, flags in updated_values.iter_flags():
+            for i in self._row_indices.get(key, []):
+                for field, patch in qc_patches(i, flags, self._text_labels).items():
+                    patches.setdefault(field, []).append(patch)
 
-            value = updated_map[key]
-            flags = value.qc
-
-            qc_str = f"{flags.total} ({flags.total.value})"
-            qc_incoming_str = f"{flags.incoming} ({flags.incoming.value})"
-            qc_automatic_str = f"{flags.total_automatic} {flags.total_automatic_name}"
-            qc_manual_str = f"{flags.manual} ({flags.manual.value})"
-
-            color = QC_FLAG_CSS_COLORS.get(flags.total)
-
-            color_patches.append((i, color))
-            qc_patches.append((i, qc_str))
-            qc_incoming_patches.append((i, qc_incoming_str))
-            qc_automatic_patches.append((i, qc_automatic_str))
-            qc_manual_patches.append((i, qc_manual_str))
-
-        if color_patches:
+        if patches:
             saved_indices = list(self._source.selected.indices)
-            self._applying_highlight = True
-
-            self._source.patch(
-                {
-                    "color": color_patches,
-                    "qc": qc_patches,
-                    "qc_incoming": qc_incoming_patches,
-                    "qc_automatic": qc_automatic_patches,
-                    "qc_manual": qc_manual_patches,
-                }
-            )
+            self._source.patch(patches)
             if saved_indices:
                 self._source.selected.indices = saved_indices
-            self._applying_highlight = False
 
-    def _on_values_selected(self):
-        self._applying_highlight = True
-        if self._parameter_data is None:
-            self._source.selected.indices = []
-        else:
-            selected = self._manual_qc_model.selected_values
-            self._source.selected.indices = [
-                i
-                for i, row in enumerate(self._parameter_data.iter_rows(named=True))
-                if any(
-                    row["visit_key"] == value._data["visit_key"]
-                    and row["parameter"] == value._data["parameter"]
-                    and row["DEPH"] == value._data["DEPH"]
-                    for value in selected
-                )
-            ]
-        self._applying_highlight = False
-
-    def select_values(self, rows):
-        selected_values = [
-            Parameter(self._parameter_data.row(n, named=True)) for n in rows
-        ]
-        self._statistics_source.selected.indices = []
-        if not self._clear_called:
-            self._manual_qc_model.set_selected_values(selected_values)
-
-    def _on_value_selected(self, attr, old, new):
-        if not self._applying_highlight:
-            self.select_values(new)
+        self._text_labels.sync_formatter(self._text_formatter)
 
     def update_statistics(self, parameter_statistics, water_depth):
         if parameter_statistics is None:
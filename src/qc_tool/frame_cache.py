@@ -0,0 +1,54 @@
+from collections.abc import Hashable, Iterator, MutableMapping
+
+import numpy as np
+import polars as pl
+
+from qc_tool.models.memory_model import MemoryModel
+
+
+def estimated_size(value) -> int:
+    """Estimated number of bytes held by frames and arrays in the value."""
+    if isinstance(value, pl.DataFrame | pl.Series):
+        return int(value.estimated_size())
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, dict):
+        return sum(map(estimated_size, value.values()))
+    if isinstance(value, list | tuple):
+        return sum(map(estimated_size, value))
+    return 0
+
+
+class FrameCache(MutableMapping):
+    """Dictionary whose entries are evicted by the memory model of the session when
+    the caches of the session use more memory than the budget."""
+
+    def __init__(self, memory_model: MemoryModel):
+        self._memory_model = memory_model
+        self._entries = {}
+
+    def __getitem__(self, key: Hashable):
+        value = self._entries[key]
+        self._memory_model.touch(self, key)
+        return value
+
+    def __setitem__(self, key: Hashable, value):
+        self._entries[key] = value
+        self._memory_model.add(self, key, estimated_size(value))
+
+    def __delitem__(self, key: Hashable):
+        del self._entries[key]
+        self._memory_model.remove(self, key)
+
+    def __iter__(self) -> Iterator:
+        return iter(self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key) -> bool:
+        return key in self._entries
+
+    def evict(self, key: Hashable):
+        self._entries.pop(key, None)
+        self._memory_model.remove(self, key)
@@ -0,0 +1,362 @@
+import time
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+import nodc_station
+import polars as pl
+from nodc_statistics import regions
+from sharkadm import (
+    adm_logger,
+    exporters,
+    multi_transformers,
+    transformers,
+    validators,
+)
+from sharkadm import (
+    controller as sharkadm_controller,
+)
+
+from qc_tool.automatic_qc import AUTOMATIC_QC_CACHE_SUFFIX, IncrementalAutomaticQc
+from qc_tool.data_transformation import expand_quality_flag_long, prepare_data
+from qc_tool.pipeline import (
+    Pipeline,
+    PipelineStage,
+    file_checkpoint_key,
+    file_path_key,
+)
+from qc_tool.projection import add_web_mercator_columns
+from qc_tool.validation_cache import (
+    ValidationCache,
+    package_version,
+    validator_version,
+    visit_hashes,
+)
+from qc_tool.validator_scheduler import ValidatorScheduler, ValidatorSpec
+
+# Increase when the stages change in a way that makes old checkpoints invalid
+CHECKPOINT_VERSION = 1
+
+TRANSFORMERS = (
+    (transformers.AddCtdKust, (), {}),
+    (transformers.PolarsRemoveNonDataLines, (), {}),
+    (transformers.PolarsReplaceCommaWithDot, (), {}),
+    (multi_transformers.DateTimePolars, (), {"strict": False}),
+    (multi_transformers.PositionPolars, (), {}),
+    (transformers.PolarsAddVisitKey, (), {}),
+    (transformers.PolarsAddPressure, (), {}),
+    (transformers.PolarsAddDensityWide, ("CTD",), {}),
+    (transformers.PolarsAddDensityWide, ("BTL",), {}),
+    (transformers.PolarsAddOxygenSaturationWide, ("CTD",), {}),
+    (transformers.PolarsAddOxygenSaturationWide, ("BTL",), {}),
+    (transformers.PolarsWideToLong, (), {}),
+    (transformers.PolarsMoveLessThanFlagRowFormat, (), {}),
+    (transformers.PolarsMoveLargerThanFlagRowFormat, (), {}),
+    (transformers.PolarsConvertFlagsToSDN, (), {}),
+    (transformers.PolarsAddAnalyseInfo, (), {}),
+    (transformers.PolarsAddLmqnt, (), {}),
+    (transformers.PolarsAddUncertainty, (), {}),
+    (transformers.PolarsRemoveColumns, ("COPY_VARIABLE.*",), {}),
+    (
+        transformers.PolarsMapperParameterColumn,
+        (),
+        {"import_column": "SHARKarchive"},
+    ),
+)
+
+_REPORTED_COLUMNS = (
+    "visit_year",
+    "water_depth_m",
+    "wind_speed_ms",
+    "air_temperature_degc",
+    "air_pressure_hpa",
+    "sample_depth_m",
+)
+_FLOAT_COLUMNS = [
+    "sample_latitude_dd",
+    "sample_longitude_dd",
+    "water_depth_m",
+    "wind_speed_ms",
+    "air_temperature_degc",
+    "air_pressure_hpa",
+    "sample_depth_m",
+    "value",
+]
+_INT_COLUMNS = [
+    "visit_year",
+    "visit_month",
+]
+
+POST_TRANSFORMERS = (
+    (transformers.AddColumnsWithPrefix, (_REPORTED_COLUMNS, "reported"), {}),
+    (transformers.PolarsAddFloatColumns, (_FLOAT_COLUMNS, _FLOAT_COLUMNS), {}),
+    (transformers.PolarsAddIntColumns, (_INT_COLUMNS, _INT_COLUMNS), {}),
+)
+
+
+class FileLoadPipeline(Pipeline):
+    """All steps needed to turn a delivered data file into the dataset used by qc-tool.
+
+    The pipeline has no dependencies on models or views and can be used without the
+    GUI:
+
+        pipeline = FileLoadPipeline(ocean_shapefile, lambda: geo_info)
+        data = pipeline.load(Path("data.txt"))
+        validation_log = pipeline.validation_log
+    """
+
+    READ = "read"
+    SHARKADM_TRANSFORMERS = "sharkadm_transformers"
+    SHARKADM_VALIDATORS = "sharkadm_validators"
+    SHARKADM_POST_TRANSFORMERS = "sharkadm_post_transformers"
+    EXPORT = "export"
+    SEA_BASINS = "sea_basins"
+    PREPARE = "prepare"
+    AUTOMATIC_QC = "automatic_qc"
+    EXPAND_QUALITY_FLAGS = "expand_quality_flags"
+    WEB_MERCATOR = "web_mercator"
+
+    def __init__(
+        self,
+        ocean_shapefile,
+        geo_info: Callable[[], Any],
+        checkpoint_directory: Path | None = None,
+    ):
+        self._ocean_shapefile = ocean_shapefile
+        self._geo_info = geo_info
+        self._validator_scheduler: ValidatorScheduler | None = None
+        self._validation_cache = ValidationCache()
+        self._validation_state = None
+        self._automatic_qc = IncrementalAutomaticQc(checkpoint_directory)
+        self._automatic_qc_key = None
+        super().__init__(
+            (
+                PipelineStage(self.READ, self._read),
+                PipelineStage(self.SHARKADM_TRANSFORMERS, self._apply_transformers),
+                PipelineStage(self.SHARKADM_VALIDATORS, self._run_validators),
+                PipelineStage(
+                    self.SHARKADM_POST_TRANSFORMERS, self._apply_post_transformers
+                ),
+                PipelineStage(self.EXPORT, self._export, checkpoint=True),
+                PipelineStage(self.SEA_BASINS, self._match_sea_basins),
+                PipelineStage(self.PREPARE, prepare_data),
+                PipelineStage(self.AUTOMATIC_QC, self._run_automatic_qc, checkpoint=True),
+                PipelineStage(self.EXPAND_QUALITY_FLAGS, expand_quality_flag_long),
+                PipelineStage(self.WEB_MERCATOR, add_web_mercator_columns),
+            ),
+            checkpoint_directory,
+            # The automatic QC cache shares the checkpoint directory
+            cache_suffixes=(AUTOMATIC_QC_CACHE_SUFFIX,),
+        )
+
+    def load(self, file_path: Path, skip: Iterable[str] = ()) -> pl.DataFrame | None:
+        file_path = Path(file_path)
+        checkpoint_key = None
+        if file_path.exists():
+            checkpoint_key = file_checkpoint_key(
+                file_path,
+                CHECKPOINT_VERSION,
+                pl.__version__,
+                package_version("sharkadm"),
+                package_version("ocean-data-qc"),
+            )
+
+        # Processed data is reused for unchanged visits when the file has been modified
+        self._automatic_qc_key = file_path_key(
+            file_path,
+            CHECKPOINT_VERSION,
+            pl.__version__,
+            package_version("ocean-data-qc"),
+        )
+
+        t0 = time.perf_counter()
+        data = self.run(file_path, checkpoint_key=checkpoint_key, skip=skip)
+        t1 = time.perf_counter()
+        print(f"Load pipeline finished ({t1 - t0:.3f} s.)")
+        self.print_metrics()
+        return data
+
+    @property
+    def validation_log(self) -> list[dict]:
+        return self.artifacts.get("validation_log", [])
+
+    @staticmethod
+    def _read(file_path: Path):
+        adm_logger.reset_log()
+        try:
+            return sharkadm_controller.get_polars_controller_with_data(file_path)
+        except Exception:  # noqa: BLE001
+            # Catching exceptions this broadly is not recommended, but sharkadm does not
+            # guarantee a specific exception.
+            return None
+
+    @staticmethod
+    def _apply_transformers(controller):
+        print("Running SHARKadm transformers...")
+        t0 = time.perf_counter()
+        for transformer, args, kwargs in TRANSFORMERS:
+            tn_0 = time.perf_counter()
+            controller.transform(transformer(*args, **kwargs))
+            tn_1 = time.perf_counter()
+            print(f"\t{transformer.__name__}: {tn_1 - tn_0:.3f} s.")
+
+        t1 = time.perf_counter()
+        print(f"SHARKadm transformers finished ({t1 - t0:.3f} s.)")
+        return controller
+
+    def _define_validators_and_parameters(self) -> tuple[ValidatorSpec, ...]:
+        return (
+            ValidatorSpec(validators.ValidateCommonValuesByVisit),
+            ValidatorSpec(
+                validators.ValidateCoordinatesDm,
+                {
+                    "latitude_dm_column": "visit_reported_latitude",
+                    "longitude_dm_column": "visit_reported_longitude",
+                },
+            ),
+            ValidatorSpec(validators.ValidateDateAndTime),
+            # Shares the ocean shapefile with the rest of the tool
+            ValidatorSpec(
+                validators.ValidatePositionInOcean,
+                {
+                    "ocean_shapefile": self._ocean_shapefile,
+                    "station_name_key": "reported_station_name",
+                    "latitude_key": "sample_sweref99tm_y",
+                    "longitude_key": "sample_sweref99tm_x",
+                },
+                independent=False,
+            ),
+            ValidatorSpec(validators.ValidateWaterDepth),
+            ValidatorSpec(validators.ValidateSampleDepth),
+            ValidatorSpec(validators.ValidateSecchiDepth),
+            # Compares visits with each other
+            ValidatorSpec(validators.ValidateSerialNumber, per_visit=False),
+            # Compares visits with each other
+            ValidatorSpec(validators.ValidateSpeed, per_visit=False),
+            # Uses the shared station object from nodc_station
+            ValidatorSpec(
+                validators.ValidateStationIdentity,
+                {
+                    "stations": nodc_station.get_station_object(case_sensitive=False),
+                    "latitude_key": "sample_sweref99tm_y",
+                    "longitude_key": "sample_sweref99tm_x",
+                },
+                independent=False,
+            ),
+            ValidatorSpec(validators.ValidateWindir),
+            ValidatorSpec(validators.ValidateWinsp),
+            ValidatorSpec(validators.ValidateAirtemp),
+            ValidatorSpec(validators.ValidateAirpres),
+            ValidatorSpec(validators.ValidateWeath),
+            ValidatorSpec(validators.ValidateCloud),
+            ValidatorSpec(validators.ValidateWeatherConsistency),
+            ValidatorSpec(validators.ValidateWaves),
+            ValidatorSpec(validators.ValidateIceob),
+        )
+
+    def _run_validators(self, controller):
+        print("Running SHARKadm validators...")
+        t0 = time.perf_counter()
+        self._validator_scheduler = ValidatorScheduler(
+            self._define_validators_and_parameters(), logger=adm_logger
+        )
+
+        data = controller.data
+        version = validator_version(self._validator_scheduler.per_visit_validators)
+        hashes = visit_hashes(data)
+        cached_visits = self._validation_cache.cached_visits(hashes, version)
+        new_visits = set(hashes) - cached_visits
+        self._validation_state = (data, hashes, version, new_visits, cached_visits)
+        print(f"\tCached validation for {len(cached_visits)} of {len(hashes)} visits")
+
+        self._validator_scheduler.run(controller, new_visits if cached_visits else None)
+        for name, seconds in self._validator_scheduler.timings.items():
+            print(f"\t{name}: {seconds:.3f} s.")
+
+        t1 = time.perf_counter()
+        print(f"SHARKadm validators finished ({t1 - t0:.3f} s.)")
+        return controller
+
+    @staticmethod
+    def _apply_post_transformers(controller):
+        print("Running SHARKadm post transformers...")
+        t0 = time.perf_counter()
+        for transformer, args, kwargs in POST_TRANSFORMERS:
+            tn_0 = time.perf_counter()
+            controller.transform(transformer(*args, **kwargs))
+            tn_1 = time.perf_counter()
+            print(f"\t{transformer.__name__}: {tn_1 - tn_0:.3f} s.")
+
+        t1 = time.perf_counter()
+        print(f"SHARKadm post transformers finished ({t1 - t0:.3f} s.)")
+        return controller
+
+    def _export(self, controller):
+        adm_logger.filter(log_types=[adm_logger.VALIDATION], level=">warning")
+        validation_log = list(adm_logger.data)
+        if self._validation_state:
+            data, hashes, version, new_visits, cached_visits = self._validation_state
+            self._validation_cache.store(
+                validation_log,
+                data,
+                hashes,
+                version,
+                new_visits,
+                self._validator_scheduler.per_visit_validators,
+            )
+            validation_log += self._validation_cache.entries(
+                hashes, version, cached_visits
+            )
+            self._validation_state = None
+        if self._validator_scheduler:
+            validation_log = self._validator_scheduler.order_log(validation_log)
+        self.artifacts["validation_log"] = validation_log
+        return controller.export(
+            exporters.PolarsDataFrame(header_as="PhysicalChemical", float_columns=False)
+        )
+
+    def _match_sea_basins(self, data):
+        geo_info = self._geo_info()
+
+        print("Matching sea basins...")
+        t0 = time.perf_counter()
+        # Step 1: Extract unique positions and create decimal degree columns
+        unique_positions = data.select(
+            ["sample_longitude_dd", "sample_latitude_dd"]
+        ).unique()
+
+        # Step 2: Call the bulk function
+        positions_dd = [
+            (lon, lat)
+            for lon, lat in unique_positions.select(
+                ["sample_longitude_dd", "sample_latitude_dd"]
+            ).to_numpy()
+        ]
+        basins_dict = regions.sea_basins_for_positions(positions_dd, geo_info=geo_info)
+        basins = pl.DataFrame(basins_dict).rename(
+            {"LONGI_DD": "sample_longitude_dd", "LATIT_DD": "sample_latitude_dd"}
+        )
+
+        # Step 3: Join the sea_basins back to the unique positions, drop DD columns
+        positions_with_basins = unique_positions.join(
+            basins, on=["sample_longitude_dd", "sample_latitude_dd"], how="left"
+        )
+
+        # Step 4: Join back to the original data
+        data = data.join(
+            positions_with_basins,
+            on=["sample_longitude_dd", "sample_latitude_dd"],
+            how="left",
+        )
+
+        t1 = time.perf_counter()
+        print(f"Matching sea basins finished ({t1 - t0:.3f} s.)")
+
+        return data
+
+    def _run_automatic_qc(self, data):
+        print("Automatic QC started...")
+        t0 = time.perf_counter()
+        data = self._automatic_qc.run(data, self._automatic_qc_key)
+        t1 = time.perf_counter()
+        print(f"Automatic QC finished ({t1 - t0:.3f} s.)")
+        return data
@@ -0,0 +1,51 @@
+"""Validation log as a table with one row per message.
+
+Only messages of the levels in `LOG_LEVELS` are included. The `log_id` of a message is
+the position of its entry in the validation log."""
+
+import polars as pl
+
+LOG_LEVELS = ("error", "warning", "critical")
+
+LOG_SCHEMA = {
+    "log_id": pl.UInt32,
+    "validator": pl.String,
+    "cls": pl.String,
+    "level": pl.String,
+    "column": pl.String,
+    "msg": pl.String,
+}
+
+
+def log_frame(log: list[dict], offset: int = 0) -> pl.DataFrame:
+    """Messages of the log entries, with ids starting at offset."""
+    return pl.DataFrame(
+        {
+            "log_id": range(offset, offset + len(log)),
+            "validator": [entry.get("validator", "no validator") for entry in log],
+            "cls": [entry.get("cls") for entry in log],
+            "level": [entry.get("level", "info") for entry in log],
+            "column": [entry.get("column") or "General" for entry in log],
+            "msg": [str(entry.get("msg", "")) for entry in log],
+        },
+        schema=LOG_SCHEMA,
+    ).filter(pl.col("level").is_in(LOG_LEVELS))
+
+
+def filter_log(
+    frame: pl.DataFrame,
+    validator: str | None = None,
+    level: str | None = None,
+    column: str | None = None,
+) -> pl.DataFrame:
+    """Messages matching the given values, None matches all messages."""
+    conditions = [
+        pl.col(name) == value
+        for name, value in (
+            ("validator", validator),
+            ("level", level),
+            ("column", column),
+        )
+        if value is not None
+    ]
+    return frame.filter(*conditions) if conditions else frame
@@ -11,13 +11,14 @@ from qc_tool.views.main_view import MainView
 
 class QcTool:
     def __init__(self):
-        app_state = AppState()
+        arguments = self._parse_arguments()
+        app_state = AppState(cache_budget_mb=arguments.cache_budget)
         main_controller = MainController(app_state)
         main_view = MainView(main_controller, app_state)
         curdoc().title = "QC Tool"
         curdoc().add_root(main_view.layout)
 
-        startup_file = self._parse_startup_file()
+        startup_file = arguments.file
         if startup_file:
             file_controller = main_controller.summary_controller.file_controller
             curdoc().add_next_tick_callback(
@@ -25,11 +26,12 @@ class QcTool:
             )
 
     @staticmethod
-    def _parse_startup_file():
+    def _parse_arguments():
         parser = argparse.ArgumentParser()
         parser.add_argument("--file", type=Path)
+        parser.add_argument("--cache-budget", type=int)
         args, _ = parser.parse_known_args(sys.argv[1:])
-        return args.file
+        return args
 
 
 QcTool()
@@ -0,0 +1,45 @@
+"""Grid clustering of map points.
+
+Points are grouped by the cell of a square grid that they fall in. Each cluster is
+placed at the mean position of its points and has the worst status of its points."""
+
+import numpy as np
+
+# Maps with more points than this in the shown area show clusters instead of points
+CLUSTER_MIN_POINTS = 1_000
+
+# Number of grid cells across the width of the shown area
+CLUSTER_GRID_CELLS = 30
+
+
+def grid_clusters(
+    x: np.ndarray, y: np.ndarray, status: np.ndarray, cell_size: float
+) -> dict[str, np.ndarray]:
+    """Clusters of the points with the mean position, number of points and largest
+    status code of each cell. Points with NaN coordinates are left out."""
+    finite = np.isfinite(x) & np.isfinite(y)
+    x = x[finite]
+    y = y[finite]
+    status = status[finite]
+    if not len(x):
+        return {
+            "x": np.empty(0),
+            "y": np.empty(0),
+            "count": np.empty(0, dtype=np.int64),
+            "status": np.empty(0, dtype=status.dtype),
+        }
+
+    columns = np.floor(x / cell_size).astype(np.int64)
+    rows = np.floor(y / cell_size).astype(np.int64)
+    columns -= columns.min()
+    rows -= rows.min()
+    cells = columns * (rows.max() + 1) + rows
+    _, cluster, count = np.unique(cells, return_inverse=True, return_counts=True)
+    worst_status = np.zeros(len(count), dtype=status.dtype)
+    np.maximum.at(worst_status, cluster, status)
+    return {
+        "x": np.bincount(cluster, weights=x) / count,
+        "y": np.bincount(cluster, weights=y) / count,
+        "count": count,
+        "status": worst_status,
+    }
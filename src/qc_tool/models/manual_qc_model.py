@@ -1,7 +1,7 @@
-from ocean_data_qc.fyskem.parameter import Parameter
 from ocean_data_qc.fyskem.qc_flag import QcFlag
 
 from qc_tool.models.base_model import BaseModel
+from qc_tool.value_selection import ValueSelection
 
 
 class ManualQcModel(BaseModel):
@@ -12,12 +12,12 @@ class ManualQcModel(BaseModel):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self._selected_values: list[Parameter] = []
+        self._selected_values = ValueSelection()
         self._comment_category: str = ""
         self._comment: str = ""
 
     @property
-    def selected_values(self) -> list[Parameter]:
+    def selected_values(self) -> ValueSelection:
         return self._selected_values
 
     @property
@@ -28,11 +28,11 @@ class ManualQcModel(BaseModel):
     def comment(self) -> str:
         return self._comment
 
-    def set_selected_values(self, values: list[Parameter]):
+    def set_selected_values(self, values: ValueSelection):
         self._selected_values = values
         self._notify_listeners(self.VALUES_SELECTED)
 
-    def set_values_from_filter(self, values: list[Parameter]):
+    def set_values_from_filter(self, values: ValueSelection):
         self._selected_values = values
         self._notify_listeners(self.VALUES_SELECTED)
 
@@ -44,16 +44,11 @@ class ManualQcModel(BaseModel):
             return
         self._comment_category = category
         self._comment = comment
-        for value in self._selected_values:
-            value.qc.manual = flag
-            value._data["MANUAL_QC_CATEGORY"] = category
-            value._data["MANUAL_QC_COMMENT"] = comment
+        self._selected_values.set_manual_flag(flag, category, comment)
         self._notify_listeners(self.QC_PERFORMED)
 
     def deselect_value(self, index: int):
-        self._selected_values = [
-            v for i, v in enumerate(self._selected_values) if i != index
-        ]
+        self._selected_values = self._selected_values.without(index)
         self._notify_listeners(self.VALUES_SELECTED)
 
     def _restore_selection(self):
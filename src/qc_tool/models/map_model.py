@@ -1,29 +1,89 @@
+import numpy as np
+import polars as pl
+from bokeh.models import CDSView, IndexFilter
 from bokeh.models.sources import ColumnDataSource
 
 from qc_tool.models.base_model import BaseModel
 
 
 class MapModel(BaseModel):
+    NO_ISSUES = "no issues"
+    METADATA_ERROR = "metadata error"
+    # Ordered from best to worst
+    STATUSES = (NO_ISSUES, METADATA_ERROR)
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
+        self._points = pl.DataFrame(
+            schema={"visit_key": pl.String, "x": pl.Float64, "y": pl.Float64}
+        )
+        self._row_by_key = {}
         self._data_source = ColumnDataSource(
             data={
-                "latitudes": [],
-                "longitudes": [],
-                "visit_keys": [],
-                "color": [],
-                "status": [],
+                "x": np.array([], dtype=np.float64),
+                "y": np.array([], dtype=np.float64),
+                "visit_keys": np.array([], dtype=object),
+                "status": np.array([], dtype=object),
             },
         )
+        # Only the points of visits that match the filter are shown
+        self._view = CDSView(filter=IndexFilter(indices=[]))
+        self._coastline_source = ColumnDataSource(data={"xs": [], "ys": []})
+
+    def set_points(self, points: pl.DataFrame):
+        """Set the points of all visits, with `visit_key` and the `x` and `y`
+        coordinates in EPSG:3857. All points are shown and have no issues."""
+        self._points = points
+        self._row_by_key = {key: row for row, key in enumerate(points["visit_key"])}
+        self._data_source.data = {
+            "x": points["x"].to_numpy(),
+            "y": points["y"].to_numpy(),
+            "visit_keys": points["visit_key"].to_numpy(),
+            "status": np.full(points.height, self.NO_ISSUES, dtype=object),
+        }
+        self._view.filter.indices = np.arange(points.height, dtype=np.int32)
+
+    def set_coastline(self, coastline: dict):
+        self._coastline_source.data = coastline
 
-    def set_points(self, points):
-        self._data_source.data = points
+    def set_visible(self, visit_keys):
+        self._view.filter.indices = np.flatnonzero(
+            self._points["visit_key"].is_in(list(visit_keys)).to_numpy()
+        ).astype(np.int32)
+
+    def set_issues(self, has_issue: np.ndarray):
+        """Set the status of the points from a mask of the visits with issues."""
+        status = np.where(has_issue, self.METADATA_ERROR, self.NO_ISSUES).astype(object)
+        if np.array_equal(status, self._data_source.data["status"]):
+            return
+        self._data_source.data["status"] = status
 
     def set_selection(self, visit_keys: list[str]):
         self._data_source.selected.indices = [
-            self._data_source.data["visit_keys"].index(key) for key in visit_keys
+            self._row_by_key[key] for key in visit_keys if key in self._row_by_key
         ]
 
+    @property
+    def points(self) -> pl.DataFrame:
+        return self._points
+
+    @property
+    def status_codes(self) -> np.ndarray:
+        """Position of the status of each point in `STATUSES`."""
+        return (self._data_source.data["status"] == self.METADATA_ERROR).astype(np.uint8)
+
+    @property
+    def visible_rows(self) -> np.ndarray:
+        return np.asarray(self._view.filter.indices)
+
     @property
     def unselected(self):
         return self._data_source
+
+    @property
+    def view(self) -> CDSView:
+        return self._view
+
+    @property
+    def coastline(self) -> ColumnDataSource:
+        return self._coastline_source
@@ -0,0 +1,63 @@
+import os
+from collections import OrderedDict
+from typing import Hashable
+
+from qc_tool.models.base_model import BaseModel
+
+CACHE_BUDGET_ENVIRONMENT_VARIABLE = "QC_TOOL_CACHE_BUDGET_MB"
+DEFAULT_CACHE_BUDGET_MB = 1024
+
+
+def default_cache_budget_mb() -> int:
+    return int(os.environ.get(CACHE_BUDGET_ENVIRONMENT_VARIABLE, DEFAULT_CACHE_BUDGET_MB))
+
+
+class MemoryModel(BaseModel):
+    """Estimated memory used by the caches of a session.
+
+    Entries of all caches are kept in least recently used order. When the total size
+    is above the budget, the least recently used entries are evicted from their
+    caches."""
+
+    USAGE_CHANGED = "USAGE_CHANGED"
+
+    def __init__(self, budget_mb: int, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._budget = budget_mb * 1024 * 1024
+        self._used = 0
+        self._entries: OrderedDict[tuple[int, Hashable], int] = OrderedDict()
+        self._caches = {}
+
+    @property
+    def budget(self) -> int:
+        return self._budget
+
+    @property
+    def used(self) -> int:
+        return self._used
+
+    def add(self, cache, key: Hashable, size: int):
+        self._caches[id(cache)] = cache
+        self._remove_entry((id(cache), key))
+        self._entries[(id(cache), key)] = size
+        self._used += size
+        # The added entry is kept even if it is larger than the budget
+        while self._used > self._budget and len(self._entries) > 1:
+            (cache_id, evicted_key), _ = next(iter(self._entries.items()))
+            self._caches[cache_id].evict(evicted_key)
+        self._notify_listeners(self.USAGE_CHANGED)
+
+    def touch(self, cache, key: Hashable):
+        if (id(cache), key) in self._entries:
+            self._entries.move_to_end((id(cache), key))
+
+    def remove(self, cache, key: Hashable):
+        if self._remove_entry((id(cache), key)):
+            self._notify_listeners(self.USAGE_CHANGED)
+
+    def _remove_entry(self, entry: tuple[int, Hashable]) -> bool:
+        size = self._entries.pop(entry, None)
+        if size is None:
+            return False
+        self._used -= size
+        return True
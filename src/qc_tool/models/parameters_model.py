@@ -1,4 +1,6 @@
+from qc_tool.frame_cache import FrameCache
 from qc_tool.models.base_model import BaseModel
+from qc_tool.models.memory_model import MemoryModel
 
 
 class ParametersModel(BaseModel):
@@ -41,12 +43,12 @@ class ParametersModel(BaseModel):
         "PH_LAB + PH_TOT",
     )
 
-    def __init__(self, *args, **kwargs):
+    def __init__(self, memory_model: MemoryModel, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self._available_parameters = set()
         self._available_multi_parameters = set()
         self._selected_parameters = []
-        self._parameter_data = {}
+        self._parameter_data = FrameCache(memory_model)
 
     @property
     def available_parameters(self):
@@ -94,5 +96,5 @@ class ParametersModel(BaseModel):
         self.selected_parameters = list(self._default_parameters)
 
     def reset_parameter_data(self):
-        self._parameter_data = {}
+        self._parameter_data.clear()
         self._notify_listeners(self.NEW_PARAMETER_DATA)
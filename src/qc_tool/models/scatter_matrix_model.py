@@ -0,0 +1,54 @@
+from qc_tool.models.base_model import BaseModel
+
+physical_parameters = (
+    "SALT_CTD",
+    "SALT_BTL",
+    "TEMP_CTD",
+    "TEMP_BTL",
+    "DOXY_CTD",
+    "DOXY_BTL",
+    "H2S",
+    "CHLFL",
+)
+
+chemical_parameters = (
+    "SIO3-SI",
+    "PHOS",
+    "PTOT",
+    "NTOT",
+    "AMON",
+    "NTRI",
+    "NTRA",
+    "NTRZ",
+)
+
+biological_parameters = ("CPHL", "CHLFL", "PH_LAB", "PH_TOT", "ALKY", "HUMUS")
+
+PARAMETER_SETS = {
+    "Chemical": chemical_parameters,
+    "Physical": physical_parameters,
+    "Biological": biological_parameters,
+}
+
+
+class ScatterMatrixModel(BaseModel):
+    PARAMETER_SET_CHANGED = "PARAMETER_SET_CHANGED"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._parameter_set = next(iter(PARAMETER_SETS))
+
+    @property
+    def parameter_set(self) -> str:
+        return self._parameter_set
+
+    @parameter_set.setter
+    def parameter_set(self, parameter_set: str):
+        if parameter_set == self._parameter_set:
+            return
+        self._parameter_set = parameter_set
+        self._notify_listeners(self.PARAMETER_SET_CHANGED)
+
+    @property
+    def parameters(self) -> tuple[str, ...]:
+        return PARAMETER_SETS[self._parameter_set]
@@ -0,0 +1,25 @@
+from qc_tool.models.base_model import BaseModel
+
+
+class TabsModel(BaseModel):
+    ACTIVE_TAB_CHANGED = "ACTIVE_TAB_CHANGED"
+
+    PROFILES = "PROFILES"
+    FILTERED_PROFILES = "FILTERED_PROFILES"
+    SCATTER = "SCATTER"
+    SCATTER_MATRIX = "SCATTER_MATRIX"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._active_tab = self.PROFILES
+
+    @property
+    def active_tab(self) -> str:
+        return self._active_tab
+
+    @active_tab.setter
+    def active_tab(self, active_tab: str):
+        if active_tab == self._active_tab:
+            return
+        self._active_tab = active_tab
+        self._notify_listeners(self.ACTIVE_TAB_CHANGED)
@@ -1,34 +1,88 @@
-from collections import defaultdict
+import polars as pl
 
-from qc_tool.data_transformation import collect_log_messages
+from qc_tool.data_transformation import LogMessageAggregator
+from qc_tool.log_frame import LOG_SCHEMA, filter_log, log_frame
 from qc_tool.models.base_model import BaseModel
 
 
 class ValidationLogModel(BaseModel):
     NEW_VALIDATION_LOG = "NEW_VALIDATION_LOG"
+    LOG_PAGE_CHANGED = "LOG_PAGE_CHANGED"
+
+    # Messages sent to the browser at a time
+    PAGE_SIZE = 100
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self._validation_log = []
-        self._validation_remarks = defaultdict(
-            lambda: {
-                "fail": defaultdict(list),
-                "success": defaultdict(list),
-            }
-        )
+        self._log_message_aggregator = LogMessageAggregator()
+        self._log_frame = pl.DataFrame(schema=LOG_SCHEMA)
+        self._log_filter = {"validator": None, "level": None, "column": None}
+        self._filtered_log = self._log_frame
+        self._page = 0
 
     def set_validation_log(self, validation_log, add_to_existing: bool = False):
         if add_to_existing and self._validation_log is not None:
+            new_log_frame = log_frame(validation_log, offset=len(self._validation_log))
             self._validation_log.extend(validation_log)
+            self._log_frame = pl.concat([self._log_frame, new_log_frame])
+            # Only the new messages are added to the existing groups
+            self._log_message_aggregator.add(new_log_frame)
         else:
             self._validation_log = validation_log
-        self._validation_remarks = collect_log_messages(self._validation_log)
+            self._log_frame = log_frame(validation_log)
+            self._log_filter = {"validator": None, "level": None, "column": None}
+            self._log_message_aggregator = LogMessageAggregator()
+            self._log_message_aggregator.add(self._log_frame)
+        self._filter_log()
         self._notify_listeners(self.NEW_VALIDATION_LOG)
 
+    def set_log_filter(
+        self,
+        validator: str | None = None,
+        level: str | None = None,
+        column: str | None = None,
+    ):
+        self._log_filter = {"validator": validator, "level": level, "column": column}
+        self._filter_log()
+        self._notify_listeners(self.LOG_PAGE_CHANGED)
+
+    def set_page(self, page: int):
+        self._page = min(max(page, 0), self.page_count - 1)
+        self._notify_listeners(self.LOG_PAGE_CHANGED)
+
+    def _filter_log(self):
+        self._filtered_log = filter_log(self._log_frame, **self._log_filter)
+        self._page = 0
+
     @property
     def validation_log(self):
         return self._validation_log
 
     @property
     def validation_remarks(self):
-        return self._validation_remarks
+        return self._log_message_aggregator.log_messages
+
+    @property
+    def log_frame(self) -> pl.DataFrame:
+        return self._log_frame
+
+    @property
+    def log_filter(self) -> dict[str, str | None]:
+        return self._log_filter
+
+    @property
+    def filtered_log(self) -> pl.DataFrame:
+        return self._filtered_log
+
+    @property
+    def page(self) -> int:
+        return self._page
+
+    @property
+    def page_count(self) -> int:
+        return max(-(-self._filtered_log.height // self.PAGE_SIZE), 1)
+
+    @property
+    def page_rows(self) -> pl.DataFrame:
+        return self._filtered_log.slice(self._page * self.PAGE_SIZE, self.PAGE_SIZE)
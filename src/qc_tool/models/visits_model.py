@@ -1,3 +1,5 @@
+import polars as pl
+
 from qc_tool.models.base_model import BaseModel
 from qc_tool.models.filter_model import FilterModel
 from qc_tool.visit import Visit
@@ -15,10 +17,12 @@ class VisitsModel(BaseModel):
         self._visits: dict[str, Visit] = {}
         self._filtered_visit_keys = None
         self._selected_visit = None
+        self._visits_with_issues = pl.Series("visit_key", [], dtype=pl.String)
 
     def set_visits(self, visits: dict[str, Visit]):
         self._visits = visits
         self._filtered_visit_keys = None
+        self._visits_with_issues = pl.Series("visit_key", [], dtype=pl.String)
         if self._visits:
             self._notify_listeners(self.NEW_VISITS)
 
@@ -31,6 +35,12 @@ class VisitsModel(BaseModel):
         self._visits[visit_key] = visit
         self._selected_visit = visit
 
+    def set_feedback(self, visits_with_issues: pl.Series):
+        """Set the keys of the visits with issues after the validation logs have been
+        attached to the visits."""
+        self._visits_with_issues = visits_with_issues
+        self._notify_listeners(self.FEEDBACK_READY)
+
     def set_visit(self, visit: Visit | None):
         self._selected_visit = visit
         self._notify_listeners(self.VISIT_SELECTED)
@@ -60,6 +70,15 @@ class VisitsModel(BaseModel):
             if key in self._filtered_visit_keys
         }
 
+    @property
+    def visits_with_issues(self) -> pl.Series:
+        return self._visits_with_issues
+
+    @property
+    def all_visits(self) -> dict[str, Visit]:
+        """All visits, also the ones that do not match the filter."""
+        return self._visits
+
     def visit_by_index(self, index: int):
         return list(self._visits.values())[index]
 
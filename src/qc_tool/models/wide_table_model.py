@@ -0,0 +1,44 @@
+import polars as pl
+from ocean_data_qc.fyskem.qc_flag import QcFlag
+from ocean_data_qc.fyskem.qc_flags import QcFlags
+
+from qc_tool.models.base_model import BaseModel
+from qc_tool.value_selection import ValueSelection
+from qc_tool.wide_table import WideTable
+
+
+class WideTableModel(BaseModel):
+    NEW_TABLE = "NEW_TABLE"
+    FLAGS_UPDATED = "FLAGS_UPDATED"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._table = None
+
+    @property
+    def table(self) -> WideTable | None:
+        return self._table
+
+    def set_data(self, data: pl.DataFrame | None):
+        """Pivot the values of a new dataset to a new wide table."""
+        if data is None:
+            self._table = None
+        else:
+            if "quality_flag_long" not in data.columns:
+                flags = {
+                    flag: str(QcFlags(QcFlag.parse(flag), None, None, None))
+                    for flag in data["quality_flag"].unique()
+                }
+                data = data.with_columns(
+                    pl.col("quality_flag")
+                    .replace_strict(flags, return_dtype=pl.String)
+                    .alias("quality_flag_long")
+                )
+            self._table = WideTable(data)
+        self._notify_listeners(self.NEW_TABLE)
+
+    def update_flags(self, updated_values: ValueSelection):
+        if self._table is None:
+            return
+        self._table.update_flags(updated_values.data)
+        self._notify_listeners(self.FLAGS_UPDATED)
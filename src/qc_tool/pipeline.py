@@ -0,0 +1,287 @@
+import hashlib
+import os
+import pickle
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+import polars as pl
+
+CACHE_DIRECTORY_ENV = "QCTOOL_CACHE_DIR"
+
+# Least recently used checkpoints are removed when all checkpoints of a pipeline take
+# more space than this, or when they have not been used for this long
+CHECKPOINT_MAX_BYTES = 5_000_000_000
+CHECKPOINT_MAX_AGE = 30 * 24 * 60 * 60
+
+
+def default_cache_directory() -> Path:
+    if cache_directory := os.getenv(CACHE_DIRECTORY_ENV):
+        return Path(cache_directory)
+    return Path.home() / ".qc_tool" / "cache"
+
+
+@contextmanager
+def replaced_atomically(path: Path):
+    """Temporary path next to `path` that replaces `path` when the block exits without
+    an error, so a crash never leaves a partially written file behind. Every call gets
+    its own temporary file, since several server workers can write the same file."""
+    temporary_path = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        yield temporary_path
+        os.replace(temporary_path, path)
+    finally:
+        temporary_path.unlink(missing_ok=True)
+
+
+@dataclass(frozen=True)
+class PipelineStage:
+    name: str
+    function: Callable[[Any], Any]
+    checkpoint: bool = False
+
+
+@dataclass
+class StageMetrics:
+    name: str
+    status: str
+    seconds: float = 0.0
+    size_bytes: int | None = None
+
+
+class Pipeline:
+    """Runs a sequence of named stages where each stage is given the result of the
+    previous stage. A stage returning None aborts the run.
+
+    The result of a stage marked with `checkpoint` is written to the checkpoint directory
+    when the run is given a checkpoint key. A later run with the same key resumes after
+    the last stored checkpoint instead of starting from the first stage. Artifacts that
+    stages store in `artifacts` are saved and restored together with the checkpoint.
+
+    Checkpoints are uncompressed Arrow IPC files that are memory-mapped when restored,
+    so processes restoring the same checkpoint share its data in the page cache. The
+    least recently used checkpoints are removed when a checkpoint is written and the
+    checkpoints are too large or too old. Files that stages cache in the checkpoint
+    directory themselves are removed in the same way when their names end with one of
+    `cache_suffixes`."""
+
+    RUN = "run"
+    SKIPPED = "skipped"
+    RESTORED = "restored"
+
+    def __init__(
+        self,
+        stages: Iterable[PipelineStage],
+        checkpoint_directory: Path | None = None,
+        max_checkpoint_bytes: int = CHECKPOINT_MAX_BYTES,
+        max_checkpoint_age: float = CHECKPOINT_MAX_AGE,
+        cache_suffixes: Iterable[str] = (),
+    ):
+        self._stages = tuple(stages)
+        stage_names = [stage.name for stage in self._stages]
+        if len(set(stage_names)) != len(stage_names):
+            raise ValueError(f"Stage names must be unique: {stage_names}")
+
+        self._checkpoint_directory = checkpoint_directory
+        self._max_checkpoint_bytes = max_checkpoint_bytes
+        self._max_checkpoint_age = max_checkpoint_age
+        self._cache_suffixes = tuple(cache_suffixes)
+        self._metrics: list[StageMetrics] = []
+        self.artifacts: dict[str, Any] = {}
+
+    @property
+    def stage_names(self) -> list[str]:
+        return [stage.name for stage in self._stages]
+
+    @property
+    def metrics(self) -> list[StageMetrics]:
+        return self._metrics
+
+    def run(self, data, checkpoint_key: str | None = None, skip: Iterable[str] = ()):
+        skip = set(skip)
+        if unknown_stages := skip - set(self.stage_names):
+            raise ValueError(f"Unknown stages: {sorted(unknown_stages)}")
+
+        self._metrics = []
+        self.artifacts = {}
+
+        if checkpoint_key and skip:
+            # Checkpoints from runs that skipped other stages can not be reused
+            checkpoint_key = _hash_parts(checkpoint_key, *sorted(skip))
+
+        first_stage = 0
+        if checkpoint_key and self._checkpoint_directory:
+            first_stage, data = self._restore_checkpoint(checkpoint_key, data)
+
+        for n, stage in enumerate(self._stages):
+            if n < first_stage:
+                self._metrics.append(StageMetrics(stage.name, self.RESTORED))
+                continue
+            if stage.name in skip:
+                self._metrics.append(StageMetrics(stage.name, self.SKIPPED))
+                continue
+
+            t0 = time.perf_counter()
+            data = stage.function(data)
+            t1 = time.perf_counter()
+            self._metrics.append(
+                StageMetrics(stage.name, self.RUN, t1 - t0, _estimated_size(data))
+            )
+
+            if data is None:
+                return None
+
+            if stage.checkpoint and checkpoint_key and self._checkpoint_directory:
+                self._write_checkpoint(checkpoint_key, stage, data)
+
+        return data
+
+    def print_metrics(self):
+        for metrics in self._metrics:
+            if metrics.status != self.RUN:
+                print(f"\t{metrics.name}: {metrics.status}")
+                continue
+            size = (
+                f", {metrics.size_bytes / 1_000_000:.1f} MB"
+                if metrics.size_bytes is not None
+                else ""
+            )
+            print(f"\t{metrics.name}: {metrics.seconds:.3f} s.{size}")
+
+    def clear_checkpoints(self, checkpoint_key: str):
+        if not self._checkpoint_directory:
+            return
+        for stage in self._stages:
+            for path in self._checkpoint_paths(checkpoint_key, stage):
+                try:
+                    path.unlink(missing_ok=True)
+                except OSError as error:
+                    # A checkpoint can not be removed while it is mapped on Windows
+                    print(f"WARNING: Could not remove checkpoint {path.name}: {error}")
+
+    def _checkpoint_paths(self, checkpoint_key: str, stage: PipelineStage):
+        stem = f"{checkpoint_key}.{stage.name}"
+        return (
+            self._checkpoint_directory / f"{stem}.arrow",
+            self._checkpoint_directory / f"{stem}.artifacts.pickle",
+        )
+
+    def _write_checkpoint(self, checkpoint_key: str, stage: PipelineStage, data):
+        if not isinstance(data, pl.DataFrame):
+            raise TypeError(
+                f"Stage '{stage.name}' can only be checkpointed if it returns a "
+                f"polars DataFrame, got {type(data).__name__}"
+            )
+        data_path, artifacts_path = self._checkpoint_paths(checkpoint_key, stage)
+        try:
+            self._checkpoint_directory.mkdir(parents=True, exist_ok=True)
+            # The data is replaced after the artifacts it is restored with
+            with replaced_atomically(data_path) as temporary_data_path:
+                data.write_ipc(temporary_data_path, compression="uncompressed")
+                with (
+                    replaced_atomically(artifacts_path) as temporary_artifacts_path,
+                    temporary_artifacts_path.open("wb") as artifacts_file,
+                ):
+                    pickle.dump(self.artifacts, artifacts_file)
+        except OSError as error:
+            print(f"WARNING: Could not write checkpoint for '{stage.name}': {error}")
+            return
+        self._evict_checkpoints()
+
+    def _evict_checkpoints(self):
+        # The files of a stage checkpoint are removed together, cached files one at a
+        # time
+        suffixes = [
+            (stage.name, suffix)
+            for stage in self._stages
+            if stage.checkpoint
+            for suffix in (f".{stage.name}.arrow", f".{stage.name}.artifacts.pickle")
+        ] + [(suffix, suffix) for suffix in self._cache_suffixes]
+
+        checkpoints = {}
+        for name, suffix in suffixes:
+            for path in self._checkpoint_directory.glob(f"*{suffix}"):
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                checkpoint = checkpoints.setdefault(
+                    (path.name.removesuffix(suffix), name),
+                    {"paths": [], "size": 0, "last_used": 0.0},
+                )
+                checkpoint["paths"].append(path)
+                checkpoint["size"] += stat.st_size
+                checkpoint["last_used"] = max(checkpoint["last_used"], stat.st_mtime)
+
+        oldest_kept = time.time() - self._max_checkpoint_age
+        total_size = 0
+        # The most recently used checkpoint is always kept
+        for n, checkpoint in enumerate(
+            sorted(checkpoints.values(), key=lambda c: c["last_used"], reverse=True)
+        ):
+            total_size += checkpoint["size"]
+            if n == 0 or (
+                total_size <= self._max_checkpoint_bytes
+                and checkpoint["last_used"] >= oldest_kept
+            ):
+                continue
+            total_size -= checkpoint["size"]
+            for path in checkpoint["paths"]:
+                try:
+                    path.unlink(missing_ok=True)
+                except OSError as error:
+                    print(f"WARNING: Could not remove checkpoint {path.name}: {error}")
+
+    def _restore_checkpoint(self, checkpoint_key: str, data):
+        for n, stage in reversed(list(enumerate(self._stages))):
+            if not stage.checkpoint:
+                continue
+            data_path, artifacts_path = self._checkpoint_paths(checkpoint_key, stage)
+            if not (data_path.exists() and artifacts_path.exists()):
+                continue
+            try:
+                with artifacts_path.open("rb") as artifacts_file:
+                    artifacts = pickle.load(artifacts_file)
+                restored_data = pl.read_ipc(data_path, memory_map=True)
+            except (OSError, pickle.UnpicklingError, pl.exceptions.PolarsError) as error:
+                print(f"WARNING: Could not restore checkpoint '{stage.name}': {error}")
+                continue
+            self.artifacts = artifacts
+            # Mark the checkpoint as recently used
+            for path in (data_path, artifacts_path):
+                try:
+                    os.utime(path)
+                except OSError:
+                    pass
+            print(f"Resuming after checkpoint '{stage.name}'")
+            return n + 1, restored_data
+        return 0, data
+
+
+def _estimated_size(data) -> int | None:
+    if isinstance(data, pl.DataFrame):
+        return data.estimated_size()
+    if isinstance(nested_data := getattr(data, "data", None), pl.DataFrame):
+        return nested_data.estimated_size()
+    return None
+
+
+def file_checkpoint_key(file_path: Path, *parts) -> str:
+    """Key that changes whenever the file is modified or any of the given parts
+    change."""
+    file_path = Path(file_path)
+    stat = file_path.stat()
+    return _hash_parts(file_path.resolve(), stat.st_size, stat.st_mtime_ns, *parts)
+
+
+def file_path_key(file_path: Path, *parts) -> str:
+    """Key for the file path that, unlike `file_checkpoint_key`, stays the same when
+    the file is modified."""
+    return _hash_parts(Path(file_path).resolve(), *parts)
+
+
+def _hash_parts(*parts) -> str:
+    return hashlib.sha1(":".join(map(str, parts)).encode()).hexdigest()
@@ -1,9 +1,10 @@
-from functools import partial
 from typing import Self
 
+import numpy as np
 import pandas as pd
 from bokeh.colors import RGB
 from bokeh.core import enums
+from bokeh.events import RangesUpdate
 from bokeh.layouts import column
 from bokeh.models import (
     BoxAnnotation,
@@ -21,10 +22,19 @@ from bokeh.models import (
     WheelZoomTool,
 )
 from bokeh.plotting import figure
-from ocean_data_qc.fyskem.parameter import Parameter
-from ocean_data_qc.fyskem.qc_flag import QC_FLAG_CSS_COLORS
 
-from qc_tool.models.manual_qc_model import ManualQcModel
+from qc_tool.selection_link import SelectionLink
+from qc_tool.slot_source import (
+    FLAG_LABELS,
+    LabelCodes,
+    decimated_rows,
+    flag_color_mapper,
+    outline_color_mapper,
+    qc_patches,
+    row_index,
+    source_columns,
+)
+from qc_tool.value_selection import ROW_KEY, ValueSelection
 from qc_tool.views.base_view import BaseView
 
 PARAMETER_ABBREVIATIONS = {
@@ -77,12 +87,12 @@ class ProfileSlot(BaseView):
         "x",
         "unit",
         "y",
-        "color",
-        "line_color",
         "qc",
+        "outline",
         "qc_incoming",
         "qc_automatic",
         "qc_manual",
+        "key",
     )
     statistics_source_fields = (
         "depth",
@@ -99,23 +109,28 @@ class ProfileSlot(BaseView):
 
     def __init__(
         self,
-        manual_qc_model: ManualQcModel,
+        selection_link: SelectionLink,
+        text_labels: LabelCodes,
         title: str = "",
         linked_plot: Self | None = None,
     ):
         self._title = title
-        self._manual_qc_model = manual_qc_model
-        self._manual_qc_model.register_listener(
-            ManualQcModel.VALUES_SELECTED, self._on_values_selected
-        )
+        self._selection_link = selection_link
+        self._text_labels = text_labels
 
         self._visit = None
         self._data = None
         self._parameter_data = []
+        self._row_indices = []
+        # Full source data of each parameter, the rows plotted from it and the depth
+        # range the plotted rows are resolved for
+        self._source_data = []
+        self._plotted_rows = []
+        self._resolved_range = (0.0, 0.0)
+        # Row indices by key of the full source data of each parameter
+        self._source_row_indices = []
         self._show_lines = True
         self._show_bounds = True
-        self._clear_called = False
-        self._applying_highlight = False
 
         self._sources = [
             ColumnDataSource(data={key: [] for key in self.source_fields}),
@@ -135,8 +150,11 @@ class ProfileSlot(BaseView):
 
         if linked_plot:
             self._crosshair_line = linked_plot._crosshair_line
+            self._linked_slots = linked_plot._linked_slots
         else:
             self._crosshair_line = Span(line_dash="dashed", line_width=1)
+            self._linked_slots = []
+        self._linked_slots.append(self)
         crosshair = CrosshairTool(overlay=self._crosshair_line)
 
         self._figure_config = {
@@ -149,12 +167,12 @@ class ProfileSlot(BaseView):
             "tooltips": [
                 ("Parameter", "$name"),
                 ("Value", "@x"),
-                ("Unit", "@unit"),
+                ("Unit", "@unit{custom}"),
                 ("Depth", "@y"),
-                ("QC", "@qc"),
-                ("Incoming QC", "@qc_incoming"),
-                ("Automatic QC", "@qc_automatic"),
-                ("Manual QC", "@qc_manual"),
+                ("QC", "@qc{custom}"),
+                ("Incoming QC", "@qc_incoming{custom}"),
+                ("Automatic QC", "@qc_automatic{custom}"),
+                ("Manual QC", "@qc_manual{custom}"),
             ],
         }
         self._plot_values_config = {
@@ -168,6 +186,15 @@ class ProfileSlot(BaseView):
         }
 
         self._figure = figure(**self._figure_config)
+        self._text_formatter = self._text_labels.formatter()
+        flag_formatter = FLAG_LABELS.formatter()
+        hover.formatters = {
+            "@unit": self._text_formatter,
+            "@qc": flag_formatter,
+            "@qc_incoming": flag_formatter,
+            "@qc_automatic": self._text_formatter,
+            "@qc_manual": flag_formatter,
+        }
         self._figure.xaxis.visible = False
         # add xaxis to possible parameters
         self._extra_axes = []
@@ -195,6 +222,8 @@ class ProfileSlot(BaseView):
         self._init_statistics_plot()
 
         # Add values and lines
+        color_mapper = flag_color_mapper()
+        line_color_mapper = outline_color_mapper()
         self._lines = [
             self._figure.line(
                 "x", "y", source=source, line_dash=dash, **self._plot_line_config
@@ -206,25 +235,14 @@ class ProfileSlot(BaseView):
                 "x",
                 "y",
                 source=source,
-                color="color",
-                line_color="line_color",
+                fill_color={"field": "qc", "transform": color_mapper},
+                line_color={"field": "outline", "transform": line_color_mapper},
                 **self._plot_values_config,
             )
             for source in self._sources
         ]
 
-        self._sources[0].selected.on_change(
-            "indices", partial(self._on_value_selected, index=0)
-        )
-        self._sources[1].selected.on_change(
-            "indices", partial(self._on_value_selected, index=1)
-        )
-        self._sources[2].selected.on_change(
-            "indices", partial(self._on_value_selected, index=2)
-        )
-        self._sources[3].selected.on_change(
-            "indices", partial(self._on_value_selected, index=3)
-        )
+        self._selection_link.add(self._figure, self._sources)
 
         hover.renderers = self._values
 
@@ -269,6 +287,10 @@ class ProfileSlot(BaseView):
                     """,
             )
         )
+        self._reset_button.on_click(self._on_reset)
+
+        self._layout = column(self._figure, self._reset_button)
+        self._figure.on_event(RangesUpdate, self._on_ranges_update)
 
     def _init_background(self):
         # Add sea level and sky
@@ -364,12 +386,13 @@ class ProfileSlot(BaseView):
         visit=None,
     ):
         # clear previous content
-        self.clear_selection()
         self._visit = visit
-        self._parameter_data = []
+        self._source_data = []
+        self._source_row_indices = []
 
         for source in self._sources:
             source.data = {key: [] for key in self.source_fields}
+            self._selection_link.set_data(source, None)
 
         for source in self._axes_range_sources:
             source.data = {
@@ -385,32 +408,111 @@ class ProfileSlot(BaseView):
         # get data, units, and ranges
         unit_to_range = {}
         axis_index = 0
-        for i, ((parameter_name, parameter_data), source, values) in enumerate(
-            zip(data, self._sources, self._values)
+        for i, ((parameter_name, parameter_data), values) in enumerate(
+            zip(data, self._values)
         ):
+            self._source_data.append(parameter_data)
+            self._source_row_indices.append(
+                {}
+                if parameter_data is None
+                else row_index(parameter_data["data"], ROW_KEY)
+            )
             if parameter_data is None:
-                self._parameter_data.append(None)
                 continue
 
-            source.data = parameter_data
             values.name = expand_abbreviation(parameter_name)
-            self._parameter_data.append(parameter_data["data"])
 
-            unit = parameter_data["unit"][0] if parameter_data["unit"] else ""
-            x_values = [v for v in parameter_data["x"] if v is not None]
+            unit = (
+                self._text_labels.labels[parameter_data["unit"][0]]
+                if len(parameter_data["unit"])
+                else ""
+            )
+            x_values = parameter_data["x"][~np.isnan(parameter_data["x"])]
 
-            if not x_values:
+            if not len(x_values):
                 continue
 
             axis_index = self._sync_axes(
                 unit, parameter_name, x_values, i, unit_to_range, axis_index
             )
 
+        self._resolved_range = self._depth_extent()
+        self._plot_resolved_rows()
+
+        self._text_labels.sync_formatter(self._text_formatter)
         self._sync_profile_options()
 
+    def _depth_extent(self) -> tuple[float, float]:
+        depths = [
+            source_data["y"][np.isfinite(source_data["y"])]
+            for source_data in self._source_data
+            if source_data is not None
+        ]
+        depths = np.concatenate(depths) if depths else np.array([])
+        if not len(depths):
+            return (0.0, 0.0)
+        return (float(depths.min()), float(depths.max()))
+
+    def _plot_resolved_rows(self):
+        # Large profiles are decimated for the resolved depth range
+        self._parameter_data = []
+        self._row_indices = []
+        self._plotted_rows = []
+        for source, source_data, source_row_index in zip(
+            self._sources, self._source_data, self._source_row_indices
+        ):
+            if source_data is None:
+                self._parameter_data.append(None)
+                self._row_indices.append({})
+                self._plotted_rows.append(None)
+                continue
+
+            rows = decimated_rows(source_data, *self._resolved_range)
+            if rows is None:
+                source.data = source_columns(source_data, self.source_fields)
+                data = source_data["data"]
+                plotted_row_index = source_row_index
+            else:
+                source.data = {key: source_data[key][rows] for key in self.source_fields}
+                data = source_data["data"][rows]
+                plotted_row_index = row_index(data, ROW_KEY)
+            self._parameter_data.append(data)
+            self._row_indices.append(plotted_row_index)
+            self._plotted_rows.append(rows)
+            self._selection_link.set_data(source, data)
+
+    def _resolve_depths(self, start: float, end: float):
+        # Hidden slots are resolved when they get new data
+        if not self._layout.visible or all(rows is None for rows in self._plotted_rows):
+            return
+        extent_start, extent_end = self._depth_extent()
+        start = max(start, extent_start)
+        end = min(end, extent_end)
+        resolved_start, resolved_end = self._resolved_range
+        if end < start or (
+            resolved_start <= start
+            and end <= resolved_end
+            and 2 * (end - start) > resolved_end - resolved_start
+        ):
+            return
+        self._resolved_range = (start, end)
+        self._plot_resolved_rows()
+
+    def _on_ranges_update(self, event: RangesUpdate):
+        if event.y0 is None or event.y1 is None:
+            return
+        start, end = sorted((event.y0, event.y1))
+        # The depth axis is shared with the linked slots
+        for slot in self._linked_slots:
+            slot._resolve_depths(start, end)
+
+    def _on_reset(self):
+        for slot in self._linked_slots:
+            slot._resolve_depths(-np.inf, np.inf)
+
     def _sync_profile_options(self):
         # Setting the visibility of elements according to parameter options
-        has_data = any(source.data.get("x") for source in self._sources)
+        has_data = any(len(source.data.get("x", [])) for source in self._sources)
 
         for lines in self._lines:
             lines.visible = self._show_lines
@@ -526,131 +628,35 @@ class ProfileSlot(BaseView):
         self._min_line.x_range_name = "default"
         self._max_line.x_range_name = "default"
 
-    def clear_selection(self):
-        self._clear_called = True
-        for source in self._sources:
-            source.selected.indices = []
-        self._clear_called = False
-
-    def select_values(self, index, rows):
-        selected_values = [
-            Parameter(self._parameter_data[index].row(n, named=True)) for n in rows
-        ]
-        self._statistics_source.selected.indices = []
-        if not self._clear_called:
-            self._manual_qc_model.set_selected_values(selected_values)
-
-    # def update_colors(self, updated_values: list[Parameter]):
-    #     updated_map = {
-    #         (
-    #             value._data["visit_key"],
-    #             value._data["parameter"],
-    #             value._data["DEPH"],
-    #         ): QC_FLAG_CSS_COLORS.get(value.qc.total)
-    #         for value in updated_values
-    #     }
-    #     for source, parameter_data in zip(self._sources, self._parameter_data):
-    #         if parameter_data is None:
-    #             continue
-    #         patches = [
-    #             (i, updated_map[(row["visit_key"], row["parameter"], row["DEPH"])])
-    #             for i, row in enumerate(parameter_data.iter_rows(named=True))
-    #             if (row["visit_key"], row["parameter"], row["DEPH"]) in updated_map
-    #         ]
-    #         if patches:
-    #             saved_indices = list(source.selected.indices)
-    #             self._applying_highlight = True
-    #             source.patch({"color": patches})
-    #             if saved_indices:
-    #                 source.selected.indices = saved_indices
-    #             self._applying_highlight = False
-
-    def update_colors(self, updated_values: list[Parameter]):
-        updated_map = {
-            (
-                value._data["visit_key"],
-                value._data["parameter"],
-                value._data["DEPH"],
-            ): value
-            for value in updated_values
-        }
-
-        for source, parameter_data in zip(self._sources, self._parameter_data):
-            if parameter_data is None:
-                continue
-
-            color_patches = []
-            qc_patches = []
-            qc_incoming_patches = []
-            qc_automatic_patches = []
-            qc_manual_patches = []
-
-            for i, row in enumerate(parameter_data.iter_rows(named=True)):
-                key = (row["visit_key"], row["parameter"], row["DEPH"])
-
-                if key not in updated_map:
-                    continue
-
-                value = updated_map[key]
-                flags = value.qc
-
-                qc_str = f"{flags.total} ({flags.total.value})"
-                qc_incoming_str = f"{flags.incoming} ({flags.incoming.value})"
-                qc_automatic_str = f"{flags.total_automatic} {flags.total_automatic_name}"
-                qc_manual_str = f"{flags.manual} ({flags.manual.value})"
+    def update_colors(self, updated_values: ValueSelection):
+        updated_flags = dict(updated_values.iter_flags())
 
-                color = QC_FLAG_CSS_COLORS.get(flags.total)
+        for source, source_data, source_row_index, row_indices, rows in zip(
+            self._sources,
+            self._source_data,
+            self._source_row_indices,
+            self._row_indices,
+            self._plotted_rows,
+        ):
+            if rows is not None:
+                # Plotted columns are copies of the full source data
+                _patch_source_data(
+                    source_data, source_row_index, updated_flags, self._text_labels
+                )
 
-                color_patches.append((i, color))
-                qc_patches.append((i, qc_str))
-                qc_incoming_patches.append((i, qc_incoming_str))
-                qc_automatic_patches.append((i, qc_automatic_str))
-                qc_manual_patches.append((i, qc_manual_str))
+            patches = {}
+            for key, flags in updated_flags.items():
+                for i in row_indices.get(key, []):
+                    for field, patch in qc_patches(i, flags, self._text_labels).items():
+                        patches.setdefault(field, []).append(patch)
 
-            if color_patches:
+            if patches:
                 saved_indices = list(source.selected.indices)
-                self._applying_highlight = True
-
-                source.patch(
-                    {
-                        "color": color_patches,
-                        "qc": qc_patches,
-                        "qc_incoming": qc_incoming_patches,
-                        "qc_automatic": qc_automatic_patches,
-                        "qc_manual": qc_manual_patches,
-                    }
-                )
-
+                source.patch(patches)
                 if saved_indices:
                     source.selected.indices = saved_indices
 
-                self._applying_highlight = False
-
-    def _on_values_selected(self):
-        self._applying_highlight = True
-        for index, (source, parameter_data) in enumerate(
-            zip(self._sources, self._parameter_data)
-        ):
-            if parameter_data is None:
-                source.selected.indices = []
-                continue
-            selected = self._manual_qc_model.selected_values
-            indices = [
-                i
-                for i, row in enumerate(parameter_data.iter_rows(named=True))
-                if any(
-                    row["visit_key"] == value._data["visit_key"]
-                    and row["parameter"] == value._data["parameter"]
-                    and row["DEPH"] == value._data["DEPH"]
-                    for value in selected
-                )
-            ]
-            source.selected.indices = indices
-        self._applying_highlight = False
-
-    def _on_value_selected(self, attr, old, new, index):
-        if not self._applying_highlight:
-            self.select_values(index, new)
+        self._text_labels.sync_formatter(self._text_formatter)
 
     def update_statistics(self, parameter_statistics, water_depth):
         if parameter_statistics is None:
@@ -678,8 +684,20 @@ class ProfileSlot(BaseView):
 
     @property
     def layout(self):
-        return column(self._figure, self._reset_button)
+        return self._layout
 
     @property
     def y_range(self):
         return self._figure.y_range
+
+
+def _patch_source_data(
+    source_data: dict,
+    row_indices: dict[tuple, list[int]],
+    updated_flags: dict,
+    text_labels: LabelCodes,
+):
+    for key, flags in updated_flags.items():
+        for i in row_indices.get(key, []):
+            for field, (index, value) in qc_patches(i, flags, text_labels).items():
+                source_data[field][index] = value
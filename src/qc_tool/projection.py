@@ -0,0 +1,34 @@
+"""Web Mercator (EPSG:3857) coordinates for the map."""
+
+import numpy as np
+import polars as pl
+
+EARTH_RADIUS = 6_378_137.0
+
+# Latitudes beyond this are outside the square Web Mercator world
+MAX_LATITUDE = 85.051_128_779_806_59
+
+X_COLUMN = "web_mercator_x"
+Y_COLUMN = "web_mercator_y"
+
+
+def web_mercator(
+    longitudes: np.ndarray, latitudes: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """Project WGS84 longitudes and latitudes in degrees to Web Mercator metres."""
+    longitudes = np.asarray(longitudes, dtype=np.float64)
+    latitudes = np.clip(
+        np.asarray(latitudes, dtype=np.float64), -MAX_LATITUDE, MAX_LATITUDE
+    )
+    x = EARTH_RADIUS * np.radians(longitudes)
+    y = EARTH_RADIUS * np.log(np.tan(np.pi / 4 + np.radians(latitudes) / 2))
+    return x, y
+
+
+def add_web_mercator_columns(data: pl.DataFrame) -> pl.DataFrame:
+    """Add the Web Mercator coordinates of the sample positions to the data."""
+    x, y = web_mercator(
+        data["sample_longitude_dd"].cast(pl.Float64).fill_null(np.nan).to_numpy(),
+        data["sample_latitude_dd"].cast(pl.Float64).fill_null(np.nan).to_numpy(),
+    )
+    return data.with_columns(pl.Series(X_COLUMN, x), pl.Series(Y_COLUMN, y))
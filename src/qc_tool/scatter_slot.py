@@ -15,12 +15,20 @@ from bokeh.models import (
     WheelZoomTool,
 )
 from bokeh.plotting import figure
-from ocean_data_qc.fyskem.parameter import Parameter
-from ocean_data_qc.fyskem.qc_flag import QC_FLAG_CSS_COLORS
 
 from qc_tool.models.manual_qc_model import ManualQcModel
 from qc_tool.models.scatter_model import ScatterModel
+from qc_tool.slot_source import (
+    FLAG_LABELS,
+    LabelCodes,
+    flag_code,
+    flag_color_mapper,
+    outline_color_mapper,
+    row_index,
+)
+from qc_tool.value_selection import ValueSelection
 from qc_tool.views.base_view import BaseView
+from qc_tool.wide_table import parameter_values
 
 PARAMETER_ABBREVIATIONS = {
     "ALKY": "Alkalinity",
@@ -75,9 +83,8 @@ class ScatterSlot(BaseView):
         "y",
         "y_unit",
         "depth",
-        "color",
-        "line_color",
         "qcx",
+        "outline",
         "qcy",
     )
     filtered_source_fields = (
@@ -89,6 +96,7 @@ class ScatterSlot(BaseView):
         self,
         manual_qc_model: ManualQcModel,
         scatter_model: ScatterModel,
+        text_labels: LabelCodes,
         title: str = "",
         x_parameter: str = "",
         y_parameter: str = "",
@@ -97,9 +105,11 @@ class ScatterSlot(BaseView):
         self._title = title
         self._manual_qc_model = manual_qc_model
         self._scatter_model = scatter_model
+        self._text_labels = text_labels
         self._x_parameter = x_parameter
         self._y_parameter = y_parameter
         self._merged_data = None
+        self._depth_indices = {}
         self._scatter_index = scatter_index
 
         self._manual_qc_model.register_listener(
@@ -153,14 +163,14 @@ class ScatterSlot(BaseView):
             "tools": ["pan", "reset", wheel_zoom, hover, crosshair, select, save],
             "output_backend": "webgl",
             "tooltips": [
-                ("x-parameter", "@x_name"),
+                ("x-parameter", "@x_name{custom}"),
                 ("x-value", "@x"),
-                ("x-unit", "@x_unit"),
-                ("x-qc", "@qcx"),
-                ("y-parameter", "@y_name"),
+                ("x-unit", "@x_unit{custom}"),
+                ("x-qc", "@qcx{custom}"),
+                ("y-parameter", "@y_name{custom}"),
                 ("y-value", "@y"),
-                ("y-unit", "@y_unit"),
-                ("y-qc", "@qcy"),
+                ("y-unit", "@y_unit{custom}"),
+                ("y-qc", "@qcy{custom}"),
             ],
         }
         self._plot_values_config = {
@@ -174,6 +184,16 @@ class ScatterSlot(BaseView):
         }
 
         self._figure = figure(**self._figure_config)
+        self._text_formatter = self._text_labels.formatter()
+        flag_formatter = FLAG_LABELS.formatter()
+        hover.formatters = {
+            "@x_name": self._text_formatter,
+            "@x_unit": self._text_formatter,
+            "@qcx": flag_formatter,
+            "@y_name": self._text_formatter,
+            "@y_unit": self._text_formatter,
+            "@qcy": flag_formatter,
+        }
 
         # Add background
         self._filtered_values = self._figure.scatter(
@@ -196,8 +216,8 @@ class ScatterSlot(BaseView):
             "x",
             "y",
             source=self._source,
-            color="color",
-            line_color="line_color",
+            fill_color={"field": "qcx", "transform": flag_color_mapper()},
+            line_color={"field": "outline", "transform": outline_color_mapper()},
             **self._plot_values_config,
         )
 
@@ -263,6 +283,8 @@ class ScatterSlot(BaseView):
 
         self._source.data = source_data
         self._merged_data = merged_data
+        self._depth_indices = row_index(merged_data, ("DEPH",))
+        self._text_labels.sync_formatter(self._text_formatter)
         self._sync_profile_options()
 
     def set_filtered_data(
@@ -281,7 +303,7 @@ class ScatterSlot(BaseView):
         }
 
     def _sync_profile_options(self):
-        has_data = any(self._source.data.get("x"))
+        has_data = len(self._source.data.get("x", [])) > 0
 
         self._line.visible = self._show_lines
         self._no_data_label.visible = not has_data
@@ -291,52 +313,31 @@ class ScatterSlot(BaseView):
         self._source.selected.indices = []
         self._clear_called = False
 
-    def update_colors(self, updated_values: list[Parameter]):
+    def update_colors(self, updated_values: ValueSelection):
         if self._merged_data is None:
             return
 
-        updated_map_x = {
-            (v._data["parameter"], v._data["DEPH"]): v
-            for v in updated_values
-            if v._data["parameter"] == self._x_parameter
-        }
-        updated_map_y = {
-            (v._data["parameter"], v._data["DEPH"]): v
-            for v in updated_values
-            if v._data["parameter"] == self._y_parameter
-        }
-
-        if not updated_map_x and not updated_map_y:
-            return
-
-        color_patches = []
+        outline_patches = []
         qcx_patches = []
         qcy_patches = []
 
-        for i, row in enumerate(self._merged_data.iter_rows(named=True)):
-            key_x = (self._x_parameter, row["DEPH"])
-            key_y = (self._y_parameter, row["DEPH"])
-
-            if key_x in updated_map_x:
-                value_x = updated_map_x[key_x]
-                flags_x = value_x.qc
-                color = QC_FLAG_CSS_COLORS.get(flags_x.total)
-                qc_str_x = f"{flags_x.total} ({flags_x.total.value})"
-                color_patches.append((i, color))
-                qcx_patches.append((i, qc_str_x))
-            if key_y in updated_map_y:
-                value_y = updated_map_y[key_y]
-                flags_y = value_y.qc
-                qc_str_y = f"{flags_y.total} ({flags_y.total.value})"
-                qcy_patches.append((i, qc_str_y))
-
-        if color_patches or qcx_patches or qcy_patches:
+        for (_, parameter, depth), flags in updated_values.iter_flags():
+            for i in self._depth_indices.get((depth,), []):
+                if parameter == self._x_parameter:
+                    qcx_patches.append((i, flag_code(flags.total)))
+                    outline_patches.append(
+                        (i, int(flags.incoming.value != flags.total.value))
+                    )
+                if parameter == self._y_parameter:
+                    qcy_patches.append((i, flag_code(flags.total)))
+
+        if qcx_patches or qcy_patches:
             saved_indices = list(self._source.selected.indices)
             self._applying_highlight = True
 
             patch_dict = {}
-            if color_patches:
-                patch_dict["color"] = color_patches
+            if outline_patches:
+                patch_dict["outline"] = outline_patches
             if qcx_patches:
                 patch_dict["qcx"] = qcx_patches
             if qcy_patches:
@@ -354,22 +355,25 @@ class ScatterSlot(BaseView):
         if self._merged_data is None:
             self._source.selected.indices = []
         else:
-            selected_set = {
-                (value._data["parameter"], value._data["DEPH"])
-                for value in self._manual_qc_model.selected_values
+            selected_depths = {
+                (depth,)
+                for _, parameter, depth in self._manual_qc_model.selected_values.keys()
+                if parameter in (self._x_parameter, self._y_parameter)
             }
-            self._source.selected.indices = [
-                i
-                for i, row in enumerate(self._merged_data.iter_rows(named=True))
-                if (self._x_parameter, row["DEPH"]) in selected_set
-                or (self._y_parameter, row["DEPH"]) in selected_set
-            ]
+            self._source.selected.indices = sorted(
+                i for depth in selected_depths for i in self._depth_indices.get(depth, [])
+            )
         self._applying_highlight = False
 
     def select_values(self, rows):
-        selected_values = [
-            Parameter(self._parameter_data.row(n, named=True)) for n in rows
-        ]
+        # A point is the values of both parameters at one depth
+        selected_values = ValueSelection(
+            parameter_values(
+                self._merged_data[list(rows)], (self._x_parameter, self._y_parameter)
+            )
+            if self._merged_data is not None and rows
+            else None
+        )
         if not self._clear_called:
             self._manual_qc_model.set_selected_values(selected_values)
 
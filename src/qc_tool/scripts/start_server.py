@@ -1,7 +1,36 @@
 import argparse
-import subprocess
+import itertools
+import multiprocessing
+import os
 from pathlib import Path
 
+from bokeh.application import Application
+from bokeh.application.handlers import DirectoryHandler
+from bokeh.server.server import Server
+from bokeh.util.browser import view
+from tornado.ioloop import IOLoop
+from tornado.web import Application as TornadoApplication
+from tornado.web import RequestHandler
+
+from qc_tool.models.memory_model import (
+    CACHE_BUDGET_ENVIRONMENT_VARIABLE,
+    DEFAULT_CACHE_BUDGET_MB,
+)
+from qc_tool.tile_cache import (
+    LOCAL_TILES_ENVIRONMENT_VARIABLE,
+    TILE_ROUTE,
+    TileCache,
+    TileCacheHandler,
+)
+from qc_tool.views.map_view import MapView
+
+PORT = 5007
+
+# Identifies the worker of a browser when several workers serve the tool
+WORKER_COOKIE = "qc_tool_worker"
+
+SERVER_ROOT_DIRECTORY = Path(__file__).parent.parent
+
 
 def main():
     args = setup_arguments()
@@ -11,28 +40,156 @@ def main():
 def setup_arguments():
     parser = argparse.ArgumentParser(description="Start QC Tool")
     parser.add_argument("--file", type=Path, help="Dataset to open on startup")
+    parser.add_argument(
+        "--cache-budget",
+        type=int,
+        help="Memory budget in MB for cached data of each session "
+        f"(default: ${CACHE_BUDGET_ENVIRONMENT_VARIABLE} or {DEFAULT_CACHE_BUDGET_MB})",
+    )
+    parser.add_argument(
+        "--seed-tiles",
+        type=zoom_levels,
+        metavar="ZOOM_LEVELS",
+        help="Fetch the map tiles of Swedish waters at the zoom levels, for example "
+        "5-9, to the tile cache before starting",
+    )
+    parser.add_argument(
+        "--workers",
+        type=worker_count,
+        default=1,
+        help="Number of server processes. With more than one, each browser is sent to "
+        f"one of the processes, on the ports after {PORT}, and stays there (default: 1)",
+    )
     return parser.parse_args()
 
 
+def zoom_levels(text: str) -> range:
+    first, _, last = text.partition("-")
+    try:
+        return range(int(first), int(last or first) + 1)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid zoom levels: {text}") from None
+
+
+def worker_count(text: str) -> int:
+    try:
+        workers = int(text)
+    except ValueError:
+        workers = 0
+    if workers < 1:
+        raise argparse.ArgumentTypeError(f"invalid number of workers: {text}")
+    return workers
+
+
 def start_server(args):
+    if args.seed_tiles:
+        print("Seeding map tiles...")
+        TileCache().seed(
+            MapView.default_x_range, MapView.default_y_range, args.seed_tiles
+        )
+
+    app_args = []
+    if args.file:
+        app_args += ["--file", str(args.file)]
+    if args.cache_budget:
+        app_args += ["--cache-budget", str(args.cache_budget)]
+
+    # Map tiles are served from the local tile cache
+    os.environ[LOCAL_TILES_ENVIRONMENT_VARIABLE] = "1"
+    if args.workers == 1:
+        serve(PORT, app_args, show=True)
+    else:
+        start_workers(args.workers, app_args)
+
+
+def serve(port: int, app_args: list[str], show: bool = False):
+    application = Application(
+        DirectoryHandler(filename=str(SERVER_ROOT_DIRECTORY), argv=app_args)
+    )
+    server = Server(
+        {f"/{SERVER_ROOT_DIRECTORY.name}": application},
+        port=port,
+        websocket_max_message_size=1_000_000_000,
+        extra_patterns=[(TILE_ROUTE, TileCacheHandler, {"tile_cache": TileCache()})],
+    )
     try:
-        print("Stop server with Ctrl-C")
-        server_root_directory = Path(__file__).parent.parent
-        cmd = [
-            "bokeh",
-            "serve",
-            "--port",
-            "5007",
-            "--show",
-            str(server_root_directory),
-            "--websocket-max-message-size",
-            "1000000000",
+        if show:
+            print("Stop server with Ctrl-C")
+        server.start()
+        if show:
+            server.io_loop.add_callback(server.show, f"/{SERVER_ROOT_DIRECTORY.name}")
+        server.io_loop.start()
+    except KeyboardInterrupt:
+        if show:
+            print("Stopping server")
+
+
+def start_workers(workers: int, app_args: list[str]):
+    """Serve the tool from one process per worker, each on its own port, and send
+    browsers from `PORT` to the workers."""
+    worker_ports = [PORT + n for n in range(1, workers + 1)]
+    processes = [start_worker(serve, port, app_args) for port in worker_ports]
+    print(f"Started {workers} workers on ports {worker_ports[0]}-{worker_ports[-1]}")
+
+    dispatcher = TornadoApplication(
+        [
+            (
+                r"/(.*)",
+                WorkerDispatchHandler,
+                {
+                    "worker_ports": worker_ports,
+                    "next_worker": itertools.cycle(worker_ports),
+                },
+            )
         ]
-        if args.file:
-            cmd += ["--args", "--file", str(args.file)]
-        subprocess.run(cmd)
+    )
+    try:
+        dispatcher.listen(PORT)
+        print("Stop server with Ctrl-C")
+        IOLoop.current().add_callback(
+            view, f"http://localhost:{PORT}/{SERVER_ROOT_DIRECTORY.name}"
+        )
+        IOLoop.current().start()
     except KeyboardInterrupt:
         print("Stopping server")
+    finally:
+        # Workers are not daemons and are not stopped when this process exits
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.join()
+
+
+def start_worker(target, *args) -> multiprocessing.Process:
+    """Start a worker process running target(*args).
+
+    Workers are spawned, since Polars is not fork safe, and are not daemons, since
+    daemons can not start the processes of the automatic QC. They are terminated by
+    `start_workers` on shutdown."""
+    process = multiprocessing.get_context("spawn").Process(target=target, args=args)
+    process.start()
+    return process
+
+
+class WorkerDispatchHandler(RequestHandler):
+    """Redirects browsers to a worker. A new browser is given the next worker in turn
+    and a cookie that sends it to the same worker when it comes back, so the sessions
+    of an analyst share the caches of one process."""
+
+    def initialize(self, worker_ports: list[int], next_worker):
+        self._worker_ports = worker_ports
+        self._next_worker = next_worker
+
+    def get(self, path: str):
+        worker = self.get_cookie(WORKER_COOKIE, "")
+        port = int(worker) if worker.isdigit() else None
+        if port not in self._worker_ports:
+            port = next(self._next_worker)
+            self.set_cookie(WORKER_COOKIE, str(port))
+        query = f"?{self.request.query}" if self.request.query else ""
+        self.redirect(
+            f"{self.request.protocol}://{self.request.host_name}:{port}/{path}{query}"
+        )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,98 @@
+"""Selection shared by the profile slots.
+
+Selected values are identified by row keys, strings built from the `ROW_KEY` columns
+that are stored in the `key` column of each slot source. Highlighting the selection in
+all slots is done in the browser, and the server is only told about the final
+selection of a selection gesture."""
+
+import polars as pl
+from bokeh.events import SelectionGeometry
+from bokeh.models import ColumnDataSource, CustomJS
+from bokeh.plotting import figure
+
+from qc_tool.models.manual_qc_model import ManualQcModel
+from qc_tool.value_selection import ROW_KEY, ValueSelection, row_keys
+
+_SELECT_CODE = """
+    if (!cb_obj.final) return;
+    const keys = new Set();
+    for (const source of sources) {
+        const source_keys = source.data["key"];
+        for (const i of source.selected.indices) keys.add(source_keys[i]);
+    }
+    const current = link.data["key"];
+    if (keys.size == current.length && current.every((key) => keys.has(key))) return;
+    link.data = {key: [...keys]};
+"""
+
+_HIGHLIGHT_CODE = """
+    const keys = new Set(link.data["key"]);
+    const source_keys = source.data["key"];
+    const indices = [];
+    for (let i = 0; i < source_keys.length; i++) {
+        if (keys.has(source_keys[i])) indices.push(i);
+    }
+    source.selected.indices = indices;
+"""
+
+
+class SelectionLink:
+    def __init__(self, manual_qc_model: ManualQcModel):
+        self._manual_qc_model = manual_qc_model
+        self._manual_qc_model.register_listener(
+            ManualQcModel.VALUES_SELECTED, self._on_values_selected
+        )
+        self._source = ColumnDataSource(data={"key": []})
+        self._source.on_change("data", self._on_keys_changed)
+        self._data: dict[str, tuple[pl.DataFrame, pl.Series]] = {}
+
+    def add(self, plot: figure, sources: list[ColumnDataSource]):
+        """Share the selection of the sources plotted in the figure."""
+        plot.js_on_event(
+            SelectionGeometry,
+            CustomJS(args={"link": self._source, "sources": sources}, code=_SELECT_CODE),
+        )
+        for source in sources:
+            self._source.js_on_change(
+                "data",
+                CustomJS(
+                    args={"link": self._source, "source": source}, code=_HIGHLIGHT_CODE
+                ),
+            )
+
+    def set_data(self, source: ColumnDataSource, data: pl.DataFrame | None):
+        """Set the data plotted from the source and select its selected values."""
+        if data is None:
+            self._data.pop(source.id, None)
+            source.selected.indices = []
+            return
+        keys = row_keys(data)
+        self._data[source.id] = (data, keys)
+        source.selected.indices = (
+            keys.is_in(self._source.data["key"]).arg_true().to_list()
+        )
+
+    def _on_keys_changed(self, attr, old, new):
+        keys = set(new["key"])
+        if keys == set(row_keys(self._manual_qc_model.selected_values.data)):
+            return
+
+        selected_data = [
+            data.filter(source_keys.is_in(list(keys)))
+            for data, source_keys in self._data.values()
+        ]
+        # A value can be plotted in more than one slot
+        self._manual_qc_model.set_selected_values(
+            ValueSelection(
+                pl.concat(selected_data, how="diagonal_relaxed").unique(
+                    ROW_KEY, keep="first", maintain_order=True
+                )
+                if selected_data
+                else None
+            )
+        )
+
+    def _on_values_selected(self):
+        keys = row_keys(self._manual_qc_model.selected_values.data).to_list()
+        if set(keys) != set(self._source.data["key"]):
+            self._source.data = {"key": keys}
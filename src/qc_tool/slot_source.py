@@ -0,0 +1,225 @@
+"""Columns for the ColumnDataSources of the plot slots.
+
+All columns are NumPy arrays, which Bokeh sends to the browser as binary buffers. Text
+that is only shown in tooltips is sent as integer codes and turned back into text by a
+`CustomJSHover`, and point colors are flag codes that are mapped to colors in the
+browser."""
+
+from typing import Iterable
+
+import numpy as np
+import polars as pl
+from bokeh.models import CustomJSHover, LinearColorMapper, LogColorMapper
+from bokeh.palettes import Greys256
+from ocean_data_qc.fyskem.qc_flag import QC_FLAG_CSS_COLORS, QcFlag
+from ocean_data_qc.fyskem.qc_flags import QcFlags
+
+from qc_tool.value_selection import row_keys
+
+FLAGS = tuple(QcFlag)
+_FLAG_CODES = {flag: code for code, flag in enumerate(FLAGS)}
+
+_LABEL_CODE = """
+    return labels[value] ?? "";
+"""
+
+
+class LabelCodes:
+    """Integer codes for labels. Codes are never reused, so encoded columns stay valid
+    when new labels are added.
+
+    Labels that depend on the loaded data, such as units, parameter names and automatic
+    QC descriptions, are coded per session, since every session would otherwise add its
+    labels to the formatters of all other sessions."""
+
+    def __init__(self, labels: Iterable[str] = ()):
+        self._labels = []
+        self._codes = {}
+        for label in labels:
+            self.code(label)
+
+    @property
+    def labels(self) -> list[str]:
+        return self._labels
+
+    def code(self, label: str) -> int:
+        if (code := self._codes.get(label)) is None:
+            code = self._codes[label] = len(self._labels)
+            self._labels.append(label)
+        return code
+
+    def encode(self, labels: Iterable[str]) -> np.ndarray:
+        return np.fromiter(map(self.code, labels), dtype=np.int32)
+
+    def formatter(self) -> CustomJSHover:
+        return CustomJSHover(args={"labels": list(self._labels)}, code=_LABEL_CODE)
+
+    def sync_formatter(self, formatter: CustomJSHover):
+        if len(formatter.args["labels"]) != len(self._labels):
+            formatter.args = {"labels": list(self._labels)}
+
+
+# Flag codes are the positions of the flags in QcFlag
+FLAG_LABELS = LabelCodes(f"{flag} ({flag.value})" for flag in FLAGS)
+
+
+def flag_code(flag: QcFlag) -> int:
+    return _FLAG_CODES[flag]
+
+
+_FLAGGED_CODES = [flag_code(QcFlag.PROBABLY_BAD_VALUE), flag_code(QcFlag.BAD_VALUE)]
+
+
+def flag_codes(flags: Iterable[QcFlag]) -> np.ndarray:
+    return np.fromiter(map(flag_code, flags), dtype=np.uint8)
+
+
+def flag_color_mapper() -> LinearColorMapper:
+    # Flag code n is mapped to color n of the palette
+    return LinearColorMapper(
+        palette=[QC_FLAG_CSS_COLORS.get(flag, "gray") for flag in FLAGS],
+        low=0,
+        high=len(FLAGS),
+    )
+
+
+def outline_color_mapper() -> LinearColorMapper:
+    return LinearColorMapper(palette=["rgba(0, 0, 0, 0)", "black"], low=0, high=2)
+
+
+def density_color_mapper() -> LogColorMapper:
+    # Light gray for bins with few points, empty bins are not drawn
+    return LogColorMapper(palette=Greys256[-64::-1], nan_color="rgba(0, 0, 0, 0)")
+
+
+def float_column(series: pl.Series) -> np.ndarray:
+    return series.cast(pl.Float64).fill_null(np.nan).to_numpy()
+
+
+def qc_columns(qc_flags: list[QcFlags], text_labels: LabelCodes) -> dict[str, np.ndarray]:
+    return {
+        "qc": flag_codes(flags.total for flags in qc_flags),
+        "outline": np.fromiter(
+            (flags.incoming.value != flags.total.value for flags in qc_flags),
+            dtype=np.uint8,
+        ),
+        "qc_incoming": flag_codes(flags.incoming for flags in qc_flags),
+        "qc_automatic": text_labels.encode(
+            f"{flags.total_automatic} {flags.total_automatic_name}" for flags in qc_flags
+        ),
+        "qc_manual": flag_codes(flags.manual for flags in qc_flags),
+    }
+
+
+def qc_patches(
+    index: int, flags: QcFlags, text_labels: LabelCodes
+) -> dict[str, tuple[int, int]]:
+    return {
+        "qc": (index, flag_code(flags.total)),
+        "outline": (index, int(flags.incoming.value != flags.total.value)),
+        "qc_incoming": (index, flag_code(flags.incoming)),
+        "qc_automatic": (
+            index,
+            text_labels.code(f"{flags.total_automatic} {flags.total_automatic_name}"),
+        ),
+        "qc_manual": (index, flag_code(flags.manual)),
+    }
+
+
+def profile_source_data(parameter_data: pl.DataFrame, text_labels: LabelCodes) -> dict:
+    """Source data for a parameter in a profile. The parameter data itself is kept in
+    the `data` key and is not part of the source."""
+    qc_flags = list(map(QcFlags.from_string, parameter_data["quality_flag_long"]))
+    return {
+        "x": float_column(parameter_data["value"]),
+        "unit": text_labels.encode(parameter_data["unit"].fill_null("")),
+        "y": float_column(parameter_data["DEPH"]),
+        **qc_columns(qc_flags, text_labels),
+        "key": row_keys(parameter_data).to_numpy(),
+        "data": parameter_data,
+    }
+
+
+# Backgrounds with at least this many points are sent as a density image
+DENSITY_MIN_POINTS = 20_000
+
+# Number of depth and value bins of a density image
+DENSITY_BINS = (200, 150)
+
+
+def background_data(values: np.ndarray, depths: np.ndarray) -> dict:
+    """Source data for the background of a profile.
+
+    Small backgrounds are sent as points. Large backgrounds are sent as an image with
+    the number of points in each depth and value bin, where empty bins are NaN."""
+    finite = np.isfinite(values) & np.isfinite(depths)
+    values = values[finite]
+    depths = depths[finite]
+    if len(values) < DENSITY_MIN_POINTS:
+        return {"x": values, "y": depths}
+
+    density, depth_edges, value_edges = np.histogram2d(depths, values, bins=DENSITY_BINS)
+    density[density == 0] = np.nan
+    return {
+        "image": [density.astype(np.float32)],
+        "x": [float(value_edges[0])],
+        "y": [float(depth_edges[0])],
+        "dw": [float(value_edges[-1] - value_edges[0])],
+        "dh": [float(depth_edges[-1] - depth_edges[0])],
+    }
+
+
+# Profiles with more points than this are decimated
+DECIMATION_MIN_POINTS = 2_000
+
+# Number of depth bins of a decimated profile
+DECIMATION_BINS = 400
+
+
+def decimated_rows(source_data: dict, start: float, end: float) -> np.ndarray | None:
+    """Rows of a profile to plot when depths between start and end are shown.
+
+    Returns None for profiles that are small enough to plot in full. Otherwise the
+    rows with the smallest and the largest value in each depth bin are kept, together
+    with all flagged rows and the closest row on each side of the depth range."""
+    values = source_data["x"]
+    depths = source_data["y"]
+    if len(values) <= DECIMATION_MIN_POINTS:
+        return None
+
+    rows = np.flatnonzero((depths >= start) & (depths <= end) & np.isfinite(values))
+    if len(rows) > 2 * DECIMATION_BINS:
+        bins = np.minimum(
+            ((depths[rows] - start) / ((end - start) or 1) * DECIMATION_BINS).astype(
+                np.int64
+            ),
+            DECIMATION_BINS - 1,
+        )
+        order = np.lexsort((values[rows], bins))
+        first = np.flatnonzero(np.diff(bins[order], prepend=-1))
+        last = np.append(first[1:] - 1, len(order) - 1)
+        rows = rows[order[np.concatenate([first, last])]]
+
+    flagged = np.isin(source_data["qc"], _FLAGGED_CODES) | (source_data["outline"] == 1)
+    return np.unique(
+        np.concatenate(
+            [
+                rows,
+                np.flatnonzero(flagged),
+                np.flatnonzero(depths < start)[-1:],
+                np.flatnonzero(depths > end)[:1],
+            ]
+        )
+    )
+
+
+def source_columns(source_data: dict, fields: Iterable[str]) -> dict:
+    return {key: source_data[key] for key in fields}
+
+
+def row_index(data: pl.DataFrame, key_columns: Iterable[str]) -> dict[tuple, list[int]]:
+    """Row indices of the data for each key."""
+    index = {}
+    for i, key in enumerate(zip(*(data[column] for column in key_columns))):
+        index.setdefault(key, []).append(i)
+    return index
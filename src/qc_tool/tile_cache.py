@@ -0,0 +1,175 @@
+"""Local cache of the basemap tiles.
+
+Tiles are stored as files in the cache directory and served by `TileCacheHandler`,
+which is added to the routes of the Bokeh server. Tiles that are not in the cache are
+fetched from the tile provider and stored. When the provider cannot be reached, no
+more requests are made for a while and missing tiles are answered with 404, so the
+map shows the vector coastline below the tiles."""
+
+import math
+import os
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import xyzservices.providers
+from tornado.httpclient import AsyncHTTPClient, HTTPClientError
+from tornado.web import RequestHandler
+
+from qc_tool.pipeline import default_cache_directory, replaced_atomically
+
+TILE_PROVIDER = xyzservices.providers.Esri.OceanBasemap
+
+# Set by the server when the tile cache route is available
+LOCAL_TILES_ENVIRONMENT_VARIABLE = "QC_TOOL_LOCAL_TILES"
+
+TILE_ROUTE = r"/tiles/(\d+)/(\d+)/(\d+)\.png"
+LOCAL_TILE_URL = "/tiles/{Z}/{X}/{Y}.png"
+
+# Half the width of the Web Mercator world in metres
+_WORLD_HALF_WIDTH = 20_037_508.342_789_244
+
+# Seconds without requests to the tile provider after a failed request
+OFFLINE_BACKOFF = 60
+
+_REQUEST_TIMEOUT = 10
+
+
+def local_tiles_enabled() -> bool:
+    return bool(os.getenv(LOCAL_TILES_ENVIRONMENT_VARIABLE))
+
+
+def default_tile_directory() -> Path:
+    return default_cache_directory() / "tiles" / TILE_PROVIDER.name
+
+
+def tile_range(
+    x_range: tuple[float, float], y_range: tuple[float, float], zoom: int
+) -> tuple[range, range]:
+    """Column and row numbers of the tiles that cover the Web Mercator extent."""
+    tile_size = 2 * _WORLD_HALF_WIDTH / 2**zoom
+    last = 2**zoom - 1
+
+    def tile_number(distance: float) -> int:
+        return min(max(math.floor(distance / tile_size), 0), last)
+
+    columns = range(
+        tile_number(min(x_range) + _WORLD_HALF_WIDTH),
+        tile_number(max(x_range) + _WORLD_HALF_WIDTH) + 1,
+    )
+    # Rows are counted from the top of the world
+    rows = range(
+        tile_number(_WORLD_HALF_WIDTH - max(y_range)),
+        tile_number(_WORLD_HALF_WIDTH - min(y_range)) + 1,
+    )
+    return columns, rows
+
+
+class TileCache:
+    def __init__(self, directory: Path | None = None):
+        self._directory = directory or default_tile_directory()
+        self._offline_until = 0.0
+
+    def path(self, z: int, x: int, y: int) -> Path:
+        return self._directory / str(z) / str(x) / f"{y}.png"
+
+    def read(self, z: int, x: int, y: int) -> bytes | None:
+        try:
+            return self.path(z, x, y).read_bytes()
+        except OSError:
+            return None
+
+    def write(self, z: int, x: int, y: int, tile: bytes):
+        path = self.path(z, x, y)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with replaced_atomically(path) as temporary_path:
+                temporary_path.write_bytes(tile)
+        except OSError as error:
+            print(f"WARNING: Could not write tile to cache: {error}")
+
+    @property
+    def offline(self) -> bool:
+        return time.monotonic() < self._offline_until
+
+    def set_offline(self):
+        self._offline_until = time.monotonic() + OFFLINE_BACKOFF
+
+    async def get(self, z: int, x: int, y: int) -> bytes | None:
+        """Tile from the cache, or from the tile provider when it is not cached."""
+        if (tile := self.read(z, x, y)) is not None:
+            return tile
+        if self.offline:
+            return None
+        try:
+            response = await AsyncHTTPClient().fetch(
+                TILE_PROVIDER.build_url(x=x, y=y, z=z),
+                request_timeout=_REQUEST_TIMEOUT,
+                raise_error=False,
+            )
+        except (OSError, HTTPClientError):
+            # Timeouts and closed connections are raised even without raise_error
+            response = None
+        if response is None or response.code == 599:
+            # No response at all, the provider cannot be reached
+            self.set_offline()
+            return None
+        if response.code != 200:
+            return None
+        self.write(z, x, y, response.body)
+        return response.body
+
+    def seed(
+        self,
+        x_range: tuple[float, float],
+        y_range: tuple[float, float],
+        zoom_levels: range,
+        max_workers: int = 8,
+    ):
+        """Fetch all tiles of the extent at the zoom levels that are not cached."""
+        for zoom in zoom_levels:
+            columns, rows = tile_range(x_range, y_range, zoom)
+            tiles = [
+                (zoom, x, y)
+                for x in columns
+                for y in rows
+                if not self.path(zoom, x, y).exists()
+            ]
+            t0 = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                fetched = sum(executor.map(self._seed_tile, tiles))
+            t1 = time.perf_counter()
+            print(
+                f"\tZoom level {zoom}: {fetched} of {len(tiles)} missing tiles fetched, "
+                f"{len(columns) * len(rows) - len(tiles)} already cached "
+                f"({t1 - t0:.3f} s.)"
+            )
+
+    def _seed_tile(self, tile: tuple[int, int, int]) -> bool:
+        z, x, y = tile
+        try:
+            with urllib.request.urlopen(
+                TILE_PROVIDER.build_url(x=x, y=y, z=z), timeout=_REQUEST_TIMEOUT
+            ) as response:
+                self.write(z, x, y, response.read())
+            return True
+        except OSError as error:
+            print(f"WARNING: Could not fetch tile {z}/{x}/{y}: {error}")
+            return False
+
+
+class TileCacheHandler(RequestHandler):
+    def initialize(self, tile_cache: TileCache):
+        self._tile_cache = tile_cache
+
+    async def get(self, z: str, x: str, y: str):
+        tile = await self._tile_cache.get(int(z), int(x), int(y))
+        if tile is None:
+            self.set_status(404)
+            return
+        self.set_header(
+            "Content-Type", "image/jpeg" if tile.startswith(b"\xff\xd8") else "image/png"
+        )
+        self.set_header("Cache-Control", "max-age=86400")
+        self.write(tile)
@@ -0,0 +1,96 @@
+from importlib import metadata
+
+import polars as pl
+
+
+def package_version(package_name: str) -> str:
+    try:
+        return metadata.version(package_name)
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def validator_version(validator_names) -> str:
+    """Version of the validation, changes when SHARKadm or the set of validators
+    changes."""
+    return ":".join((package_version("sharkadm"), *sorted(validator_names)))
+
+
+def visit_hashes(data: pl.DataFrame) -> dict[str, int]:
+    """Content hash of all rows of each visit. Row numbers are part of the content
+    since the validation log refers to rows by number."""
+    hashes = (
+        data.select(
+            "visit_key", pl.struct(pl.exclude("visit_key")).hash().alias("row_hash")
+        )
+        .group_by("visit_key", maintain_order=True)
+        .agg(pl.col("row_hash").implode().hash())
+    )
+    return dict(zip(hashes["visit_key"], hashes["row_hash"]))
+
+
+class ValidationCache:
+    """Validation log entries per visit.
+
+    Entries are stored per (visit_key, content hash, validator version) so that a
+    visit is only validated again when its rows or the validators have changed. Only
+    entries from validators that validate each visit on its own can be cached."""
+
+    def __init__(self):
+        self._entries: dict[tuple[str, int, str], list[dict]] = {}
+
+    def cached_visits(self, hashes: dict[str, int], version: str) -> set[str]:
+        return {
+            visit_key
+            for visit_key, visit_hash in hashes.items()
+            if (visit_key, visit_hash, version) in self._entries
+        }
+
+    def entries(
+        self, hashes: dict[str, int], version: str, visit_keys: set[str]
+    ) -> list[dict]:
+        return [
+            entry
+            for visit_key, visit_hash in hashes.items()
+            if visit_key in visit_keys
+            for entry in self._entries.get((visit_key, visit_hash, version), [])
+        ]
+
+    def store(
+        self,
+        log: list[dict],
+        data: pl.DataFrame,
+        hashes: dict[str, int],
+        version: str,
+        visit_keys: set[str],
+        validator_classes: set[str],
+    ):
+        """Store the entries of the given validators for the validated visits.
+
+        Visits with an entry that refers to rows of other visits are not stored.
+        Entries that can not be attributed to any validated visit are skipped."""
+        rows = data.filter(pl.col("visit_key").is_in(list(visit_keys))).select(
+            "row_number", "visit_key"
+        )
+        visit_by_row = dict(zip(rows["row_number"], rows["visit_key"]))
+
+        entries_by_visit = {visit_key: [] for visit_key in visit_keys}
+        uncacheable_visits = set()
+        for entry in log:
+            if entry.get("cls") not in validator_classes:
+                continue
+            entry_visits = {
+                visit_by_row[row]
+                for row in entry.get("row_numbers") or []
+                if row in visit_by_row
+            }
+            if not entry_visits:
+                continue
+            if len(entry_visits) > 1:
+                uncacheable_visits |= entry_visits
+                continue
+            entries_by_visit[entry_visits.pop()].append(entry)
+
+        for visit_key, entries in entries_by_visit.items():
+            if visit_key not in uncacheable_visits:
+                self._entries[(visit_key, hashes[visit_key], version)] = entries
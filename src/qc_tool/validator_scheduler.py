@@ -0,0 +1,183 @@
+import functools
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+import polars as pl
+
+from qc_tool.validation_cache import package_version
+
+
+@dataclass(frozen=True)
+class ValidatorSpec:
+    validator: type
+    parameters: dict = field(default_factory=dict)
+    # Independent validators only read the data and can run at the same time as other
+    # independent validators.
+    independent: bool = True
+    # Per visit validators only compare rows within a visit and can be run on a subset
+    # of the visits.
+    per_visit: bool = True
+
+
+class ValidatorScheduler:
+    """Runs SHARKadm validators on a controller.
+
+    Independent validators are run concurrently in a thread pool over the same data.
+    The remaining validators are run one at a time afterwards. Since validators log to
+    the shared `logger`, its log methods are serialized with a lock while validators
+    run concurrently. Log rows from concurrent validators are interleaved; `order_log`
+    puts them back in the order a sequential run would have produced."""
+
+    def __init__(
+        self,
+        validator_specs: tuple[ValidatorSpec, ...],
+        max_workers=None,
+        logger=None,
+    ):
+        self._validator_specs = validator_specs
+        self._max_workers = max_workers or os.cpu_count() or 1
+        self._logger = logger
+        self._timings: dict[str, float] = {}
+
+    @property
+    def timings(self) -> dict[str, float]:
+        """Time in seconds for each validator, in the order they are specified."""
+        return self._timings
+
+    @property
+    def per_visit_validators(self) -> set[str]:
+        return {
+            spec.validator.__name__ for spec in self._validator_specs if spec.per_visit
+        }
+
+    def run(self, controller, visit_keys: set[str] | None = None):
+        """Run all validators. When `visit_keys` is given, per visit validators are only
+        run on the rows of those visits."""
+        validator_instances = [
+            (spec, spec.validator(**spec.parameters)) for spec in self._validator_specs
+        ]
+        if visit_keys is None:
+            timings = self._run(validator_instances, controller)
+        else:
+            per_visit = [(spec, v) for spec, v in validator_instances if spec.per_visit]
+            other = [(spec, v) for spec, v in validator_instances if not spec.per_visit]
+            timings = {}
+            if per_visit and visit_keys:
+                with _restricted_to_visits(controller, visit_keys):
+                    timings |= self._run(per_visit, controller)
+            timings |= self._run(other, controller)
+
+        self._timings = {
+            validator.name: timings[validator.name]
+            for _, validator in validator_instances
+            if validator.name in timings
+        }
+
+    def order_log(self, log: list[dict]) -> list[dict]:
+        order = {
+            spec.validator.__name__: n for n, spec in enumerate(self._validator_specs)
+        }
+        return sorted(log, key=lambda row: order.get(row.get("cls"), len(order)))
+
+    def _run(self, validator_instances, controller) -> dict[str, float]:
+        independent = [
+            validator for spec, validator in validator_instances if spec.independent
+        ]
+        dependent = [
+            validator for spec, validator in validator_instances if not spec.independent
+        ]
+
+        timings = {}
+        if independent:
+            with _serialized_logging(self._logger) as concurrent:
+                workers = min(self._max_workers, len(independent)) if concurrent else 1
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    for name, seconds in executor.map(
+                        lambda validator: self._validate(controller, validator),
+                        independent,
+                    ):
+                        timings[name] = seconds
+        for validator in dependent:
+            name, seconds = self._validate(controller, validator)
+            timings[name] = seconds
+        return timings
+
+    @staticmethod
+    def _validate(controller, validator) -> tuple[str, float]:
+        t0 = time.perf_counter()
+        controller.validate(validator)
+        t1 = time.perf_counter()
+        return validator.name, t1 - t0
+
+
+@contextmanager
+def _serialized_logging(logger):
+    """Wrap the log methods of the logger with a lock, since SHARKadm does not document
+    its logger as thread safe. Yields whether validators can run concurrently, which
+    they can not when no log methods are found."""
+    if logger is None:
+        yield True
+        return
+    names = [
+        name
+        for name in dir(logger)
+        if name.lstrip("_").startswith("log")
+        and not name.startswith("__")
+        and callable(getattr(logger, name))
+    ]
+    if not names:
+        print(
+            f"WARNING: No log methods found on {type(logger).__name__}, validators are "
+            "run one at a time"
+        )
+        yield False
+        return
+
+    lock = threading.RLock()
+    instance_attributes = vars(logger)
+    saved_methods = {name: instance_attributes.get(name) for name in names}
+    for name in names:
+        setattr(logger, name, _locked(getattr(logger, name), lock))
+    try:
+        yield True
+    finally:
+        for name, method in saved_methods.items():
+            if method is None:
+                delattr(logger, name)
+            else:
+                setattr(logger, name, method)
+
+
+def _locked(method, lock):
+    @functools.wraps(method)
+    def locked_method(*args, **kwargs):
+        with lock:
+            return method(*args, **kwargs)
+
+    return locked_method
+
+
+# SHARKadm has no public way of validating part of the data, so the data of this
+# private attribute of the controller is replaced while the validators run.
+DATA_HOLDER_ATTRIBUTE = "_data_holder"
+
+
+@contextmanager
+def _restricted_to_visits(controller, visit_keys: set[str]):
+    data_holder = getattr(controller, DATA_HOLDER_ATTRIBUTE, None)
+    if data_holder is None or not hasattr(data_holder, "data"):
+        raise RuntimeError(
+            f"Cannot validate part of the data: {type(controller).__name__} has no "
+            f"'{DATA_HOLDER_ATTRIBUTE}.data'. This SHARKadm version "
+            f"({package_version('sharkadm')}) is not supported."
+        )
+    all_data = data_holder.data
+    data_holder.data = all_data.filter(pl.col("visit_key").is_in(list(visit_keys)))
+    try:
+        yield
+    finally:
+        data_holder.data = all_data
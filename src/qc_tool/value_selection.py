@@ -0,0 +1,94 @@
+from typing import Iterator, Sequence
+
+import polars as pl
+from ocean_data_qc.fyskem.parameter import Parameter
+from ocean_data_qc.fyskem.qc_flag import QcFlag
+from ocean_data_qc.fyskem.qc_flags import QcFlags
+
+# Identifies a value in the dataset
+ROW_KEY = ("visit_key", "parameter", "DEPH")
+
+
+def row_keys(data: pl.DataFrame) -> pl.Series:
+    """Row keys as strings, used to identify values in the browser."""
+    return data.select(
+        pl.concat_str(
+            [pl.col(column).cast(pl.String) for column in ROW_KEY], separator="|"
+        )
+    ).to_series()
+
+
+class ValueSelection(Sequence[Parameter]):
+    """Selected values stored as rows of a frame.
+
+    Indexing or iterating the selection gives `Parameter` objects. They are only
+    created for the values that are accessed, so selecting thousands of values does
+    not create thousands of Python objects."""
+
+    def __init__(
+        self, data: pl.DataFrame | None = None, rows: Sequence[int] | None = None
+    ):
+        if data is None:
+            data = pl.DataFrame(
+                schema={
+                    "visit_key": pl.String,
+                    "parameter": pl.String,
+                    "DEPH": pl.Float64,
+                    "quality_flag_long": pl.String,
+                }
+            )
+        elif rows is not None:
+            data = data[list(rows)]
+        self._data = data
+        self._parameters: dict[int, Parameter] = {}
+
+    @property
+    def data(self) -> pl.DataFrame:
+        return self._data
+
+    def __len__(self) -> int:
+        return self._data.height
+
+    def __getitem__(self, index: int) -> Parameter:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        if index not in self._parameters:
+            self._parameters[index] = Parameter(self._data.row(index, named=True))
+        return self._parameters[index]
+
+    def __iter__(self) -> Iterator[Parameter]:
+        return (self[index] for index in range(len(self)))
+
+    def keys(self) -> set[tuple]:
+        return set(self._data.select(ROW_KEY).iter_rows())
+
+    def iter_flags(self) -> Iterator[tuple[tuple, QcFlags]]:
+        for *key, quality_flag_long in self._data.select(
+            *ROW_KEY, "quality_flag_long"
+        ).iter_rows():
+            yield tuple(key), QcFlags.from_string(quality_flag_long)
+
+    def without(self, index: int) -> "ValueSelection":
+        return ValueSelection(self._data, [n for n in range(len(self)) if n != index])
+
+    def set_manual_flag(self, flag: QcFlag, category: str, comment: str):
+        manual_flags = {
+            quality_flag_long: _with_manual_flag(quality_flag_long, flag)
+            for quality_flag_long in self._data["quality_flag_long"].unique()
+        }
+        self._data = self._data.with_columns(
+            pl.col("quality_flag_long").replace_strict(
+                manual_flags, return_dtype=pl.String
+            ),
+            pl.lit(category, dtype=pl.String).alias("MANUAL_QC_CATEGORY"),
+            pl.lit(comment, dtype=pl.String).alias("MANUAL_QC_COMMENT"),
+        )
+        self._parameters = {}
+
+
+def _with_manual_flag(quality_flag_long: str, flag: QcFlag) -> str:
+    qc_flags = QcFlags.from_string(quality_flag_long)
+    qc_flags.manual = flag
+    return str(qc_flags)
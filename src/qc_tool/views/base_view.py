@@ -1,5 +1,7 @@
 import abc
+from contextlib import contextmanager
 
+from bokeh.io import curdoc
 from bokeh.models import UIElement
 
 
@@ -7,3 +9,17 @@ class BaseView(abc.ABC):
     @abc.abstractmethod
     def layout(self) -> UIElement:
         pass
+
+    @contextmanager
+    def hold_document(self):
+        """Combine all document changes made in the block into one update that is sent
+        when the block ends. Nested blocks are part of the outermost block."""
+        document = curdoc()
+        if document.callbacks.hold_value is not None:
+            yield
+            return
+        document.hold("combine")
+        try:
+            yield
+        finally:
+            document.unhold()
@@ -1,22 +1,30 @@
 import typing
 
-from qc_tool.models.manual_qc_model import ManualQcModel
-
 if typing.TYPE_CHECKING:
     from qc_tool.controllers.filtered_profiles_controller import (
         FilteredProfilesController,
     )
 
+import numpy as np
 import polars as pl
 from bokeh.models import Column, Row
 from ocean_data_qc import statistic
-from ocean_data_qc.fyskem.qc_flag import QC_FLAG_CSS_COLORS, QcFlag
+from ocean_data_qc.fyskem.qc_flag import QcFlag
 from ocean_data_qc.fyskem.qc_flags import QcFlags
 
 from qc_tool.filtered_profiles_slot import FilteredProfilesSlot
+from qc_tool.frame_cache import FrameCache
 from qc_tool.models.filter_model import FilterModel
 from qc_tool.models.filtered_profiles_model import FilteredProfilesModel
+from qc_tool.models.memory_model import MemoryModel
 from qc_tool.models.visits_model import VisitsModel
+from qc_tool.selection_link import SelectionLink
+from qc_tool.slot_source import (
+    LabelCodes,
+    background_data,
+    float_column,
+    profile_source_data,
+)
 from qc_tool.views.base_view import BaseView
 
 
@@ -27,7 +35,9 @@ class FilteredProfilesView(BaseView):
         filtered_profiles_model: FilteredProfilesModel,
         filter_model: FilterModel,
         visits_model: VisitsModel,
-        manual_qc_model: ManualQcModel,
+        selection_link: SelectionLink,
+        text_labels: LabelCodes,
+        memory_model: MemoryModel,
     ):
         self._controller = controller
         self._controller.filtered_profiles_view = self
@@ -35,7 +45,8 @@ class FilteredProfilesView(BaseView):
         self._filtered_profiles_model = filtered_profiles_model
         self._filter_model = filter_model
         self._visits_model = visits_model
-        self._manual_qc_model = manual_qc_model
+        self._selection_link = selection_link
+        self._text_labels = text_labels
 
         self._columns = 5
         self._rows = 2
@@ -44,8 +55,11 @@ class FilteredProfilesView(BaseView):
         self._column = Column(children=[], sizing_mode="stretch_both")
 
         self._build_grid()
-        self._parameter_data = {}
-        self._background_data = None
+        self._parameter_data = FrameCache(memory_model)
+        # Filtered values and depths per parameter, and the background of each
+        # parameter for the water depth it was computed for
+        self._filtered_parameter_data = FrameCache(memory_model)
+        self._background_data = FrameCache(memory_model)
 
     @property
     def layout(self):
@@ -54,16 +68,18 @@ class FilteredProfilesView(BaseView):
     def _build_grid(self):
         total_profiles = self._rows * self._columns
         self._primary_plot = FilteredProfilesSlot(
-            manual_qc_model=self._manual_qc_model,
+            selection_link=self._selection_link,
             filtered_profiles_model=self._filtered_profiles_model,
+            text_labels=self._text_labels,
             profile_index=0,
         )
         self._profiles.append(self._primary_plot)
         for i in range(total_profiles - 1):
             self._profiles.append(
                 FilteredProfilesSlot(
-                    manual_qc_model=self._manual_qc_model,
+                    selection_link=self._selection_link,
                     filtered_profiles_model=self._filtered_profiles_model,
+                    text_labels=self._text_labels,
                     linked_plot=self._primary_plot,
                     profile_index=i,
                 )
@@ -80,6 +96,14 @@ class FilteredProfilesView(BaseView):
             profile.update_colors(updated_values)
 
     def update_grid_content(self, flag: str):
+        # All slot updates are sent to the browser as one message
+        with self.hold_document():
+            self._update_grid_content(flag)
+
+    def _update_grid_content(self, flag: str):
+        if flag in ("file", "filter"):
+            self._filtered_parameter_data.clear()
+            self._background_data.clear()
         if self._visits_model.selected_visit is None:
             return
         for i, profile in enumerate(self._profiles):
@@ -146,40 +170,10 @@ class FilteredProfilesView(BaseView):
                     return_dtype=pl.Utf8,
                 )
             )
-            qc_flags = list(map(QcFlags.from_string, parameter_data["quality_flag_long"]))
-
-            colors = [
-                QC_FLAG_CSS_COLORS.get(QcFlag.parse(flag))
-                for flag in parameter_data["quality_flag"]
-            ]
-
-            line_colors = [
-                "black" if flags.incoming.value != flags.total.value else "none"
-                for flags in qc_flags
-            ]
-
             if parameter_data.is_empty():
                 source_data = None
             else:
-                source_data = {
-                    "x": list(parameter_data["value"]),
-                    "unit": list(parameter_data["unit"]),
-                    "y": list(parameter_data["DEPH"]),
-                    "color": colors,
-                    "line_color": line_colors,
-                    "qc": [f"{flags.total} ({flags.total.value})" for flags in qc_flags],
-                    "qc_incoming": [
-                        f"{flags.incoming} ({flags.incoming.value})" for flags in qc_flags
-                    ],
-                    "qc_automatic": [
-                        f"{flags.total_automatic} {flags.total_automatic_name}"
-                        for flags in qc_flags
-                    ],
-                    "qc_manual": [
-                        f"{flags.manual} ({flags.manual.value})" for flags in qc_flags
-                    ],
-                    "data": parameter_data,
-                }
+                source_data = profile_source_data(parameter_data, self._text_labels)
 
             if None in (self._visits_model.selected_visit.sea_basin, source_data):
                 parameter_statistics = None
@@ -215,19 +209,29 @@ class FilteredProfilesView(BaseView):
         if self._filter_model.filtered_data.is_empty():
             return None
 
-        data = self._filter_model.filtered_data.filter(
-            (pl.col("parameter") == parameter)
-            & (
-                pl.col("DEPH") <= self._visits_model.selected_visit.water_depth
-                if self._visits_model.selected_visit.water_depth is not None
-                else pl.lit(True)
+        if parameter not in self._filtered_parameter_data:
+            data = self._filter_model.filtered_data.filter(
+                pl.col("parameter") == parameter
+            ).sort("DEPH", nulls_last=True)
+            self._filtered_parameter_data[parameter] = (
+                float_column(data["value"]),
+                float_column(data["DEPH"]),
             )
-        ).sort("DEPH")
 
-        if data.is_empty():
-            return None
+        water_depth = self._visits_model.selected_visit.water_depth
+        if (
+            parameter not in self._background_data
+            or self._background_data[parameter][0] != water_depth
+        ):
+            values, depths = self._filtered_parameter_data[parameter]
+            end = (
+                len(depths)
+                if water_depth is None
+                else np.searchsorted(depths, water_depth, side="right")
+            )
+            self._background_data[parameter] = (
+                water_depth,
+                background_data(values[:end], depths[:end]) if end else None,
+            )
 
-        return {
-            "x": list(data["value"]),
-            "y": list(data["DEPH"]),
-        }
+        return self._background_data[parameter][1]
@@ -5,6 +5,7 @@ from qc_tool.controllers.main_controller import MainController
 from qc_tool.views.base_view import BaseView
 from qc_tool.views.filter_view import FilterView
 from qc_tool.views.help_view import HelpView
+from qc_tool.views.memory_view import MemoryView
 from qc_tool.views.summary_view import SummaryView
 from qc_tool.views.visits_browser_view import VisitsBrowserView
 
@@ -25,6 +26,7 @@ class MainView(BaseView):
             self._controller.visits_browser_controller.profile_grid_controller,
             self._controller.visits_browser_controller.filtered_profiles_controller,
             self._controller.visits_browser_controller.scatter_controller,
+            self._controller.visits_browser_controller.scatter_matrix_controller,
             self._controller.visits_browser_controller.manual_qc_controller,
             self._controller.visits_browser_controller.comment_dialog_controller,
         )
@@ -38,9 +40,10 @@ class MainView(BaseView):
         )
 
         self._help_view = HelpView()
+        self._memory_view = MemoryView(state.memory)
 
         # Create layout
-        self._filter = Row(children=[self._filter_view.layout])
+        self._filter = Row(children=[self._filter_view.layout, self._memory_view.layout])
         self._tabs = Tabs(
             tabs=[
                 TabPanel(child=self._summary_view.layout, title="Summary"),
@@ -4,16 +4,21 @@ if typing.TYPE_CHECKING:
     from qc_tool.controllers.map_controller import MapController
 
 import numpy as np
+from bokeh.events import RangesUpdate
 from bokeh.models import (
     PanTool,
     ResetTool,
     TapTool,
     WheelZoomTool,
+    WMTSTileSource,
 )
 from bokeh.models.sources import ColumnDataSource
 from bokeh.plotting import figure
+from bokeh.transform import factor_cmap
 
+from qc_tool.map_clusters import CLUSTER_GRID_CELLS, CLUSTER_MIN_POINTS, grid_clusters
 from qc_tool.models.map_model import MapModel
+from qc_tool.tile_cache import LOCAL_TILE_URL, TILE_PROVIDER, local_tiles_enabled
 from qc_tool.views.base_view import BaseView
 
 
@@ -44,7 +49,26 @@ class MapView(BaseView):
             match_aspect=True,
         )
         self._map.toolbar.active_scroll = wheel_zoom
-        self._map.add_tile("Esri.OceanBasemap")
+        # Drawn below the tiles, so the coastline is shown where tiles are missing
+        self._map.multi_polygons(
+            xs="xs",
+            ys="ys",
+            source=self._map_model.coastline,
+            level="image",
+            fill_color="#dcecf5",
+            line_color="#7a9cb4",
+            line_width=0.5,
+        )
+        if local_tiles_enabled():
+            self._map.add_tile(
+                WMTSTileSource(
+                    url=LOCAL_TILE_URL,
+                    attribution=TILE_PROVIDER.html_attribution,
+                    max_zoom=TILE_PROVIDER.get("max_zoom", 30),
+                )
+            )
+        else:
+            self._map.add_tile(TILE_PROVIDER)
 
         empty_source = ColumnDataSource(data=dict(x=[np.nan], y=[np.nan]))
         self._map.scatter(
@@ -55,17 +79,21 @@ class MapView(BaseView):
             fill_color="black",
             legend_label="selected",
         )
-        self._map.scatter(
-            x="longitudes",
-            y="latitudes",
+        status_colors = factor_cmap(
+            "status", palette=["blue", "red"], factors=list(MapModel.STATUSES)
+        )
+        self._points = self._map.scatter(
+            x="x",
+            y="y",
             source=self._map_model.unselected,
+            view=self._map_model.view,
             line_width=0,
             fill_alpha=0.7,
             nonselection_fill_alpha=0.7,
             selection_fill_alpha=0.7,
             size=7,
-            fill_color="color",
-            nonselection_fill_color="color",
+            fill_color=status_colors,
+            nonselection_fill_color=status_colors,
             selection_fill_color="black",
             legend_field="status",
         )
@@ -74,6 +102,34 @@ class MapView(BaseView):
             "indices", self._station_selected_callback
         )
 
+        # Clusters are shown instead of the points when the shown area has many points
+        self._cluster_size = None
+        self._cluster_source = ColumnDataSource(data=self._empty_clusters())
+        self._clusters = self._map.scatter(
+            x="x",
+            y="y",
+            source=self._cluster_source,
+            size="size",
+            fill_color=status_colors,
+            fill_alpha=0.6,
+            line_color="white",
+            nonselection_fill_alpha=0.6,
+        )
+        self._map.text(
+            x="x",
+            y="y",
+            text="label",
+            source=self._cluster_source,
+            text_align="center",
+            text_baseline="middle",
+            text_font_size="9px",
+            text_color="white",
+        )
+        self._cluster_source.selected.on_change(
+            "indices", self._cluster_selected_callback
+        )
+        self._map.on_event(RangesUpdate, self._on_ranges_update)
+
         self._map.legend.title = "Visit status"
         self._map.legend.location = "top_right"
         self._map.legend.visible = False
@@ -96,6 +152,74 @@ class MapView(BaseView):
             station_visit = self._map_model.unselected.data["visit_keys"][selected_index]
             self._controller.select_visit(station_visit)
 
+    def _cluster_selected_callback(self, attr, old, new):
+        if not new:
+            return
+        # Zoom in on the cluster, which shows the points or smaller clusters
+        x = self._cluster_source.data["x"][new[0]]
+        y = self._cluster_source.data["y"][new[0]]
+        half_width = self._cluster_size
+        half_height = half_width * self.height / self.width
+        self._cluster_source.selected.indices = []
+        self.set_position(
+            x - half_width, x + half_width, y - half_height, y + half_height
+        )
+        self.update_level_of_detail()
+
+    def _on_ranges_update(self, event: RangesUpdate):
+        self._update_level_of_detail(event.x0, event.x1, event.y0, event.y1)
+
+    def update_level_of_detail(self):
+        self._update_level_of_detail(
+            self._map.x_range.start,
+            self._map.x_range.end,
+            self._map.y_range.start,
+            self._map.y_range.end,
+        )
+
+    def _update_level_of_detail(self, x_start, x_end, y_start, y_end):
+        rows = self._map_model.visible_rows
+        if not len(rows):
+            self._points.visible = True
+            if len(self._cluster_source.data["x"]):
+                self._cluster_source.data = self._empty_clusters()
+            return
+
+        data = self._map_model.unselected.data
+        x = data["x"][rows]
+        y = data["y"][rows]
+        shown = (
+            (x >= min(x_start, x_end))
+            & (x <= max(x_start, x_end))
+            & (y >= min(y_start, y_end))
+            & (y <= max(y_start, y_end))
+        )
+        if np.count_nonzero(shown) <= CLUSTER_MIN_POINTS:
+            self._points.visible = True
+            if len(self._cluster_source.data["x"]):
+                self._cluster_source.data = self._empty_clusters()
+            return
+
+        self._cluster_size = abs(x_end - x_start) / CLUSTER_GRID_CELLS
+        clusters = grid_clusters(
+            x[shown],
+            y[shown],
+            self._map_model.status_codes[rows][shown],
+            self._cluster_size,
+        )
+        self._points.visible = False
+        self._cluster_source.data = {
+            "x": clusters["x"],
+            "y": clusters["y"],
+            "label": clusters["count"].astype(str).astype(object),
+            "status": np.array(MapModel.STATUSES, dtype=object)[clusters["status"]],
+            "size": 10 + 4 * np.log10(clusters["count"]),
+        }
+
+    @staticmethod
+    def _empty_clusters() -> dict:
+        return {"x": [], "y": [], "label": [], "status": [], "size": []}
+
     def set_position(self, x_start, x_end, y_start, y_end):
         self._map.x_range.start = x_start
         self._map.x_range.end = x_end
@@ -0,0 +1,23 @@
+from bokeh.models import Div
+
+from qc_tool.models.memory_model import MemoryModel
+from qc_tool.views.base_view import BaseView
+
+
+class MemoryView(BaseView):
+    def __init__(self, memory_model: MemoryModel):
+        self._memory_model = memory_model
+        self._memory_model.register_listener(
+            MemoryModel.USAGE_CHANGED, self._on_usage_changed
+        )
+        self._div = Div()
+        self._on_usage_changed()
+
+    def _on_usage_changed(self):
+        used = self._memory_model.used / 1024 / 1024
+        budget = self._memory_model.budget / 1024 / 1024
+        self._div.text = f"Cache: {used:.0f} of {budget:.0f} MB"
+
+    @property
+    def layout(self):
+        return self._div
@@ -1,20 +1,20 @@
 import typing
 
-from qc_tool.models.manual_qc_model import ManualQcModel
-
 if typing.TYPE_CHECKING:
     from qc_tool.controllers.profile_grid_controller import ProfileGridController
 
 import polars as pl
 from bokeh.models import Column, Row
 from ocean_data_qc import statistic
-from ocean_data_qc.fyskem.qc_flag import QC_FLAG_CSS_COLORS, QcFlag
+from ocean_data_qc.fyskem.qc_flag import QcFlag
 from ocean_data_qc.fyskem.qc_flags import QcFlags
 
 from qc_tool.models.parameters_model import ParametersModel
 from qc_tool.models.profiles_grid_model import ProfileGridModel
 from qc_tool.models.visits_model import VisitsModel
 from qc_tool.profile_slot import ProfileSlot
+from qc_tool.selection_link import SelectionLink
+from qc_tool.slot_source import LabelCodes, profile_source_data
 from qc_tool.views.base_view import BaseView
 
 
@@ -25,7 +25,8 @@ class ProfileGridView(BaseView):
         profile_grid_model: ProfileGridModel,
         parameters_model: ParametersModel,
         visits_model: VisitsModel,
-        manual_qc_model: ManualQcModel,
+        selection_link: SelectionLink,
+        text_labels: LabelCodes,
     ):
         self._controller = controller
         self._controller.profile_grid_view = self
@@ -33,10 +34,12 @@ class ProfileGridView(BaseView):
         self._profile_grid_model = profile_grid_model
         self._parameters_model = parameters_model
         self._visits_model = visits_model
-        self._manual_qc_model = manual_qc_model
+        self._selection_link = selection_link
+        self._text_labels = text_labels
 
         # Persistent layout container to allow dynamic, in-place updates
         self._profiles = []
+        self._slot_grid: list[list[ProfileSlot]] = []
         self._primary_plot = None
 
         self._column = Column(children=[], sizing_mode="stretch_both")
@@ -54,57 +57,48 @@ class ProfileGridView(BaseView):
     def update_grid_size(self) -> int:
         """Syncs layout with the correct rows and columns.
 
-        Returns the index of the first newly added profile, or len(_profiles)
-        if no profiles were added.
+        Slots are kept in a grid of all rows and columns that have been shown. Slots
+        outside the current grid size are hidden instead of removed, and new slots are
+        only created the first time a row or column is shown.
+
+        Returns the index of the first profile that shows another slot than before,
+        or len(_profiles) if no profiles were changed.
         """
-        if not self._profiles:
-            self._primary_plot = ProfileSlot(
-                manual_qc_model=self._manual_qc_model,
-            )
-            self._profiles.append(self._primary_plot)
-
-        first_new = len(self._profiles)
-
-        if len(self._profiles) < self._profile_grid_model.number_of_profiles:
-            # Too few profiles, creating new.
-            for _ in range(
-                self._profile_grid_model.number_of_profiles - len(self._profiles)
-            ):
-                self._profiles.append(
-                    ProfileSlot(
-                        manual_qc_model=self._manual_qc_model,
-                        linked_plot=self._primary_plot,
-                    )
-                )
-        elif len(self._profiles) > self._profile_grid_model.number_of_profiles:
-            # Too many profiles, removing extra.
-            self._profiles = self._profiles[: self._profile_grid_model.number_of_profiles]
-
-        for n, row in enumerate(self.plot_rows):
-            if len(row.children) != self._profile_grid_model.columns:
-                # Wrong column width for row, recreating from profiles
-                start = n * self._profile_grid_model.columns
-                end = start + self._profile_grid_model.columns
-                row.children = [profile.layout for profile in self._profiles[start:end]]
-
-        if len(self.plot_rows) < self._profile_grid_model.rows:
-            # Too few rows, creating new
-            plotted_rows = len(self.plot_rows)
-            for n in range(self._profile_grid_model.rows - plotted_rows):
-                start = (plotted_rows + n) * self._profile_grid_model.columns
-                end = start + self._profile_grid_model.columns
-                self.plot_rows.append(
-                    Row(
-                        children=[profile.layout for profile in self._profiles[start:end]]
-                    )
+        rows = self._profile_grid_model.rows
+        columns = self._profile_grid_model.columns
+
+        for _ in range(len(self._slot_grid), rows):
+            self._slot_grid.append([])
+            self.plot_rows.append(Row(children=[]))
+        for slot_row, plot_row in zip(self._slot_grid[:rows], self.plot_rows):
+            for _ in range(len(slot_row), columns):
+                slot = ProfileSlot(
+                    selection_link=self._selection_link,
+                    text_labels=self._text_labels,
+                    linked_plot=self._primary_plot,
                 )
-        elif len(self.plot_rows) > self._profile_grid_model.rows:
-            # Too many rows, removing extra
-            for extra_row in self.plot_rows[self._profile_grid_model.rows :]:
-                self.plot_rows.remove(extra_row)
-            self._profiles = self._profiles[: self._profile_grid_model.rows]
-
-        return first_new
+                self._primary_plot = self._primary_plot or slot
+                slot_row.append(slot)
+                plot_row.children.append(slot.layout)
+
+        for n, (slot_row, plot_row) in enumerate(zip(self._slot_grid, self.plot_rows)):
+            plot_row.visible = n < rows
+            for m, slot in enumerate(slot_row):
+                slot.layout.visible = n < rows and m < columns
+
+        profiles = [
+            slot for slot_row in self._slot_grid[:rows] for slot in slot_row[:columns]
+        ]
+        first_changed = next(
+            (
+                n
+                for n, (old, new) in enumerate(zip(self._profiles, profiles))
+                if old is not new
+            ),
+            min(len(self._profiles), len(profiles)),
+        )
+        self._profiles = profiles
+        return first_changed
 
     @property
     def layout(self):
@@ -115,6 +109,11 @@ class ProfileGridView(BaseView):
             profile.update_colors(updated_values)
 
     def update_grid_content(self, start_index: int = 0):
+        # All slot updates are sent to the browser as one message
+        with self.hold_document():
+            self._update_grid_content(start_index)
+
+    def _update_grid_content(self, start_index: int = 0):
         empty_slots = [""] * max(
             self._profile_grid_model.number_of_profiles
             - len(self._parameters_model.selected_parameters),
@@ -182,40 +181,10 @@ class ProfileGridView(BaseView):
                 )
             )
 
-            qc_flags = list(map(QcFlags.from_string, parameter_data["quality_flag_long"]))
-
-            colors = [
-                QC_FLAG_CSS_COLORS.get(QcFlag.parse(flag))
-                for flag in parameter_data["quality_flag"]
-            ]
-
-            line_colors = [
-                "black" if flags.incoming.value != flags.total.value else "none"
-                for flags in qc_flags
-            ]
-
             if parameter_data.is_empty():
                 source_data = None
             else:
-                source_data = {
-                    "x": list(parameter_data["value"]),
-                    "unit": list(parameter_data["unit"]),
-                    "y": list(parameter_data["DEPH"]),
-                    "color": colors,
-                    "line_color": line_colors,
-                    "qc": [f"{flags.total} ({flags.total.value})" for flags in qc_flags],
-                    "qc_incoming": [
-                        f"{flags.incoming} ({flags.incoming.value})" for flags in qc_flags
-                    ],
-                    "qc_automatic": [
-                        f"{flags.total_automatic} {flags.total_automatic_name}"
-                        for flags in qc_flags
-                    ],
-                    "qc_manual": [
-                        f"{flags.manual} ({flags.manual.value})" for flags in qc_flags
-                    ],
-                    "data": parameter_data,
-                }
+                source_data = profile_source_data(parameter_data, self._text_labels)
 
             if None in (self._visits_model.selected_visit.sea_basin, source_data):
                 parameter_statistics = None
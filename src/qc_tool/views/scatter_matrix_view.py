@@ -0,0 +1,224 @@
+import typing
+
+if typing.TYPE_CHECKING:
+    from qc_tool.controllers.scatter_matrix_controller import (
+        ScatterMatrixController,
+    )
+
+import numpy as np
+import polars as pl
+from bokeh.layouts import gridplot
+from bokeh.models import Column, ColumnDataSource, DataRange1d, Div, Select
+from bokeh.plotting import figure
+
+from qc_tool.models.filter_model import FilterModel
+from qc_tool.models.scatter_matrix_model import PARAMETER_SETS, ScatterMatrixModel
+from qc_tool.models.wide_table_model import WideTableModel
+from qc_tool.scatter_slot import expand_abbreviation
+from qc_tool.slot_source import (
+    DENSITY_MIN_POINTS,
+    background_data,
+    density_color_mapper,
+    float_column,
+)
+from qc_tool.views.base_view import BaseView
+from qc_tool.wide_table import column_name
+
+# Samples sent to the browser as points. When there are more samples, every n:th
+# sample is sent and each panel shows the density of all samples behind the points.
+MATRIX_MAX_POINTS = DENSITY_MIN_POINTS
+
+HISTOGRAM_BINS = 30
+
+
+class ScatterMatrixView(BaseView):
+    _panel_size = 160
+
+    def __init__(
+        self,
+        controller: "ScatterMatrixController",
+        scatter_matrix_model: ScatterMatrixModel,
+        filter_model: FilterModel,
+        wide_table_model: WideTableModel,
+    ):
+        self._controller = controller
+        self._controller.scatter_matrix_view = self
+
+        self._scatter_matrix_model = scatter_matrix_model
+        self._filter_model = filter_model
+        self._wide_table_model = wide_table_model
+
+        self._parameter_select = Select(
+            title="Parameters",
+            options=list(PARAMETER_SETS),
+            value=self._scatter_matrix_model.parameter_set,
+            width=200,
+        )
+        self._parameter_select.on_change("value", self._on_parameter_set_selected)
+        self._info = Div(text="")
+
+        # Values of all panels, each panel plots two of the columns
+        self._source = ColumnDataSource(data={})
+        self._parameters = ()
+        self._density_sources = {}
+        self._histogram_sources = {}
+
+        self._column = Column(
+            children=[self._parameter_select, self._info], sizing_mode="stretch_width"
+        )
+
+    @property
+    def layout(self):
+        return self._column
+
+    def _on_parameter_set_selected(self, attr, old, new):
+        self._controller.set_parameter_set(new)
+
+    def update_matrix(self):
+        # All panel updates are sent to the browser as one message
+        with self.hold_document():
+            self._update_matrix()
+
+    def _update_matrix(self):
+        data = self._matrix_data()
+        parameters = tuple(
+            parameter
+            for parameter in self._scatter_matrix_model.parameters
+            if data is not None and column_name("value", parameter) in data.columns
+        )
+        if parameters != self._parameters:
+            self._build_matrix(parameters)
+        if data is None or len(parameters) < 2:
+            self._source.data = {}
+            self._info.text = "No data for the parameters"
+            return
+
+        values = {
+            parameter: float_column(data[column_name("value", parameter)])
+            for parameter in parameters
+        }
+        step = -(-data.height // MATRIX_MAX_POINTS)
+        self._source.data = {
+            column_name("value", parameter): parameter_values[::step]
+            for parameter, parameter_values in values.items()
+        }
+        shown = len(next(iter(self._source.data.values())))
+        self._info.text = (
+            f"{data.height} samples"
+            if step == 1
+            else f"{data.height} samples, {shown} shown as points"
+        )
+
+        for (x_parameter, y_parameter), density_source in self._density_sources.items():
+            density = (
+                background_data(values[x_parameter], values[y_parameter])
+                if step > 1
+                else {}
+            )
+            density_source.data = (
+                density
+                if "image" in density
+                else {"image": [], "x": [], "y": [], "dw": [], "dh": []}
+            )
+
+        for parameter, histogram_source in self._histogram_sources.items():
+            parameter_values = values[parameter][np.isfinite(values[parameter])]
+            counts, edges = np.histogram(parameter_values, bins=HISTOGRAM_BINS)
+            histogram_source.data = {
+                "left": edges[:-1],
+                "right": edges[1:],
+                "top": counts,
+            }
+
+    def _matrix_data(self) -> pl.DataFrame | None:
+        table = self._wide_table_model.table
+        if table is None or self._filter_model.filtered_data.is_empty():
+            return None
+
+        columns = [
+            column_name("value", parameter)
+            for parameter in self._scatter_matrix_model.parameters
+            if column_name("value", parameter) in table.data.columns
+        ]
+        if len(columns) < 2:
+            return None
+        # Samples with values for at least one pair of parameters
+        return (
+            table.data.select(columns)
+            .filter(
+                table.visit_rows(self._filter_model.filtered_data["visit_key"].unique())
+            )
+            .filter(pl.sum_horizontal(pl.col(columns).is_not_null()) >= 2)
+        )
+
+    def _build_matrix(self, parameters: tuple[str, ...]):
+        self._parameters = parameters
+        self._density_sources = {}
+        self._histogram_sources = {}
+        ranges = {parameter: DataRange1d() for parameter in parameters}
+        color_mapper = density_color_mapper()
+
+        rows = []
+        for i, y_parameter in enumerate(parameters):
+            row = []
+            for j, x_parameter in enumerate(parameters):
+                if j > i:
+                    row.append(None)
+                    continue
+                panel = figure(
+                    width=self._panel_size,
+                    height=self._panel_size,
+                    x_range=ranges[x_parameter],
+                    y_range=ranges[y_parameter] if i != j else DataRange1d(start=0),
+                    tools="pan,wheel_zoom,box_select,lasso_select,reset",
+                    output_backend="webgl",
+                )
+                if i == len(parameters) - 1:
+                    panel.xaxis.axis_label = expand_abbreviation(x_parameter)
+                if j == 0:
+                    panel.yaxis.axis_label = expand_abbreviation(y_parameter)
+
+                if i == j:
+                    source = ColumnDataSource(data={"left": [], "right": [], "top": []})
+                    panel.quad(
+                        left="left",
+                        right="right",
+                        top="top",
+                        bottom=0,
+                        source=source,
+                        color="gray",
+                    )
+                    self._histogram_sources[x_parameter] = source
+                else:
+                    source = ColumnDataSource(
+                        data={"image": [], "x": [], "y": [], "dw": [], "dh": []}
+                    )
+                    panel.image(
+                        image="image",
+                        x="x",
+                        y="y",
+                        dw="dw",
+                        dh="dh",
+                        source=source,
+                        color_mapper=color_mapper,
+                    )
+                    self._density_sources[(x_parameter, y_parameter)] = source
+                    # Selecting samples in one panel selects them in all panels
+                    panel.scatter(
+                        column_name("value", x_parameter),
+                        column_name("value", y_parameter),
+                        source=self._source,
+                        size=3,
+                        color="navy",
+                        alpha=0.5,
+                        selection_color="orange",
+                        nonselection_alpha=0.1,
+                    )
+                row.append(panel)
+            rows.append(row)
+
+        self._column.children = [
+            self._parameter_select,
+            self._info,
+            *([gridplot(rows, toolbar_location="right")] if len(parameters) > 1 else []),
+        ]
@@ -7,16 +7,20 @@ if typing.TYPE_CHECKING:
         ScatterController,
     )
 
+import numpy as np
 import polars as pl
 from bokeh.models import Column, Row
-from ocean_data_qc.fyskem.qc_flag import QC_FLAG_CSS_COLORS, QcFlag
 from ocean_data_qc.fyskem.qc_flags import QcFlags
 
 from qc_tool.models.filter_model import FilterModel
 from qc_tool.models.scatter_model import ScatterModel
 from qc_tool.models.visits_model import VisitsModel
+from qc_tool.models.wide_table_model import WideTableModel
 from qc_tool.scatter_slot import ScatterSlot
+from qc_tool.slot_source import LabelCodes, flag_codes, float_column
+from qc_tool.value_selection import ValueSelection
 from qc_tool.views.base_view import BaseView
+from qc_tool.wide_table import parameter_pair
 
 
 class ScatterView(BaseView):
@@ -27,6 +31,8 @@ class ScatterView(BaseView):
         filter_model: FilterModel,
         visits_model: VisitsModel,
         manual_qc_model: ManualQcModel,
+        wide_table_model: WideTableModel,
+        text_labels: LabelCodes,
     ):
         self._controller = controller
         self._controller.scatter_view = self
@@ -35,6 +41,8 @@ class ScatterView(BaseView):
         self._filter_model = filter_model
         self._visits_model = visits_model
         self._manual_qc_model = manual_qc_model
+        self._wide_table_model = wide_table_model
+        self._text_labels = text_labels
 
         self._columns = 5
         self._rows = 2
@@ -44,7 +52,8 @@ class ScatterView(BaseView):
 
         self._build_grid()
         self._parameter_data = {}
-        self._background_data = None
+        # Rows of the wide table that match the filter
+        self._filtered_rows: pl.Series | None = None
 
     @property
     def layout(self):
@@ -55,6 +64,7 @@ class ScatterView(BaseView):
         self._primary_plot = ScatterSlot(
             manual_qc_model=self._manual_qc_model,
             scatter_model=self._scatter_model,
+            text_labels=self._text_labels,
             scatter_index=0,
         )
         self._scatters.append(self._primary_plot)
@@ -63,6 +73,7 @@ class ScatterView(BaseView):
                 ScatterSlot(
                     manual_qc_model=self._manual_qc_model,
                     scatter_model=self._scatter_model,
+                    text_labels=self._text_labels,
                     scatter_index=i,
                 )
             )
@@ -73,11 +84,18 @@ class ScatterView(BaseView):
             row = Row(children=[scatter.layout for scatter in self._scatters[start:end]])
             self._column.children.append(row)
 
-    def update_colors(self, updated_values):
+    def update_colors(self, updated_values: ValueSelection):
         for scatter in self._scatters:
             scatter.update_colors(updated_values)
 
     def update_grid_content(self, flag: str):
+        # All slot updates are sent to the browser as one message
+        with self.hold_document():
+            self._update_grid_content(flag)
+
+    def _update_grid_content(self, flag: str):
+        if flag in ("file", "filter"):
+            self._update_filtered_rows()
         if self._visits_model.selected_visit is None:
             return
         for i, scatter in enumerate(self._scatters):
@@ -120,59 +138,36 @@ class ScatterView(BaseView):
                     self._visits_model.selected_visit.parameters
                 )
 
-    def _load_parameters(self, x_parameter, y_parameter):
-        if self._visits_model.selected_visit is None:
-            self._parameter_data = None, None
-            return self._parameter_data
-
-        merged_data = (
-            self._visits_model.selected_visit.data.filter(
-                pl.col("parameter").is_in([x_parameter, y_parameter])
-                & pl.col("value").is_not_null(),
-            )
-            .sort("DEPH")
-            .pivot(
-                index="DEPH",
-                columns="parameter",
-                values=["value", "unit", "quality_flag", "quality_flag_long"],
-            )
+    def _update_filtered_rows(self):
+        if (
+            self._wide_table_model.table is None
+            or self._filter_model.filtered_data.is_empty()
+        ):
+            self._filtered_rows = None
+            return
+        self._filtered_rows = self._wide_table_model.table.visit_rows(
+            self._filter_model.filtered_data["visit_key"].unique()
         )
-        if (f"value_{x_parameter}" not in merged_data.columns) or (
-            f"value_{y_parameter}" not in merged_data.columns
+
+    def _load_parameters(self, x_parameter, y_parameter):
+        if (
+            self._visits_model.selected_visit is None
+            or self._wide_table_model.table is None
         ):
             self._parameter_data = None, None
             return self._parameter_data
 
-        merged_data = merged_data.drop_nulls(
-            [f"value_{x_parameter}", f"value_{y_parameter}"]
+        merged_data = parameter_pair(
+            self._wide_table_model.table.visit(
+                self._visits_model.selected_visit.visit_key
+            ),
+            x_parameter,
+            y_parameter,
         )
-
-        if merged_data.is_empty():
+        if merged_data is None:
             self._parameter_data = None, None
             return self._parameter_data
-
-        for param in [x_parameter, y_parameter]:
-            long_col = f"quality_flag_long_{param}"
-            flag_col = f"quality_flag_{param}"
-
-            if long_col not in merged_data.columns:
-                merged_data = merged_data.with_columns(
-                    pl.col(flag_col)
-                    .map_elements(
-                        lambda x: str(QcFlags(QcFlag.parse(x), None, None, None)),
-                        return_dtype=pl.Utf8,
-                    )
-                    .alias(long_col)
-                )
-
-            merged_data = merged_data.with_columns(
-                pl.struct(long_col)
-                .map_elements(
-                    lambda row: QcFlags.from_string(row[long_col]).total.value,
-                    return_dtype=pl.Utf8,
-                )
-                .alias(flag_col)
-            )
+        merged_data = merged_data.sort("DEPH")
 
         qc_flags_x = list(
             map(QcFlags.from_string, merged_data[f"quality_flag_long_{x_parameter}"])
@@ -181,63 +176,47 @@ class ScatterView(BaseView):
             map(QcFlags.from_string, merged_data[f"quality_flag_long_{y_parameter}"])
         )
 
-        colors = [QC_FLAG_CSS_COLORS.get(flags.total) for flags in qc_flags_x]
-
-        line_colors = [
-            "black" if flags.incoming.value != flags.total.value else "none"
-            for flags in qc_flags_x
-        ]
-
         source_data = {
-            "x_name": [x_parameter] * len(merged_data[f"value_{x_parameter}"]),
-            "x": list(merged_data[f"value_{x_parameter}"]),
-            "x_unit": list(merged_data[f"unit_{x_parameter}"]),
-            "y_name": [y_parameter] * len(merged_data[f"value_{y_parameter}"]),
-            "y": list(merged_data[f"value_{y_parameter}"]),
-            "y_unit": list(merged_data[f"unit_{y_parameter}"]),
-            "depth": list(merged_data["DEPH"]),
-            "color": colors,
-            "line_color": line_colors,
-            "qcx": [f"{flags.total} ({flags.total.value})" for flags in qc_flags_x],
-            "qcy": [f"{flags.total} ({flags.total.value})" for flags in qc_flags_y],
+            "x_name": np.full(
+                merged_data.height, self._text_labels.code(x_parameter), dtype=np.int32
+            ),
+            "x": float_column(merged_data[f"value_{x_parameter}"]),
+            "x_unit": self._text_labels.encode(
+                merged_data[f"unit_{x_parameter}"].fill_null("")
+            ),
+            "y_name": np.full(
+                merged_data.height, self._text_labels.code(y_parameter), dtype=np.int32
+            ),
+            "y": float_column(merged_data[f"value_{y_parameter}"]),
+            "y_unit": self._text_labels.encode(
+                merged_data[f"unit_{y_parameter}"].fill_null("")
+            ),
+            "depth": float_column(merged_data["DEPH"]),
+            "qcx": flag_codes(flags.total for flags in qc_flags_x),
+            "outline": np.fromiter(
+                (flags.incoming.value != flags.total.value for flags in qc_flags_x),
+                dtype=np.uint8,
+            ),
+            "qcy": flag_codes(flags.total for flags in qc_flags_y),
         }
 
         self._parameter_data = source_data, merged_data
         return self._parameter_data
 
     def _load_filtered_data(self, x_parameter, y_parameter):
-        if self._filter_model.filtered_data.is_empty():
+        if self._filtered_rows is None:
             return None
-        df = self._filter_model.filtered_data.select(
-            ["row_number", "visit_key", "parameter", "value"]
-        ).filter(
-            pl.col("parameter").is_in([x_parameter, y_parameter])
-            & pl.col("value").is_not_null()
+        pair = parameter_pair(
+            self._wide_table_model.table.data,
+            x_parameter,
+            y_parameter,
+            fields=("value",),
+            rows=self._filtered_rows,
         )
-        if not (
-            {x_parameter, y_parameter}
-            <= set(df.get_column("parameter").unique().to_list())
-        ):
-            return None
-
-        df = df.with_columns((pl.col("row_number") + pl.col("visit_key")).alias("key"))
-
-        df = df.pivot(
-            index="key",
-            columns="parameter",
-            values="value",
-        ).drop_nulls([x_parameter, y_parameter])
-
-        if (
-            df.is_empty()
-            or x_parameter not in df.columns
-            or y_parameter not in df.columns
-        ):
+        if pair is None:
             return None
 
-        df = df
-
         return {
-            "x": df[x_parameter].to_list(),
-            "y": df[y_parameter].to_list(),
+            "x": float_column(pair[f"value_{x_parameter}"]),
+            "y": float_column(pair[f"value_{y_parameter}"]),
         }
@@ -52,9 +52,6 @@ class SummaryView(BaseView):
             ]
         )
 
-    def update_validation_log(self, validation):
-        self._validation_view.update(validation)
-
     @property
     def layout(self):
         return self._layout
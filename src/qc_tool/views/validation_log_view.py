@@ -3,45 +3,30 @@ import typing
 if typing.TYPE_CHECKING:
     from qc_tool.controllers.validation_log_controller import ValidationLogController
 
-import jinja2
-from bokeh.models import Div, ImportedStyleSheet
+from bokeh.models import (
+    Button,
+    Column,
+    ColumnDataSource,
+    DataTable,
+    Div,
+    Row,
+    Select,
+    TableColumn,
+    TablerIcon,
+)
 
 from qc_tool.models.validation_log_model import ValidationLogModel
 from qc_tool.views.base_view import BaseView
 
-_validation_log_template = jinja2.Template("""
-{% for key, value in validation.items() %}
-  {% if value.count > 0 %}
-  <div class="collapsible-container">
-    <input id="collapsible-{{ key }}" class="toggle" type="checkbox">
-    <label for="collapsible-{{ key }}" class="toggle-label">
-      {{ key }} ({{ value.count }} messages)
-    </label>
-    <div class="collapsible-content">
-      <div class="content-inner">
-        <p>{{ value.description }}</p>
-        <ul>
-        {% for category, messages in value.messages.items() %}
-          {% if category != "General" %}
-            <li><strong>{{ category }}</strong></li>
-            <ul>
-          {% endif %}
-
-          {% for msg in messages %}
-              <li>{{ msg }}</li>
-          {% endfor %}
-
-          {% if category != "General" %}
-            </ul>
-          {% endif %}
-        {% endfor %}
-        </ul>
-      </div>
-    </div>
-  </div>
-  {% endif %}
-{% endfor %}
-""")
+# Value of the filter selects that matches all messages
+_ALL = ""
+
+_TABLE_COLUMNS = (
+    ("validator", "Validator", 250),
+    ("level", "Level", 70),
+    ("column", "Column", 150),
+    ("msg", "Message", 530),
+)
 
 
 class ValidationLogView(BaseView):
@@ -55,13 +40,111 @@ class ValidationLogView(BaseView):
 
         self._validation_log_model = validation_log_model
 
-        self._layout = Div(
+        self._validator_select = Select(
+            title="Validator", options=[(_ALL, "All")], width=300
+        )
+        self._level_select = Select(title="Level", options=[(_ALL, "All")], width=120)
+        self._column_select = Select(title="Column", options=[(_ALL, "All")], width=200)
+        for select in (self._validator_select, self._level_select, self._column_select):
+            select.on_change("value", self._on_filter_changed)
+        # The selects are set one at a time when the options are updated
+        self._updating_filter_options = False
+
+        self._description = Div(width=1000)
+
+        # Only the messages of the current page are in the source
+        self._source = ColumnDataSource(data={name: [] for name, *_ in _TABLE_COLUMNS})
+        self._table = DataTable(
+            source=self._source,
+            columns=[
+                TableColumn(field=name, title=title, width=width)
+                for name, title, width in _TABLE_COLUMNS
+            ],
             width=1000,
-            stylesheets=[ImportedStyleSheet(url="qc_tool/static/css/style.css")],
+            height=400,
+            index_position=None,
+        )
+
+        self._previous_button = Button(
+            label="", icon=TablerIcon(icon_name="arrow-left", size="1.2em"), width=60
+        )
+        self._previous_button.on_event("button_click", self._on_previous_page)
+        self._next_button = Button(
+            label="", icon=TablerIcon(icon_name="arrow-right", size="1.2em"), width=60
         )
+        self._next_button.on_event("button_click", self._on_next_page)
+        self._page_info = Div(text="")
+
+        self._layout = Column(
+            children=[
+                Row(self._validator_select, self._level_select, self._column_select),
+                self._description,
+                self._table,
+                Row(self._previous_button, self._page_info, self._next_button),
+            ]
+        )
+
+    def _on_filter_changed(self, attr, old, new):
+        if self._updating_filter_options:
+            return
+        self._controller.set_log_filter(
+            validator=self._validator_select.value or None,
+            level=self._level_select.value or None,
+            column=self._column_select.value or None,
+        )
+
+    def _on_previous_page(self):
+        self._controller.set_page(self._validation_log_model.page - 1)
+
+    def _on_next_page(self):
+        self._controller.set_page(self._validation_log_model.page + 1)
+
+    def update_filter_options(self):
+        log_frame = self._validation_log_model.log_frame
+        validators = log_frame["validator"].value_counts(sort=True)
+        self._updating_filter_options = True
+        with self.hold_document():
+            self._validator_select.options = [
+                (_ALL, "All"),
+                *(
+                    (validator, f"{validator} ({count} messages)")
+                    for validator, count in validators.iter_rows()
+                ),
+            ]
+            self._level_select.options = [
+                (_ALL, "All"),
+                *((level, level) for level in sorted(log_frame["level"].unique())),
+            ]
+            self._column_select.options = [
+                (_ALL, "All"),
+                *((column, column) for column in sorted(log_frame["column"].unique())),
+            ]
+            for select, name in (
+                (self._validator_select, "validator"),
+                (self._level_select, "level"),
+                (self._column_select, "column"),
+            ):
+                select.value = self._validation_log_model.log_filter[name] or _ALL
+        self._updating_filter_options = False
 
-    def update(self, validation_remarks):
-        self._layout.text = _validation_log_template.render(validation=validation_remarks)
+    def update_page(self):
+        model = self._validation_log_model
+        validator = model.log_filter["validator"]
+        with self.hold_document():
+            self._description.text = (
+                model.validation_remarks[validator]["description"]
+                if validator in model.validation_remarks
+                else ""
+            )
+            self._source.data = model.page_rows.select(
+                [name for name, *_ in _TABLE_COLUMNS]
+            ).to_dict(as_series=False)
+            self._page_info.text = (
+                f"Page {model.page + 1} of {model.page_count} "
+                f"({model.filtered_log.height} messages)"
+            )
+            self._previous_button.disabled = model.page == 0
+            self._next_button.disabled = model.page >= model.page_count - 1
 
     @property
     def layout(self):
@@ -5,10 +5,12 @@ if typing.TYPE_CHECKING:
 
 from pathlib import Path
 
-import jinja2
 from bokeh.models.layouts import Column, Row, TabPanel, Tabs
 
 from qc_tool.app_state import AppState
+from qc_tool.models.tabs_model import TabsModel
+from qc_tool.selection_link import SelectionLink
+from qc_tool.slot_source import LabelCodes
 from qc_tool.views.base_view import BaseView
 from qc_tool.views.comment_dialog_view import CommentDialogView
 from qc_tool.views.filtered_profiles_view import FilteredProfilesView
@@ -16,66 +18,11 @@ from qc_tool.views.manual_qc_view import ManualQcView
 from qc_tool.views.map_view import MapView
 from qc_tool.views.parameter_selector_view import ParameterSelectorView
 from qc_tool.views.profile_grid_view import ProfileGridView
+from qc_tool.views.scatter_matrix_view import ScatterMatrixView
 from qc_tool.views.scatter_view import ScatterView
 from qc_tool.views.visit_info_view import VisitInfoView
 from qc_tool.views.visit_selector_view import VisitSelectorView
 
-_validation_log_template = jinja2.Template("""
-{% for key, value in validation.items() %}
-  <div class="collapsible-container">
-    <input id="collapsible-{{ key }}" class="toggle" type="checkbox">
-    <label for="collapsible-{{ key }}" class="toggle-label{% if value.fail_count %} errors{% endif %}">{{ key }} ({{ value.success_count }} successes, {{ value.fail_count }} errors)</label>
-    <div class="collapsible-content">
-      <div class="content-inner">
-      {% if value.fail %}
-        <p>{{ value.description }}</p>
-        <ul>
-        {% for category, fail_rows in value.fail.items() %}
-          {% if category != "General" %}
-          <li>{{ category }}</li>
-            <ul>
-          {% endif %}
-          {% for fail_row in fail_rows %}
-              <li>{{ fail_row }}</li>
-          {% endfor %}
-          {% if category != "General" %}
-            </ul>
-          {% endif %}
-        {% endfor %}
-        </ul>
-      {% else %}
-        <p>No validation errors.</p>
-      {% endif %}
-      </div>
-    </div>
-  </div>
-{% endfor %}
-""")  # noqa: E501
-
-physical_parameters = (
-    "SALT_CTD",
-    "SALT_BTL",
-    "TEMP_CTD",
-    "TEMP_BTL",
-    "DOXY_CTD",
-    "DOXY_BTL",
-    "H2S",
-    "CHLFL",
-)
-
-chemical_parameters = (
-    "SIO3-SI",
-    "PHOS",
-    "PTOT",
-    "NTOT",
-    "AMON",
-    "NTRI",
-    "NTRA",
-    "NTRZ",
-)
-
-biological_parameters = ("CPHL", "CHLFL", "PH_LAB", "PH_TOT", "ALKY", "HUMUS")
-
 
 class VisitsBrowserView(BaseView):
     def __init__(
@@ -87,6 +34,7 @@ class VisitsBrowserView(BaseView):
         profile_grid_controller,
         filtered_profiles_controller,
         scatter_controller,
+        scatter_matrix_controller,
         manual_qc_controller,
         comment_dialog_controller,
     ):
@@ -104,6 +52,12 @@ class VisitsBrowserView(BaseView):
             controller.visit_info_controller, state.visits, width=600
         )
 
+        # Selection shared by the profile slots of all tabs
+        self._selection_link = SelectionLink(state.manual_qc)
+        # Units, parameter names and automatic QC descriptions shown in the tooltips of
+        # the slots of this session
+        self._text_labels = LabelCodes()
+
         self._manual_qc_view = ManualQcView(manual_qc_controller, self._state.manual_qc)
         self._comment_dialog_view = CommentDialogView(comment_dialog_controller)
         self._manual_qc_view.comment_dialog_view = self._comment_dialog_view
@@ -162,7 +116,8 @@ class VisitsBrowserView(BaseView):
             state.profile_grid,
             state.parameters,
             state.visits,
-            state.manual_qc,
+            self._selection_link,
+            self._text_labels,
         )
 
         profile_layout = Column(
@@ -183,7 +138,9 @@ class VisitsBrowserView(BaseView):
             state.filtered_profiles,
             state.filter,
             state.visits,
-            state.manual_qc,
+            self._selection_link,
+            self._text_labels,
+            state.memory,
         )
 
         filtered_profiles_layout = Column(
@@ -204,6 +161,8 @@ class VisitsBrowserView(BaseView):
             state.filter,
             state.visits,
             state.manual_qc,
+            state.wide_table,
+            self._text_labels,
         )
 
         scatter_layout = Column(
@@ -217,6 +176,25 @@ class VisitsBrowserView(BaseView):
             child=scatter_layout,
             title="Parameter-parameter",
         )
+
+        self._scatter_matrix_tab_handler = ScatterMatrixView(
+            scatter_matrix_controller,
+            state.scatter_matrix,
+            state.filter,
+            state.wide_table,
+        )
+
+        scatter_matrix_layout = Column(
+            self._scatter_matrix_tab_handler.layout,
+            height=800,
+            sizing_mode="stretch_width",
+            styles={"overflow-y": "auto"},
+        )
+
+        self._scatter_matrix_tab = TabPanel(
+            child=scatter_matrix_layout,
+            title="Scatter matrix",
+        )
         # # Tab for scatter plots
         # scatter_tab = TabPanel(
         #     child=Row(
@@ -226,13 +204,28 @@ class VisitsBrowserView(BaseView):
         # )
 
         bottom_row = Tabs(
-            tabs=[self._profile_tab, self._filtered_profiles_tab, self._scatter_tab],
+            tabs=[
+                self._profile_tab,
+                self._filtered_profiles_tab,
+                self._scatter_tab,
+                self._scatter_matrix_tab,
+            ],
             sizing_mode="stretch_both",
         )
+        self._tab_names = [
+            TabsModel.PROFILES,
+            TabsModel.FILTERED_PROFILES,
+            TabsModel.SCATTER,
+            TabsModel.SCATTER_MATRIX,
+        ]
+        bottom_row.on_change("active", self._on_active_tab_changed)
 
         # Full layout
         self._layout = Column(top_row, bottom_row, sizing_mode="stretch_both")
 
+    def _on_active_tab_changed(self, attr, old, new):
+        self._controller.set_active_tab(self._tab_names[new])
+
     def save_file_callback(self, filename: Path):
         self._data.write_csv(filename, separator="\t")
 
@@ -243,10 +236,6 @@ class VisitsBrowserView(BaseView):
     def _set_extra_info_tab(self, index: int):
         self._extra_info_tabs.active = index
 
-    def _set_validation(self, validation: dict):
-        self._validation = validation
-        self._log_div.text = _validation_log_template.render(validation=validation)
-
     @property
     def layout(self):
         return self._layout
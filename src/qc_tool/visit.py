@@ -1,5 +1,7 @@
 import polars as pl
 
+from qc_tool.projection import X_COLUMN, Y_COLUMN
+
 
 class Visit:
     COMMON_COLUMNS = frozenset(
@@ -20,6 +22,8 @@ class Visit:
             "WADEP",
             "WINDIR",
             "WINSP",
+            X_COLUMN,
+            Y_COLUMN,
         }
     )
 
@@ -130,3 +134,11 @@ class Visit:
     @property
     def latitude(self) -> float:
         return self._common.get("sample_latitude_dd")
+
+    @property
+    def web_mercator_x(self) -> float:
+        return self._common.get(X_COLUMN)
+
+    @property
+    def web_mercator_y(self) -> float:
+        return self._common.get(Y_COLUMN)
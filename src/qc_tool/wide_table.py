@@ -0,0 +1,125 @@
+"""Values of all parameters with one row per sample.
+
+The data is pivoted once when it is loaded, to columns named `{field}_{parameter}`
+for the fields in `FIELDS`. Plotting one parameter against another is then a
+projection of two parameters, without pivoting the data again."""
+
+import polars as pl
+
+# Identifies a sample, that is a row of the wide table
+INDEX = ("visit_key", "row_number", "DEPH")
+
+FIELDS = ("value", "unit", "quality_flag_long")
+
+
+def column_name(field: str, parameter: str) -> str:
+    return f"{field}_{parameter}"
+
+
+class WideTable:
+    def __init__(self, data: pl.DataFrame):
+        """Pivot data with one row per value. The data must have the `INDEX` columns,
+        a `parameter` column and the `FIELDS` columns."""
+        data = data.filter(pl.col("value").is_not_null())
+        self._parameters = set(data["parameter"].unique())
+        if data.is_empty():
+            self._data = data.select(INDEX)
+        else:
+            self._data = data.pivot(
+                on="parameter",
+                index=list(INDEX),
+                values=list(FIELDS),
+                aggregate_function="first",
+            ).sort(INDEX)
+
+        # Rows of each visit are stored together, so a visit is a slice of the table
+        self._visit_slices = {}
+        offset = 0
+        for visit_key, length in (
+            self._data.group_by("visit_key", maintain_order=True).len().iter_rows()
+        ):
+            self._visit_slices[visit_key] = (offset, length)
+            offset += length
+
+    @property
+    def data(self) -> pl.DataFrame:
+        return self._data
+
+    @property
+    def parameters(self) -> set[str]:
+        return self._parameters
+
+    def visit(self, visit_key: str) -> pl.DataFrame:
+        offset, length = self._visit_slices.get(visit_key, (0, 0))
+        return self._data.slice(offset, length)
+
+    def visit_rows(self, visit_keys) -> pl.Series:
+        """Mask of the rows of the visits."""
+        return self._data["visit_key"].is_in(list(visit_keys))
+
+    def update_flags(self, updates: pl.DataFrame):
+        """Set the flags of the values in the updates, which have a row per value with
+        `visit_key`, `parameter`, `DEPH` and `quality_flag_long` columns."""
+        for (parameter,), parameter_updates in updates.group_by("parameter"):
+            flag_column = column_name("quality_flag_long", parameter)
+            if flag_column not in self._data.columns:
+                continue
+            parameter_updates = parameter_updates.select(
+                "visit_key", "DEPH", pl.col("quality_flag_long").alias("_updated_flag")
+            ).unique(subset=["visit_key", "DEPH"], keep="last")
+            self._data = (
+                self._data.join(
+                    parameter_updates,
+                    on=["visit_key", "DEPH"],
+                    how="left",
+                    maintain_order="left",
+                )
+                .with_columns(
+                    pl.coalesce("_updated_flag", flag_column).alias(flag_column)
+                )
+                .drop("_updated_flag")
+            )
+
+
+def parameter_pair(
+    data: pl.DataFrame,
+    x_parameter: str,
+    y_parameter: str,
+    fields=FIELDS,
+    rows: pl.Series | None = None,
+) -> pl.DataFrame | None:
+    """Rows of wide data where both parameters have values, with the index columns and
+    the fields of both parameters. Returns None when there are no such rows."""
+    columns = [
+        column_name(field, parameter)
+        for parameter in dict.fromkeys((x_parameter, y_parameter))
+        for field in fields
+    ]
+    if not set(columns) <= set(data.columns):
+        return None
+
+    pair = data.select(*INDEX, *columns)
+    if rows is not None:
+        pair = pair.filter(rows)
+    pair = pair.drop_nulls(
+        [column_name("value", x_parameter), column_name("value", y_parameter)]
+    )
+    return None if pair.is_empty() else pair
+
+
+def parameter_values(
+    data: pl.DataFrame, parameters, fields=FIELDS
+) -> pl.DataFrame | None:
+    """Rows of wide data back as one row per value, with the index columns, a
+    `parameter` column and the fields. Returns None when there are no values."""
+    frames = [
+        data.select(
+            *INDEX,
+            pl.lit(parameter, dtype=pl.String).alias("parameter"),
+            *(pl.col(column_name(field, parameter)).alias(field) for field in fields),
+        ).filter(pl.col("value").is_not_null())
+        for parameter in dict.fromkeys(parameters)
+        if {column_name(field, parameter) for field in fields} <= set(data.columns)
+    ]
+    values = pl.concat(frames, how="diagonal_relaxed") if frames else None
+    return None if values is None or values.is_empty() else values
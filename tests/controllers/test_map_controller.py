@@ -0,0 +1,26 @@
+from unittest.mock import MagicMock
+
+import polars as pl
+
+from qc_tool.callback_queue import CallbackQueue
+from qc_tool.controllers.map_controller import MapController
+from qc_tool.models.map_model import MapModel
+from qc_tool.models.visits_model import VisitsModel
+
+
+def test_points_of_visits_with_issues_get_the_issue_status():
+    # Given a map with the points of three visits
+    queue = CallbackQueue()
+    visits_model = VisitsModel(queue)
+    map_model = MapModel(queue)
+    controller = MapController(visits_model, map_model)
+    controller.map_view = MagicMock()
+    map_model.set_points(
+        pl.DataFrame({"visit_key": ["a", "b", "c"], "x": [0.0, 1.0, 2.0], "y": 0.0})
+    )
+
+    # When the feedback has issues for two of the visits
+    visits_model.set_feedback(pl.Series("visit_key", ["c", "a"]))
+
+    # Then the points of those visits have issues
+    assert map_model.status_codes.tolist() == [1, 0, 1]
@@ -0,0 +1,38 @@
+from unittest.mock import MagicMock
+
+from qc_tool.callback_queue import CallbackQueue
+from qc_tool.controllers.pending_tab_update import PendingTabUpdate
+from qc_tool.models.tabs_model import TabsModel
+
+
+def make_tab_update():
+    tabs_model = TabsModel(CallbackQueue())
+    update = MagicMock()
+    return PendingTabUpdate(tabs_model, TabsModel.SCATTER, update), tabs_model, update
+
+
+def test_update_of_active_tab_is_made_at_once():
+    # Given an active tab
+    tab_update, tabs_model, update = make_tab_update()
+    tabs_model.active_tab = TabsModel.SCATTER
+
+    # When the tab is updated
+    tab_update.update("visit")
+
+    # Then the update is made
+    update.assert_called_once_with("visit")
+
+
+def test_most_extensive_update_is_made_when_tab_becomes_active():
+    # Given a tab that is updated while it is not active
+    tab_update, tabs_model, update = make_tab_update()
+    tab_update.update("parameter")
+    tab_update.update("filter")
+    tab_update.update("visit")
+    update.assert_not_called()
+
+    # When the tab becomes active
+    tabs_model.active_tab = TabsModel.SCATTER
+
+    # Then only the most extensive update is made
+    update.assert_called_once_with("filter")
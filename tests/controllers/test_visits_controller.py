@@ -0,0 +1,58 @@
+import polars as pl
+
+from qc_tool.callback_queue import CallbackQueue
+from qc_tool.controllers.visits_controller import VisitsController
+from qc_tool.models.file_model import FileModel
+from qc_tool.models.filter_model import FilterModel
+from qc_tool.models.validation_log_model import ValidationLogModel
+from qc_tool.models.visits_model import VisitsModel
+
+
+def make_data(visit_key: str, row_numbers: list[int]) -> pl.DataFrame:
+    return pl.DataFrame(
+        {
+            "visit_key": [visit_key] * len(row_numbers),
+            "row_number": row_numbers,
+            "parameter": ["TEMP_CTD"] * len(row_numbers),
+            "DEPH": [float(n) for n in row_numbers],
+        }
+    )
+
+
+def make_models():
+    queue = CallbackQueue()
+    file_model = FileModel(queue)
+    visits_model = VisitsModel(queue)
+    validation_log_model = ValidationLogModel(queue)
+    VisitsController(
+        file_model, visits_model, FilterModel(file_model, queue), validation_log_model
+    )
+    return file_model, visits_model, validation_log_model
+
+
+def test_logs_of_previous_data_are_not_attached_to_new_visits():
+    # Given loaded data with a log message for its first row
+    file_model, visits_model, validation_log_model = make_models()
+    file_model.add_data(make_data("visit", [0, 1]), "first.txt")
+    validation_log_model.set_validation_log(
+        [{"level": "error", "msg": "first", "row_numbers": [0]}]
+    )
+    assert [log["msg"] for log in visits_model.visits["visit"].validation_logs] == [
+        "first"
+    ]
+
+    # When loading other data for the same visit, before its log is set
+    file_model.add_data(make_data("visit", [0, 1]), "second.txt")
+
+    # Then the log of the previous data is not attached to the new visits
+    assert visits_model.visits["visit"].validation_logs == []
+
+    # When the log of the new data is set
+    validation_log_model.set_validation_log(
+        [{"level": "warning", "msg": "second", "row_numbers": [1]}]
+    )
+
+    # Then the new log is attached to the new visits
+    assert [log["msg"] for log in visits_model.visits["visit"].validation_logs] == [
+        "second"
+    ]
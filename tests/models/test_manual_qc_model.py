@@ -1,11 +1,13 @@
 from unittest.mock import MagicMock
 
+import polars as pl
 import pytest
-from ocean_data_qc.fyskem.parameter import Parameter
 from ocean_data_qc.fyskem.qc_flag import QcFlag
+from ocean_data_qc.fyskem.qc_flags import QcFlags
 
 from qc_tool.callback_queue import CallbackQueue
 from qc_tool.models.manual_qc_model import ManualQcModel
+from qc_tool.value_selection import ValueSelection
 
 
 @pytest.fixture
@@ -17,12 +19,22 @@ def given_manual_qc_model():
 def make_manual_qc_model_with_a_selected_value():
     queue = CallbackQueue()
     model = ManualQcModel(queue)
-    value = Parameter({"parameter": "TEMP_BTL", "value": 5.0, "DEPH": 10.0})
-    model._selected_values = [value]
+    selection = ValueSelection(
+        pl.DataFrame(
+            {
+                "visit_key": ["a_visit"],
+                "parameter": ["TEMP_BTL"],
+                "value": [5.0],
+                "DEPH": [10.0],
+                "quality_flag_long": [str(QcFlags(QcFlag.GOOD_VALUE, None, None, None))],
+            }
+        )
+    )
+    model._selected_values = selection
     model._parameter_index = 0
     model._value_index = (0,)
     model._last_sender = MagicMock()
-    return model, value
+    return model, selection
 
 
 def test_cancel_flag_aborts_manual_qc():
@@ -52,7 +64,7 @@ def test_confirm_flag_stores_flag_category_and_comment(
     given_flag, given_category, given_comment
 ):
     # Given a ManualQcModel and a selected value
-    given_manual_qc_model, given_value = make_manual_qc_model_with_a_selected_value()
+    given_manual_qc_model, given_selection = make_manual_qc_model_with_a_selected_value()
 
     # Given a listener on QC_PERFORMED
     given_listener = MagicMock()
@@ -62,7 +74,10 @@ def test_confirm_flag_stores_flag_category_and_comment(
     given_manual_qc_model.confirm_flag(given_flag, given_category, given_comment)
 
     # Then the flag is assigned to the value
-    assert given_value.qc.manual == given_flag
+    assert given_selection[0].qc.manual == given_flag
+
+    # And the category is assigned to the value
+    assert given_selection[0]._data["MANUAL_QC_CATEGORY"] == given_category
 
     # And the category and comment are stored as-is
     assert given_manual_qc_model.comment_category == given_category
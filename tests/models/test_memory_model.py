@@ -0,0 +1,47 @@
+import numpy as np
+
+from qc_tool.callback_queue import CallbackQueue
+from qc_tool.frame_cache import FrameCache
+from qc_tool.models.memory_model import MemoryModel
+
+MB = 1024 * 1024
+
+
+def make_array(megabytes: int) -> np.ndarray:
+    return np.zeros(megabytes * MB, dtype=np.uint8)
+
+
+def test_least_recently_used_entries_are_evicted_above_the_budget():
+    # Given a memory budget of 3 MB shared by two caches
+    memory_model = MemoryModel(3, CallbackQueue())
+    first_cache = FrameCache(memory_model)
+    second_cache = FrameCache(memory_model)
+
+    # Given two cached entries where the first one was used most recently
+    first_cache["a"] = make_array(1)
+    second_cache["b"] = make_array(1)
+    first_cache["a"]
+
+    # When adding an entry that does not fit in the budget
+    second_cache["c"] = make_array(2)
+
+    # Then the least recently used entry is evicted
+    assert "a" in first_cache
+    assert "b" not in second_cache
+    assert "c" in second_cache
+
+    # And the usage is the size of the remaining entries
+    assert memory_model.used == 3 * MB
+
+
+def test_clearing_a_cache_releases_its_memory():
+    # Given a cache with an entry
+    memory_model = MemoryModel(3, CallbackQueue())
+    cache = FrameCache(memory_model)
+    cache["a"] = make_array(1)
+
+    # When clearing the cache
+    cache.clear()
+
+    # Then no memory is used
+    assert memory_model.used == 0
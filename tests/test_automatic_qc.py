@@ -0,0 +1,179 @@
+import multiprocessing
+
+import polars as pl
+
+from qc_tool import automatic_qc
+from qc_tool.automatic_qc import (
+    _SHARD,
+    SHARDING_MIN_ROWS,
+    IncrementalAutomaticQc,
+    _assign_shards,
+    _from_ipc,
+    _to_ipc,
+    run_automatic_qc,
+)
+from qc_tool.scripts.start_server import start_worker
+
+
+class InProcessExecutor:
+    """Runs the shards in the test process instead of spawned worker processes."""
+
+    def __init__(self, max_workers=None, mp_context=None):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def map(self, function, *iterables):
+        return map(function, *iterables)
+
+
+def make_data(visit_sizes: dict[str, int]) -> pl.DataFrame:
+    # Rows of the visits are interleaved
+    visit_keys = [
+        visit_key
+        for n in range(max(visit_sizes.values()))
+        for visit_key, size in visit_sizes.items()
+        if n < size
+    ]
+    return pl.DataFrame(
+        {"visit_key": visit_keys, "value": [float(n) for n in range(len(visit_keys))]}
+    )
+
+
+def test_assign_shards_keeps_visits_together_and_balances_rows():
+    # Given visits of different sizes
+    data = make_data({"a": 5, "b": 4, "c": 3, "d": 2})
+
+    # When the visits are assigned to two shards
+    shards = _assign_shards(data, 2)
+
+    # Then all rows of a visit are in the same shard
+    assert (
+        shards.group_by("visit_key").agg(pl.col(_SHARD).n_unique())[_SHARD] == 1
+    ).all()
+
+    # And the shards have the same number of rows
+    assert sorted(shards[_SHARD].value_counts()["count"].to_list()) == [7, 7]
+
+
+def test_sharded_qc_returns_rows_in_input_order(monkeypatch):
+    # Given a QC that returns the rows of each shard in reverse order
+    shards = []
+
+    def reversing_qc(data):
+        shards.append(set(data["visit_key"]))
+        return data.reverse().with_columns((pl.col("value") * 10).alias("qc"))
+
+    monkeypatch.setattr(automatic_qc, "_run_fys_kem_qc", reversing_qc)
+    monkeypatch.setattr(automatic_qc, "ProcessPoolExecutor", InProcessExecutor)
+    monkeypatch.setattr(automatic_qc, "SHARDING_MIN_ROWS", 0)
+    data = make_data({"a": 5, "b": 4, "c": 3, "d": 2})
+
+    # When running the QC in two shards
+    result = run_automatic_qc(data, max_workers=2)
+
+    # Then the QC is run on two shards with different visits
+    assert len(shards) == 2
+    assert not shards[0] & shards[1]
+
+    # And the result has the rows in the input order
+    assert result.columns == ["visit_key", "value", "qc"]
+    assert result["value"].to_list() == data["value"].to_list()
+    assert result["qc"].to_list() == (data["value"] * 10).to_list()
+
+
+def reverse_shard(ipc_buffer: bytes) -> bytes:
+    # Runs in the QC processes started by the server worker
+    return _to_ipc(_from_ipc(ipc_buffer).reverse())
+
+
+def sharded_load(results):
+    # Runs in a server worker, the QC processes import the shard function from this
+    # module
+    automatic_qc._run_automatic_qc_on_shard = reverse_shard
+    data = make_data({str(n): SHARDING_MIN_ROWS // 4 for n in range(4)})
+    result = run_automatic_qc(data, max_workers=2)
+    results.put(result["value"].to_list() == data["value"].to_list())
+
+
+def test_server_worker_can_run_sharded_qc():
+    # Given a server worker loading data large enough to be sharded
+    results = multiprocessing.get_context("spawn").Queue()
+    worker = start_worker(sharded_load, results)
+
+    # When the worker has run the QC
+    worker.join(timeout=120)
+
+    # Then the QC processes have been started and the rows are in the input order
+    assert worker.exitcode == 0
+    assert results.get(timeout=10)
+
+
+# Visits of each FysKemQc run
+processed_visits: list[set[str]] = []
+
+
+class ReversingFysKemQc:
+    """Adds a QC column and returns the rows in reverse order."""
+
+    def __init__(self, data):
+        self._data = data
+        processed_visits.append(set(data["visit_key"]))
+
+    def run_automatic_qc(self):
+        self._data = self._data.reverse().with_columns((pl.col("value") * 10).alias("qc"))
+
+    def total_flag_info(self):
+        pass
+
+
+def run_incremental_qc(data, cache_directory) -> tuple[pl.DataFrame, set[str]]:
+    processed_visits.clear()
+    result = IncrementalAutomaticQc(cache_directory).run(data, cache_key="a_key")
+    return result, set().union(*processed_visits)
+
+
+def test_incremental_qc_reuses_unchanged_visits(tmp_path, monkeypatch):
+    # Given data that has been processed
+    monkeypatch.setattr(automatic_qc, "FysKemQc", ReversingFysKemQc)
+    data = make_data({"a": 3, "b": 2})
+    first_result, _ = run_incremental_qc(data, tmp_path)
+
+    # When the same data is processed again
+    result, run_visits = run_incremental_qc(data, tmp_path)
+
+    # Then no visit is processed and the result is the same
+    assert run_visits == set()
+    assert result.equals(first_result)
+
+
+def test_incremental_qc_processes_changed_and_new_visits(tmp_path, monkeypatch):
+    # Given data that has been processed
+    monkeypatch.setattr(automatic_qc, "FysKemQc", ReversingFysKemQc)
+    run_incremental_qc(make_data({"a": 3, "b": 2}), tmp_path)
+
+    # When a value of one visit is changed and a new visit is added
+    data = pl.concat(
+        [
+            make_data({"a": 3, "b": 2}).with_columns(
+                pl.when(pl.col("visit_key") == "b")
+                .then(pl.col("value") + 100)
+                .otherwise(pl.col("value"))
+                .alias("value")
+            ),
+            pl.DataFrame({"visit_key": ["c"], "value": [7.0]}),
+        ]
+    )
+    result, run_visits = run_incremental_qc(data, tmp_path)
+
+    # Then only the changed and the new visit are processed
+    assert run_visits == {"b", "c"}
+
+    # And the result has the rows in the input order with the QC of the new values
+    assert result["visit_key"].to_list() == data["visit_key"].to_list()
+    assert result["value"].to_list() == data["value"].to_list()
+    assert result["qc"].to_list() == (data["value"] * 10).to_list()
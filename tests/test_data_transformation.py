@@ -5,6 +5,7 @@ import pytest
 
 from qc_tool import data_transformation
 from qc_tool.controllers.file_controller import FileController
+from qc_tool.log_frame import log_frame
 
 
 @pytest.mark.parametrize(
@@ -213,3 +214,32 @@ def test_shortest_unique_paths_removes_lims_export_structure(
 
     # Then the returned mapping is as expected
     assert path_mapping == expected_path_mapping
+
+
+def test_log_message_aggregator_folds_added_messages_into_existing_groups():
+    # Given an aggregator with messages from one log
+    aggregator = data_transformation.LogMessageAggregator()
+    aggregator.add(
+        log_frame(
+            [
+                {"validator": "A", "level": "error", "column": "TEMP", "msg": "1"},
+                {"validator": "A", "level": "info", "column": "TEMP", "msg": "ok"},
+            ]
+        )
+    )
+
+    # When messages from another log are added
+    aggregator.add(
+        log_frame(
+            [
+                {"validator": "A", "level": "warning", "column": "TEMP", "msg": "2"},
+                {"validator": "A", "level": "error", "column": None, "msg": "3"},
+            ],
+            offset=2,
+        )
+    )
+
+    # Then the messages are grouped by validator and column over both logs
+    log_messages = aggregator.log_messages
+    assert log_messages["A"]["count"] == 3
+    assert log_messages["A"]["messages"] == {"TEMP": ["1", "2"], "General": ["3"]}
@@ -0,0 +1,47 @@
+from types import SimpleNamespace
+
+import polars as pl
+
+from qc_tool.feedback_service import FeedbackService
+
+
+def test_logs_for_visit_are_entries_that_refer_to_rows_of_visit():
+    # Given data with two visits and a log with entries for rows of one or both visits
+    data = pl.DataFrame(
+        {
+            "row_number": ["1", "2", "3", "3"],
+            "visit_key": ["a", "a", "b", "b"],
+        }
+    )
+    log = [
+        {"row_numbers": ["1", "3"], "level": "error"},
+        {"row_numbers": None, "level": "warning"},
+        {"row_numbers": ["2", "1"], "level": "error"},
+    ]
+
+    # When the feedback service is created
+    feedback_service = FeedbackService(validation_log=log, data=data)
+
+    # Then each visit gets each entry that refers to its rows once
+    assert feedback_service.get_logs_for_visit(SimpleNamespace(visit_key="a")) == [
+        log[0],
+        log[2],
+    ]
+    assert feedback_service.get_logs_for_visit(SimpleNamespace(visit_key="b")) == [log[0]]
+    assert feedback_service.get_logs_for_visit(SimpleNamespace(visit_key="c")) == []
+
+
+def test_visits_with_issues_have_warnings_or_errors():
+    # Given data with three visits and a log with an error, a warning and an info entry
+    data = pl.DataFrame({"row_number": ["1", "2", "3"], "visit_key": ["a", "b", "c"]})
+    log = [
+        {"row_numbers": ["2"], "level": "error"},
+        {"row_numbers": ["1"], "level": "warning"},
+        {"row_numbers": ["3"], "level": "info"},
+    ]
+
+    # When the feedback service is created
+    feedback_service = FeedbackService(validation_log=log, data=data)
+
+    # Then the visits with the error and the warning have issues
+    assert feedback_service.visits_with_issues.to_list() == ["a", "b"]
@@ -0,0 +1,34 @@
+from qc_tool.log_frame import filter_log, log_frame
+
+
+def test_log_frame_has_messages_of_relevant_levels_with_log_ids():
+    # Given a log with messages of different levels
+    log = [
+        {"validator": "A", "level": "error", "column": "TEMP", "msg": "too warm"},
+        {"validator": "A", "level": "info", "msg": "validated"},
+        {"validator": "B", "level": "warning", "column": None, "msg": "check"},
+    ]
+
+    # When the log is converted to a frame
+    frame = log_frame(log, offset=10)
+
+    # Then only errors and warnings are included, with their positions in the log
+    assert frame["log_id"].to_list() == [10, 12]
+    assert frame["column"].to_list() == ["TEMP", "General"]
+
+
+def test_filter_log_matches_all_given_values():
+    # Given a log frame
+    frame = log_frame(
+        [
+            {"validator": "A", "level": "error", "column": "TEMP", "msg": "1"},
+            {"validator": "A", "level": "warning", "column": "TEMP", "msg": "2"},
+            {"validator": "B", "level": "error", "column": "TEMP", "msg": "3"},
+        ]
+    )
+
+    # When the log is filtered on validator and level
+    filtered = filter_log(frame, validator="A", level="error")
+
+    # Then only the messages with both values are included
+    assert filtered["msg"].to_list() == ["1"]
@@ -0,0 +1,33 @@
+import numpy as np
+
+from qc_tool.map_clusters import grid_clusters
+
+
+def test_points_in_same_cell_are_one_cluster_with_worst_status():
+    # Given two points in one cell and one point in another cell
+    x = np.array([1.0, 3.0, 15.0])
+    y = np.array([1.0, 3.0, 1.0])
+    status = np.array([0, 1, 0], dtype=np.uint8)
+
+    # When the points are clustered with a cell size of 10
+    clusters = grid_clusters(x, y, status, 10.0)
+
+    # Then the points in the same cell are one cluster at their mean position
+    assert clusters["count"].tolist() == [2, 1]
+    assert clusters["x"].tolist() == [2.0, 15.0]
+    assert clusters["y"].tolist() == [2.0, 1.0]
+    assert clusters["status"].tolist() == [1, 0]
+
+
+def test_points_without_position_are_not_clustered():
+    # Given a point without a position
+    x = np.array([1.0, np.nan])
+    y = np.array([1.0, np.nan])
+    status = np.array([0, 1], dtype=np.uint8)
+
+    # When the points are clustered
+    clusters = grid_clusters(x, y, status, 10.0)
+
+    # Then only the point with a position is included
+    assert clusters["count"].tolist() == [1]
+    assert clusters["status"].tolist() == [0]
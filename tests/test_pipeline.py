@@ -0,0 +1,275 @@
+import os
+import time
+from unittest.mock import MagicMock
+
+import polars as pl
+import pytest
+
+from qc_tool.pipeline import Pipeline, PipelineStage, replaced_atomically
+
+
+def make_pipeline(checkpoint_directory=None, fail_at: str | None = None):
+    calls = []
+
+    def stage_function(name):
+        def _function(data):
+            calls.append(name)
+            if name == fail_at:
+                raise RuntimeError(f"{name} failed")
+            return data.with_columns(pl.lit(name).alias(name))
+
+        return _function
+
+    pipeline = Pipeline(
+        (
+            PipelineStage("first", stage_function("first")),
+            PipelineStage("second", stage_function("second"), checkpoint=True),
+            PipelineStage("third", stage_function("third")),
+        ),
+        checkpoint_directory,
+    )
+    return pipeline, calls
+
+
+def test_run_passes_result_of_each_stage_to_the_next():
+    # Given a pipeline with three stages
+    pipeline, calls = make_pipeline()
+
+    # When running the pipeline
+    result = pipeline.run(pl.DataFrame({"value": [1, 2]}))
+
+    # Then all stages are run in order
+    assert calls == ["first", "second", "third"]
+
+    # And the result contains the output of all stages
+    assert result.columns == ["value", "first", "second", "third"]
+
+    # And there are metrics for all stages
+    assert [metrics.name for metrics in pipeline.metrics] == calls
+    assert all(metrics.status == Pipeline.RUN for metrics in pipeline.metrics)
+    assert all(metrics.size_bytes > 0 for metrics in pipeline.metrics)
+
+
+def test_run_does_not_run_skipped_stages():
+    # Given a pipeline with three stages
+    pipeline, calls = make_pipeline()
+
+    # When running the pipeline skipping the second stage
+    result = pipeline.run(pl.DataFrame({"value": [1, 2]}), skip=("second",))
+
+    # Then the skipped stage is not run
+    assert calls == ["first", "third"]
+    assert "second" not in result.columns
+
+    # And the stage is reported as skipped
+    assert pipeline.metrics[1].status == Pipeline.SKIPPED
+
+
+def test_run_raises_for_unknown_skipped_stage():
+    # Given a pipeline
+    pipeline, _ = make_pipeline()
+
+    # When skipping a stage that does not exist
+    # Then an error is raised
+    with pytest.raises(ValueError):
+        pipeline.run(pl.DataFrame(), skip=("unknown",))
+
+
+def test_run_stops_when_stage_returns_none():
+    # Given a pipeline where the second stage returns None
+    last_stage = MagicMock()
+    pipeline = Pipeline(
+        (
+            PipelineStage("first", lambda data: data),
+            PipelineStage("second", lambda data: None),
+            PipelineStage("third", last_stage),
+        )
+    )
+
+    # When running the pipeline
+    result = pipeline.run(pl.DataFrame())
+
+    # Then the result is None
+    assert result is None
+
+    # And the remaining stages are not run
+    last_stage.assert_not_called()
+
+
+def test_run_resumes_after_checkpoint(tmp_path):
+    # Given a pipeline that fails after the checkpointed stage
+    pipeline, calls = make_pipeline(tmp_path, fail_at="third")
+    given_data = pl.DataFrame({"value": [1, 2]})
+    with pytest.raises(RuntimeError):
+        pipeline.run(given_data, checkpoint_key="a_key")
+    assert calls == ["first", "second", "third"]
+
+    # When running a new pipeline with the same checkpoint key
+    new_pipeline, new_calls = make_pipeline(tmp_path)
+    result = new_pipeline.run(given_data, checkpoint_key="a_key")
+
+    # Then only the stages after the checkpoint are run
+    assert new_calls == ["third"]
+
+    # And the result contains the output of all stages
+    assert result.columns == ["value", "first", "second", "third"]
+
+    # And the restored stages are reported as restored
+    assert [metrics.status for metrics in new_pipeline.metrics] == [
+        Pipeline.RESTORED,
+        Pipeline.RESTORED,
+        Pipeline.RUN,
+    ]
+
+
+def test_run_restores_artifacts_from_checkpoint(tmp_path):
+    # Given a pipeline where a stage stores an artifact before a checkpoint
+    def _store_artifact(data):
+        pipeline.artifacts["log"] = ["a message"]
+        return data
+
+    pipeline = Pipeline(
+        (
+            PipelineStage("store", _store_artifact),
+            PipelineStage("checkpoint", lambda data: data, checkpoint=True),
+        ),
+        tmp_path,
+    )
+    pipeline.run(pl.DataFrame({"value": [1]}), checkpoint_key="a_key")
+
+    # When running again with the same checkpoint key
+    pipeline.artifacts = {}
+    pipeline.run(pl.DataFrame({"value": [1]}), checkpoint_key="a_key")
+
+    # Then the artifact is restored
+    assert pipeline.artifacts == {"log": ["a message"]}
+
+
+def test_run_ignores_checkpoints_for_other_keys(tmp_path):
+    # Given a pipeline that has been run with one key
+    pipeline, calls = make_pipeline(tmp_path)
+    pipeline.run(pl.DataFrame({"value": [1]}), checkpoint_key="a_key")
+    calls.clear()
+
+    # When running with another key
+    pipeline.run(pl.DataFrame({"value": [1]}), checkpoint_key="another_key")
+
+    # Then all stages are run
+    assert calls == ["first", "second", "third"]
+
+
+def test_stage_names_must_be_unique():
+    # Given stages with the same name
+    stages = (
+        PipelineStage("stage", lambda data: data),
+        PipelineStage("stage", lambda data: data),
+    )
+
+    # When creating a pipeline
+    # Then an error is raised
+    with pytest.raises(ValueError):
+        Pipeline(stages)
+
+
+def test_least_recently_used_checkpoints_are_removed_when_too_large(tmp_path):
+    # Given checkpoints of two files where the first was used long ago
+    pipeline, _ = make_pipeline(tmp_path)
+    pipeline.run(pl.DataFrame({"value": [1, 2]}), checkpoint_key="old_key")
+    for path in tmp_path.glob("old_key.*"):
+        os.utime(path, (0, 0))
+    checkpoint_size = sum(path.stat().st_size for path in tmp_path.glob("old_key.*"))
+
+    # When a checkpoint is written by a pipeline with room for only one checkpoint
+    small_pipeline = Pipeline(
+        [PipelineStage("second", lambda data: data, checkpoint=True)],
+        tmp_path,
+        max_checkpoint_bytes=checkpoint_size + 1,
+        max_checkpoint_age=float("inf"),
+    )
+    small_pipeline.run(pl.DataFrame({"value": [1, 2]}), checkpoint_key="new_key")
+
+    # Then only the new checkpoint is kept
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "new_key.second.arrow",
+        "new_key.second.artifacts.pickle",
+    ]
+
+
+def test_checkpoints_older_than_max_age_are_removed(tmp_path):
+    # Given a checkpoint that has not been used for two days
+    pipeline, _ = make_pipeline(tmp_path)
+    pipeline.run(pl.DataFrame({"value": [1]}), checkpoint_key="old_key")
+    two_days_ago = time.time() - 2 * 24 * 60 * 60
+    for path in tmp_path.glob("old_key.*"):
+        os.utime(path, (two_days_ago, two_days_ago))
+
+    # When a checkpoint is written by a pipeline that keeps checkpoints for a day
+    day_pipeline = Pipeline(
+        [PipelineStage("second", lambda data: data, checkpoint=True)],
+        tmp_path,
+        max_checkpoint_age=24 * 60 * 60,
+    )
+    day_pipeline.run(pl.DataFrame({"value": [1]}), checkpoint_key="new_key")
+
+    # Then the old checkpoint is removed
+    assert not list(tmp_path.glob("old_key.*"))
+    assert len(list(tmp_path.glob("new_key.*"))) == 2
+
+
+def test_old_files_with_cache_suffixes_are_removed_with_the_checkpoints(tmp_path):
+    # Given a cached file and a file of another kind that have not been used for
+    # two days
+    two_days_ago = time.time() - 2 * 24 * 60 * 60
+    for name in ("old_key.cache.parquet", "old_key.other"):
+        path = tmp_path / name
+        path.write_bytes(b"cached")
+        os.utime(path, (two_days_ago, two_days_ago))
+
+    # When a checkpoint is written by a pipeline that keeps cached files for a day
+    pipeline = Pipeline(
+        [PipelineStage("first", lambda data: data, checkpoint=True)],
+        tmp_path,
+        max_checkpoint_age=24 * 60 * 60,
+        cache_suffixes=(".cache.parquet",),
+    )
+    pipeline.run(pl.DataFrame({"value": [1]}), checkpoint_key="new_key")
+
+    # Then the old cached file is removed and the other file is kept
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "new_key.first.arrow",
+        "new_key.first.artifacts.pickle",
+        "old_key.other",
+    ]
+
+
+def test_concurrent_writes_of_a_file_use_their_own_temporary_files(tmp_path):
+    # Given two writers of the same file, the second starting before the first is done
+    path = tmp_path / "key.first.arrow"
+    with replaced_atomically(path) as first_path:
+        first_path.write_bytes(b"first")
+        with replaced_atomically(path) as second_path:
+            second_path.write_bytes(b"second")
+
+            # Then the writers do not share a temporary file
+            assert first_path != second_path
+            assert first_path.read_bytes() == b"first"
+
+    # And the file has the content of the writer that finished last, with no temporary
+    # files left
+    assert path.read_bytes() == b"first"
+    assert [p.name for p in tmp_path.iterdir()] == ["key.first.arrow"]
+
+
+def test_failed_write_leaves_the_file_unchanged(tmp_path):
+    # Given a written file
+    path = tmp_path / "key.first.arrow"
+    path.write_bytes(b"old")
+
+    # When a new write of the file fails
+    with pytest.raises(OSError), replaced_atomically(path) as temporary_path:
+        temporary_path.write_bytes(b"partial")
+        raise OSError("disk full")
+
+    # Then the file is unchanged and the temporary file is removed
+    assert path.read_bytes() == b"old"
+    assert [p.name for p in tmp_path.iterdir()] == ["key.first.arrow"]
@@ -0,0 +1,35 @@
+import numpy as np
+import polars as pl
+from pyproj import Transformer
+
+from qc_tool.projection import X_COLUMN, Y_COLUMN, add_web_mercator_columns, web_mercator
+
+
+def test_web_mercator_matches_pyproj():
+    # Given positions in Swedish waters
+    longitudes = np.array([10.5, 15.0, 20.25, 24.0])
+    latitudes = np.array([55.0, 57.5, 60.0, 65.75])
+
+    # When the positions are projected
+    x, y = web_mercator(longitudes, latitudes)
+
+    # Then they are the same as the ones from pyproj
+    expected_x, expected_y = Transformer.from_crs(
+        "EPSG:4326", "EPSG:3857", always_xy=True
+    ).transform(longitudes, latitudes)
+    np.testing.assert_allclose(x, expected_x, atol=1e-6)
+    np.testing.assert_allclose(y, expected_y, atol=1e-6)
+
+
+def test_missing_positions_give_nan_coordinates():
+    # Given data where one position is missing
+    data = pl.DataFrame(
+        {"sample_longitude_dd": [11.0, None], "sample_latitude_dd": [58.0, None]}
+    )
+
+    # When the coordinates are added
+    data = add_web_mercator_columns(data)
+
+    # Then the coordinates of the missing position are NaN
+    assert np.isfinite(data[X_COLUMN][0])
+    assert np.isnan(data[Y_COLUMN][1])
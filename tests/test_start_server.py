@@ -0,0 +1,105 @@
+import argparse
+import itertools
+
+import pytest
+from tornado.testing import AsyncHTTPTestCase
+from tornado.web import Application
+
+from qc_tool.scripts.start_server import (
+    WORKER_COOKIE,
+    WorkerDispatchHandler,
+    worker_count,
+    zoom_levels,
+)
+
+WORKER_PORTS = [5008, 5009]
+
+
+@pytest.mark.parametrize(
+    "given_text, expected_levels",
+    (
+        ("5-9", [5, 6, 7, 8, 9]),
+        ("7", [7]),
+    ),
+)
+def test_zoom_levels(given_text, expected_levels):
+    assert list(zoom_levels(given_text)) == expected_levels
+
+
+@pytest.mark.parametrize("given_text", ("", "five", "5-x"))
+def test_zoom_levels_rejects_invalid_text(given_text):
+    with pytest.raises(argparse.ArgumentTypeError):
+        zoom_levels(given_text)
+
+
+def test_worker_count():
+    assert worker_count("4") == 4
+
+
+@pytest.mark.parametrize("given_text", ("0", "-1", "four"))
+def test_worker_count_rejects_invalid_text(given_text):
+    with pytest.raises(argparse.ArgumentTypeError):
+        worker_count(given_text)
+
+
+class TestWorkerDispatchHandler(AsyncHTTPTestCase):
+    def get_app(self):
+        return Application(
+            [
+                (
+                    r"/(.*)",
+                    WorkerDispatchHandler,
+                    {
+                        "worker_ports": WORKER_PORTS,
+                        "next_worker": itertools.cycle(WORKER_PORTS),
+                    },
+                )
+            ]
+        )
+
+    def dispatch(self, path: str, worker: str | None = None):
+        headers = {"Cookie": f"{WORKER_COOKIE}={worker}"} if worker else {}
+        return self.fetch(path, headers=headers, follow_redirects=False)
+
+    def test_new_browsers_are_given_workers_in_turn(self):
+        # Given browsers without a worker cookie
+        # When they are dispatched
+        responses = [self.dispatch("/qc_tool") for _ in range(3)]
+
+        # Then they are redirected to the workers in turn and given the cookie
+        assert [response.headers["Location"] for response in responses] == [
+            "http://127.0.0.1:5008/qc_tool",
+            "http://127.0.0.1:5009/qc_tool",
+            "http://127.0.0.1:5008/qc_tool",
+        ]
+        assert f"{WORKER_COOKIE}=5008" in responses[0].headers["Set-Cookie"]
+
+    def test_browser_with_cookie_keeps_its_worker(self):
+        # Given a browser with a cookie for the second worker
+        # When it is dispatched
+        response = self.dispatch("/qc_tool", worker="5009")
+
+        # Then it is redirected to the same worker without a new cookie
+        assert response.code == 302
+        assert response.headers["Location"] == "http://127.0.0.1:5009/qc_tool"
+        assert "Set-Cookie" not in response.headers
+
+    def test_browser_with_unknown_worker_is_given_new_worker(self):
+        # Given a browser with a cookie for a worker that does not exist
+        # When it is dispatched
+        response = self.dispatch("/qc_tool", worker="6000")
+
+        # Then it is redirected to a worker and given a new cookie
+        assert response.headers["Location"] == "http://127.0.0.1:5008/qc_tool"
+        assert f"{WORKER_COOKIE}=5008" in response.headers["Set-Cookie"]
+
+    def test_path_and_query_are_kept(self):
+        # Given a request with a path and a query
+        # When it is dispatched
+        response = self.dispatch("/qc_tool/static/style.css?version=2", worker="5009")
+
+        # Then the worker gets the same path and query
+        assert (
+            response.headers["Location"]
+            == "http://127.0.0.1:5009/qc_tool/static/style.css?version=2"
+        )
@@ -0,0 +1,73 @@
+import asyncio
+
+from tornado.simple_httpclient import HTTPTimeoutError
+
+from qc_tool import tile_cache
+from qc_tool.tile_cache import TileCache, tile_range
+
+WORLD_HALF_WIDTH = 20_037_508.342_789_244
+
+
+class FailingHTTPClient:
+    fetches = 0
+
+    async def fetch(self, *args, **kwargs):
+        FailingHTTPClient.fetches += 1
+        raise HTTPTimeoutError("Timeout while connecting")
+
+
+def test_tile_range_covers_extent():
+    # Given an extent in the upper left quarter of the world
+    x_range = (-WORLD_HALF_WIDTH + 1, -1)
+    y_range = (1, WORLD_HALF_WIDTH - 1)
+
+    # When the tiles are taken at zoom level 1 and 2
+    columns_1, rows_1 = tile_range(x_range, y_range, 1)
+    columns_2, rows_2 = tile_range(x_range, y_range, 2)
+
+    # Then the extent is covered by the upper left tile and its four children
+    assert (list(columns_1), list(rows_1)) == ([0], [0])
+    assert (list(columns_2), list(rows_2)) == ([0, 1], [0, 1])
+
+
+def test_tile_range_is_limited_to_world():
+    # Given an extent larger than the world
+    extent = (-2 * WORLD_HALF_WIDTH, 2 * WORLD_HALF_WIDTH)
+
+    # When the tiles are taken at zoom level 2
+    columns, rows = tile_range(extent, extent, 2)
+
+    # Then only the tiles of the world are included
+    assert (list(columns), list(rows)) == ([0, 1, 2, 3], [0, 1, 2, 3])
+
+
+def test_get_returns_cached_tile_without_fetching(tmp_path, monkeypatch):
+    # Given a cache with a tile
+    monkeypatch.setattr(tile_cache, "AsyncHTTPClient", FailingHTTPClient)
+    FailingHTTPClient.fetches = 0
+    cache = TileCache(tmp_path)
+    cache.write(5, 17, 9, b"tile")
+
+    # When the tile is requested
+    tile = asyncio.run(cache.get(5, 17, 9))
+
+    # Then the cached tile is returned and the provider is not asked
+    assert tile == b"tile"
+    assert FailingHTTPClient.fetches == 0
+
+
+def test_get_goes_offline_when_provider_times_out(tmp_path, monkeypatch):
+    # Given a tile provider that does not answer
+    monkeypatch.setattr(tile_cache, "AsyncHTTPClient", FailingHTTPClient)
+    FailingHTTPClient.fetches = 0
+    cache = TileCache(tmp_path)
+
+    # When two missing tiles are requested
+    first_tile = asyncio.run(cache.get(5, 17, 9))
+    second_tile = asyncio.run(cache.get(5, 17, 10))
+
+    # Then no tiles are returned and the provider is only asked once
+    assert first_tile is None
+    assert second_tile is None
+    assert cache.offline
+    assert FailingHTTPClient.fetches == 1
@@ -0,0 +1,96 @@
+import polars as pl
+
+from qc_tool.validation_cache import ValidationCache, visit_hashes
+
+
+def make_data(visit_b_value=2.0):
+    return pl.DataFrame(
+        {
+            "visit_key": ["a", "a", "b"],
+            "row_number": ["1", "2", "3"],
+            "value": [1.0, 1.5, visit_b_value],
+        }
+    )
+
+
+def test_visit_hashes_only_change_for_changed_visits():
+    # Given hashes for some data
+    given_hashes = visit_hashes(make_data())
+
+    # When one visit is changed
+    new_hashes = visit_hashes(make_data(visit_b_value=3.0))
+
+    # Then only the hash of the changed visit is different
+    assert new_hashes["a"] == given_hashes["a"]
+    assert new_hashes["b"] != given_hashes["b"]
+
+
+def test_store_caches_entries_per_visit():
+    # Given a cache
+    cache = ValidationCache()
+    data = make_data()
+    hashes = visit_hashes(data)
+
+    # Given a log with entries for one visit and an entry for another validator
+    given_log = [
+        {"cls": "Validator", "row_numbers": ["1"], "msg": "first"},
+        {"cls": "Validator", "row_numbers": ["2"], "msg": "second"},
+        {"cls": "OtherValidator", "row_numbers": ["3"], "msg": "other"},
+    ]
+
+    # When storing the log
+    cache.store(given_log, data, hashes, "v1", {"a", "b"}, {"Validator"})
+
+    # Then both visits are cached
+    assert cache.cached_visits(hashes, "v1") == {"a", "b"}
+
+    # And the cached entries belong to the visit and validator
+    assert [entry["msg"] for entry in cache.entries(hashes, "v1", {"a"})] == [
+        "first",
+        "second",
+    ]
+    assert cache.entries(hashes, "v1", {"b"}) == []
+
+    # And nothing is cached for another validator version
+    assert cache.cached_visits(hashes, "v2") == set()
+
+
+def test_store_skips_visits_with_entries_spanning_visits():
+    # Given a cache
+    cache = ValidationCache()
+    data = make_data()
+    hashes = visit_hashes(data)
+
+    # Given a log with an entry that refers to rows in both visits
+    given_log = [{"cls": "Validator", "row_numbers": ["2", "3"], "msg": "spanning"}]
+
+    # When storing the log
+    cache.store(given_log, data, hashes, "v1", {"a", "b"}, {"Validator"})
+
+    # Then no visit is cached
+    assert cache.cached_visits(hashes, "v1") == set()
+
+
+def test_store_skips_only_entries_without_a_validated_visit():
+    # Given a cache
+    cache = ValidationCache()
+    data = make_data()
+    hashes = visit_hashes(data)
+
+    # Given a log with an entry for a visit and an entry without known rows
+    given_log = [
+        {"cls": "Validator", "row_numbers": ["1"], "msg": "matched"},
+        {"cls": "Validator", "row_numbers": [], "msg": "unmatched"},
+        {"cls": "Validator", "row_numbers": ["99"], "msg": "unknown row"},
+    ]
+
+    # When storing the log
+    cache.store(given_log, data, hashes, "v1", {"a", "b"}, {"Validator"})
+
+    # Then the visits are cached
+    assert cache.cached_visits(hashes, "v1") == {"a", "b"}
+
+    # And only the matched entry is stored
+    assert [entry["msg"] for entry in cache.entries(hashes, "v1", {"a", "b"})] == [
+        "matched"
+    ]
@@ -0,0 +1,177 @@
+import time
+
+import polars as pl
+import pytest
+
+from qc_tool.validator_scheduler import ValidatorScheduler, ValidatorSpec
+
+
+class FakeController:
+    def __init__(self):
+        self.log = []
+
+    def validate(self, validator):
+        self.log.append({"cls": type(validator).__name__})
+
+
+class FirstValidator:
+    name = "first"
+
+
+class SecondValidator:
+    name = "second"
+
+
+class DependentValidator:
+    name = "dependent"
+
+
+def test_run_validates_each_validator_once_and_reports_timings():
+    # Given a scheduler with independent and dependent validators
+    scheduler = ValidatorScheduler(
+        (
+            ValidatorSpec(FirstValidator),
+            ValidatorSpec(DependentValidator, independent=False),
+            ValidatorSpec(SecondValidator),
+        )
+    )
+    controller = FakeController()
+
+    # When running the scheduler
+    scheduler.run(controller)
+
+    # Then each validator has been run once
+    assert sorted(row["cls"] for row in controller.log) == [
+        "DependentValidator",
+        "FirstValidator",
+        "SecondValidator",
+    ]
+
+    # And there are timings for all validators in the specified order
+    assert list(scheduler.timings) == ["first", "dependent", "second"]
+
+
+def test_order_log_sorts_rows_in_validator_order():
+    # Given a scheduler
+    scheduler = ValidatorScheduler(
+        (ValidatorSpec(FirstValidator), ValidatorSpec(SecondValidator))
+    )
+
+    # Given an interleaved log
+    given_log = [
+        {"cls": "SecondValidator", "message": "a"},
+        {"cls": "FirstValidator", "message": "b"},
+        {"cls": "Unknown", "message": "c"},
+        {"cls": "SecondValidator", "message": "d"},
+        {"cls": "FirstValidator", "message": "e"},
+    ]
+
+    # When ordering the log
+    ordered_log = scheduler.order_log(given_log)
+
+    # Then rows are grouped by validator and keep their order within the validator
+    assert [row["message"] for row in ordered_log] == ["b", "e", "a", "d", "c"]
+
+
+class DataHolder:
+    def __init__(self, data):
+        self.data = data
+
+
+class FakeControllerWithData(FakeController):
+    def __init__(self, data):
+        super().__init__()
+        self._data_holder = DataHolder(data)
+        self.validated_visits = {}
+
+    def validate(self, validator):
+        super().validate(validator)
+        self.validated_visits[validator.name] = sorted(
+            self._data_holder.data["visit_key"]
+        )
+
+
+def test_run_restricts_per_visit_validators_to_the_given_visits():
+    # Given a scheduler with a per visit validator and a validator for all data
+    scheduler = ValidatorScheduler(
+        (ValidatorSpec(FirstValidator), ValidatorSpec(SecondValidator, per_visit=False))
+    )
+
+    # Given a controller with data for three visits
+    given_data = pl.DataFrame({"visit_key": ["a", "b", "c"]})
+    controller = FakeControllerWithData(given_data)
+
+    # When running the scheduler for one of the visits
+    scheduler.run(controller, {"b"})
+
+    # Then the per visit validator has only seen that visit
+    assert controller.validated_visits["first"] == ["b"]
+
+    # And the other validator has seen all visits
+    assert controller.validated_visits["second"] == ["a", "b", "c"]
+
+    # And the data of the controller is restored
+    assert controller._data_holder.data.equals(given_data)
+
+
+def test_run_fails_clearly_when_the_data_of_the_controller_cannot_be_restricted():
+    # Given a scheduler with a per visit validator
+    scheduler = ValidatorScheduler((ValidatorSpec(FirstValidator),))
+
+    # Given a controller without the expected data holder
+    controller = FakeController()
+
+    # When running the scheduler for some of the visits
+    # Then it fails with an error naming the missing attribute
+    with pytest.raises(RuntimeError, match=r"_data_holder\.data"):
+        scheduler.run(controller, {"a"})
+
+
+class UnsafeLogger:
+    """Loses entries when two threads log at the same time."""
+
+    def __init__(self):
+        self.data = []
+        self.most_concurrent_calls = 0
+        self._calls = 0
+
+    def log_validation(self, msg: str):
+        self._calls += 1
+        self.most_concurrent_calls = max(self.most_concurrent_calls, self._calls)
+        data = list(self.data)
+        time.sleep(0.001)
+        self.data = [*data, msg]
+        self._calls -= 1
+
+
+class LoggingController(FakeController):
+    def __init__(self, logger):
+        super().__init__()
+        self._logger = logger
+
+    def validate(self, validator):
+        for n in range(10):
+            self._logger.log_validation(f"{validator.name} {n}")
+
+
+def test_concurrent_validators_log_one_at_a_time():
+    # Given independent validators that log to a logger that is not thread safe
+    logger = UnsafeLogger()
+    validators = [type(f"Validator{n}", (), {"name": f"v{n}"}) for n in range(4)]
+    scheduler = ValidatorScheduler(
+        tuple(map(ValidatorSpec, validators)), max_workers=4, logger=logger
+    )
+
+    # When running the validators concurrently
+    scheduler.run(LoggingController(logger))
+
+    # Then the logger has been called by one validator at a time
+    assert logger.most_concurrent_calls == 1
+
+    # And no entry has been lost
+    assert sorted(logger.data) == sorted(
+        f"v{validator} {n}" for validator in range(4) for n in range(10)
+    )
+
+    # And the log method of the logger is restored
+    assert "log_validation" not in vars(logger)
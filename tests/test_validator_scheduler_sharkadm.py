@@ -0,0 +1,33 @@
+from sharkadm import adm_logger
+
+from qc_tool.validator_scheduler import ValidatorScheduler, ValidatorSpec
+
+ENTRIES_PER_VALIDATOR = 50
+
+
+class LoggingController:
+    """Runs validators that log like SHARKadm validators do."""
+
+    def validate(self, validator):
+        for n in range(ENTRIES_PER_VALIDATOR):
+            adm_logger.log_validation(f"{validator.name} {n}", level="error")
+
+
+def test_concurrent_validators_keep_all_entries_of_the_sharkadm_log():
+    # Given independent validators that log to the SHARKadm logger
+    adm_logger.reset_log()
+    validators = [type(f"Validator{n}", (), {"name": f"v{n}"}) for n in range(8)]
+    scheduler = ValidatorScheduler(
+        tuple(map(ValidatorSpec, validators)), max_workers=8, logger=adm_logger
+    )
+
+    # When running the validators concurrently
+    scheduler.run(LoggingController())
+
+    # Then the log has every entry of every validator
+    adm_logger.filter(log_types=[adm_logger.VALIDATION], level=">warning")
+    assert sorted(entry["msg"] for entry in adm_logger.data) == sorted(
+        f"v{validator} {n}"
+        for validator in range(8)
+        for n in range(ENTRIES_PER_VALIDATOR)
+    )
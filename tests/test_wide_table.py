@@ -0,0 +1,79 @@
+import polars as pl
+
+from qc_tool.wide_table import WideTable, parameter_pair, parameter_values
+
+
+def make_data():
+    return pl.DataFrame(
+        {
+            "visit_key": ["b", "b", "a", "a", "a"],
+            "row_number": ["3", "3", "1", "1", "2"],
+            "DEPH": [5.0, 5.0, 0.0, 0.0, 10.0],
+            "parameter": ["TEMP", "SALT", "TEMP", "SALT", "TEMP"],
+            "value": [4.0, 7.0, 10.0, 6.0, 8.0],
+            "unit": ["C", "psu", "C", "psu", "C"],
+            "quality_flag_long": ["1_0_0_0"] * 5,
+        }
+    )
+
+
+def test_visit_is_pair_of_parameters_in_same_sample():
+    # Given a wide table
+    table = WideTable(make_data())
+
+    # When a pair of parameters is taken for a visit
+    pair = parameter_pair(table.visit("a"), "TEMP", "SALT")
+
+    # Then only the sample with both parameters is included
+    assert pair["DEPH"].to_list() == [0.0]
+    assert pair["value_TEMP"].to_list() == [10.0]
+    assert pair["value_SALT"].to_list() == [6.0]
+
+
+def test_update_flags_changes_flags_of_updated_values():
+    # Given a wide table
+    table = WideTable(make_data())
+
+    # When the flag of one value is updated
+    table.update_flags(
+        pl.DataFrame(
+            {
+                "visit_key": ["a"],
+                "parameter": ["SALT"],
+                "DEPH": [0.0],
+                "quality_flag_long": ["1_0_0_4"],
+            }
+        )
+    )
+
+    # Then only that value has the new flag
+    assert table.visit("a")["quality_flag_long_SALT"].to_list() == ["1_0_0_4", None]
+    assert table.visit("a")["quality_flag_long_TEMP"].to_list() == ["1_0_0_0"] * 2
+    assert table.visit("b")["quality_flag_long_SALT"].to_list() == ["1_0_0_0"]
+
+
+def test_filtered_rows_only_include_rows_of_filtered_visits():
+    # Given a wide table
+    table = WideTable(make_data())
+
+    # When a pair of parameters is taken for the rows of a visit
+    pair = parameter_pair(
+        table.data, "TEMP", "SALT", fields=("value",), rows=table.visit_rows(["b"])
+    )
+
+    # Then only the rows of that visit are included
+    assert pair["value_TEMP"].to_list() == [4.0]
+
+
+def test_parameter_values_are_rows_of_pair_as_one_row_per_value():
+    # Given a pair of parameters of a visit
+    pair = parameter_pair(WideTable(make_data()).visit("a"), "TEMP", "SALT")
+
+    # When the pair is turned back into values
+    values = parameter_values(pair, ("TEMP", "SALT"))
+
+    # Then there is one row per parameter value with its flag
+    assert values.select("parameter", "DEPH", "value", "quality_flag_long").rows() == [
+        ("TEMP", 0.0, 10.0, "1_0_0_0"),
+        ("SALT", 0.0, 6.0, "1_0_0_0"),
+    ]
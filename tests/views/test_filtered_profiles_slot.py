@@ -0,0 +1,65 @@
+from unittest.mock import MagicMock
+
+import numpy as np
+import polars as pl
+
+from qc_tool.filtered_profiles_slot import FilteredProfilesSlot
+from qc_tool.slot_source import LabelCodes
+
+
+def make_parameter_data(visit_key: str) -> dict:
+    depths = [0.0, 5.0, 10.0]
+    return {
+        "x": np.array([1.0, 2.0, 3.0]),
+        "unit": np.zeros(3, dtype=np.int32),
+        "y": np.array(depths),
+        "qc": np.zeros(3, dtype=np.uint8),
+        "outline": np.zeros(3, dtype=np.uint8),
+        "qc_incoming": np.zeros(3, dtype=np.uint8),
+        "qc_automatic": np.zeros(3, dtype=np.int32),
+        "qc_manual": np.zeros(3, dtype=np.uint8),
+        "key": np.array([f"{visit_key}:{depth}" for depth in depths]),
+        "data": pl.DataFrame(
+            {"visit_key": [visit_key] * 3, "parameter": ["TEMP_CTD"] * 3, "DEPH": depths}
+        ),
+    }
+
+
+def make_visit():
+    return MagicMock(water_depth=10.0, max_depth=10.0)
+
+
+def test_background_is_not_sent_again_when_the_visit_changes():
+    # Given a slot showing a visit on a background
+    slot = FilteredProfilesSlot(MagicMock(), MagicMock(), LabelCodes(), profile_index=0)
+    background = {"x": np.array([1.0, 2.0]), "y": np.array([0.0, 10.0])}
+    slot.set_data(("TEMP_CTD", make_parameter_data("first")), visit=make_visit())
+    slot.set_filtered_data(background)
+
+    sent_sources = []
+    slot._filtered_source.on_change(
+        "data", lambda attr, old, new: sent_sources.append("points")
+    )
+    slot._density_source.on_change(
+        "data", lambda attr, old, new: sent_sources.append("image")
+    )
+
+    # When another visit is shown with the same background
+    slot.set_data(("TEMP_CTD", make_parameter_data("second")), visit=make_visit())
+    slot.set_filtered_data(background)
+
+    # Then the background is not sent again
+    assert sent_sources == []
+    assert list(slot._filtered_source.data["x"]) == [1.0, 2.0]
+
+
+def test_background_is_removed_when_the_figure_is_cleared():
+    # Given a slot showing a background
+    slot = FilteredProfilesSlot(MagicMock(), MagicMock(), LabelCodes(), profile_index=0)
+    slot.set_filtered_data({"x": np.array([1.0, 2.0]), "y": np.array([0.0, 10.0])})
+
+    # When the figure is cleared
+    slot.clear_figure()
+
+    # Then no background is shown
+    assert len(slot._filtered_source.data["x"]) == 0
@@ -0,0 +1,49 @@
+from unittest.mock import MagicMock
+
+import numpy as np
+import polars as pl
+
+from qc_tool.callback_queue import CallbackQueue
+from qc_tool.map_clusters import CLUSTER_MIN_POINTS
+from qc_tool.models.map_model import MapModel
+from qc_tool.views.map_view import MapView
+
+
+def make_view():
+    map_model = MapModel(CallbackQueue())
+    view = MapView(MagicMock(), map_model)
+    return view, map_model
+
+
+def test_level_of_detail_of_empty_map_shows_no_clusters():
+    # Given a map before any data is loaded
+    view, _ = make_view()
+
+    # When the level of detail is updated after the map is moved
+    view.update_level_of_detail()
+
+    # Then the map shows points and no clusters
+    assert view._points.visible
+    assert len(view._cluster_source.data["x"]) == 0
+
+
+def test_level_of_detail_shows_clusters_when_many_points_are_in_view():
+    # Given a map with more points than are shown individually
+    view, map_model = make_view()
+    n = CLUSTER_MIN_POINTS + 1
+    map_model.set_points(
+        pl.DataFrame(
+            {
+                "visit_key": [str(i) for i in range(n)],
+                "x": np.linspace(*MapView.default_x_range, n),
+                "y": np.full(n, np.mean(MapView.default_y_range)),
+            }
+        )
+    )
+
+    # When the level of detail is updated
+    view.update_level_of_detail()
+
+    # Then the points are shown as clusters that together hold all points
+    assert not view._points.visible
+    assert sum(int(label) for label in view._cluster_source.data["label"]) == n
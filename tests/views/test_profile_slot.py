@@ -0,0 +1,69 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import numpy as np
+import polars as pl
+from ocean_data_qc.fyskem.qc_flag import QcFlag
+
+from qc_tool import profile_slot
+from qc_tool.profile_slot import ProfileSlot
+from qc_tool.slot_source import DECIMATION_MIN_POINTS, LabelCodes, flag_code
+
+
+def make_source_data(n: int) -> dict:
+    depths = np.arange(n, dtype=np.float64)
+    return {
+        "x": np.sin(depths),
+        "unit": np.zeros(n, dtype=np.int32),
+        "y": depths,
+        "qc": np.zeros(n, dtype=np.uint8),
+        "outline": np.zeros(n, dtype=np.uint8),
+        "qc_incoming": np.zeros(n, dtype=np.uint8),
+        "qc_automatic": np.zeros(n, dtype=np.int32),
+        "qc_manual": np.zeros(n, dtype=np.uint8),
+        "key": np.array([f"visit|TEMP_CTD|{depth}" for depth in depths]),
+        "data": pl.DataFrame(
+            {"visit_key": "visit", "parameter": "TEMP_CTD", "DEPH": depths}
+        ),
+    }
+
+
+def test_update_colors_of_decimated_profile_reuses_the_row_index(monkeypatch):
+    # Given a slot showing a profile that is decimated
+    text_labels = LabelCodes([""])
+    slot = ProfileSlot(MagicMock(), text_labels)
+    source_data = make_source_data(DECIMATION_MIN_POINTS * 10)
+    slot.set_data(
+        "visit",
+        [("TEMP_CTD", source_data)],
+        visit=MagicMock(water_depth=None, max_depth=None),
+    )
+    assert slot._plotted_rows[0] is not None
+
+    # Given that row indices are counted from now on
+    indexed_rows = []
+
+    def counting_row_index(data, key_columns):
+        indexed_rows.append(data.height)
+        return {}
+
+    monkeypatch.setattr(profile_slot, "row_index", counting_row_index)
+
+    # When a value that is not plotted is flagged
+    depth = float(np.setdiff1d(source_data["y"], slot._sources[0].data["y"])[0])
+    flags = SimpleNamespace(
+        total=QcFlag.BAD_VALUE,
+        incoming=QcFlag.GOOD_VALUE,
+        manual=QcFlag.BAD_VALUE,
+        total_automatic="",
+        total_automatic_name="",
+    )
+    slot.update_colors(
+        MagicMock(iter_flags=lambda: [(("visit", "TEMP_CTD", depth), flags)])
+    )
+
+    # Then the full data is not indexed again
+    assert indexed_rows == []
+
+    # And the flag of the full source data is updated
+    assert source_data["qc"][int(depth)] == flag_code(QcFlag.BAD_VALUE)